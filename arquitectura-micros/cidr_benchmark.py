@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark del matcher CIDR de las whitelists
+==========================================
+Compara la membresía en whitelist con el recorrido lineal anterior
+(`ip in ipaddress.ip_network(...)` por cada red) contra lambda/cidr_matcher.py,
+para whitelists de 10, 1k y 100k rangos (mezcla de prefijos IPv4 /16-/29 y algunos
+IPv6 /32-/64), con la mitad de las consultas dentro de algún rango.
+
+El recorrido lineal se mide sobre redes ya parseadas (lo más favorable para él) y
+con menos consultas en los tamaños grandes.
+
+Uso:
+    python cidr_benchmark.py [--sizes 10 1000 100000] [--lookups 50000]
+"""
+
+import argparse
+import ipaddress
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda'))
+
+from cidr_matcher import CIDRMatcher  # noqa: E402
+
+LINEAR_BUDGET = 2_000_000  # comparaciones red a red como máximo para el recorrido lineal
+
+
+def random_cidrs(count, rng):
+    cidrs = []
+    for _ in range(count):
+        if rng.random() < 0.9:
+            prefix = rng.randint(16, 29)
+            cidrs.append(str(ipaddress.ip_network((rng.getrandbits(32), prefix), strict=False)))
+        else:
+            prefix = rng.randint(32, 64)
+            value = (0x2001 << 112) | rng.getrandbits(112)
+            cidrs.append(str(ipaddress.ip_network((value, prefix), strict=False)))
+    return cidrs
+
+
+def sample_ips(networks, count, rng):
+    """Mitad dentro de redes de la whitelist, mitad IPv4 aleatorias."""
+    ips = []
+    for i in range(count):
+        if i % 2:
+            ips.append(str(ipaddress.IPv4Address(rng.getrandbits(32))))
+        else:
+            network = rng.choice(networks)
+            ips.append(str(network.network_address + rng.randrange(min(network.num_addresses, 1 << 16))))
+    return ips
+
+
+def linear_match(networks, ip):
+    address = ipaddress.ip_address(ip)
+    for network in networks:
+        if address.version == network.version and address in network:
+            return True
+    return False
+
+
+def measure(fn, ips):
+    latencies = []
+    for ip in ips:
+        start = time.perf_counter_ns()
+        fn(ip)
+        latencies.append(time.perf_counter_ns() - start)
+    latencies.sort()
+    return statistics.mean(latencies) / 1000, latencies[len(latencies) // 2] / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100000])
+    parser.add_argument('--lookups', type=int, default=50000)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    print(f"{'rangos':>8} {'build ms':>9} {'lineal media/p50 µs':>22} {'matcher media/p50 µs':>22} {'difer.':>7}")
+    for size in args.sizes:
+        cidrs = random_cidrs(size, rng)
+        networks = [ipaddress.ip_network(cidr) for cidr in cidrs]
+        start = time.perf_counter()
+        matcher = CIDRMatcher.from_cidrs(cidrs)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        ips = sample_ips(networks, args.lookups, rng)
+        linear_ips = ips[:max(100, min(len(ips), LINEAR_BUDGET // size))]
+        mismatches = sum(linear_match(networks, ip) != (ip in matcher) for ip in linear_ips)
+        linear_mean, linear_p50 = measure(lambda ip: linear_match(networks, ip), linear_ips)
+        matcher_mean, matcher_p50 = measure(matcher.match, ips)
+        print(f"{size:>8} {build_ms:>9.1f} {linear_mean:>12.2f} / {linear_p50:<8.2f} "
+              f"{matcher_mean:>12.2f} / {matcher_p50:<8.2f} {mismatches:>7}")
+
+
+if __name__ == '__main__':
+    main()
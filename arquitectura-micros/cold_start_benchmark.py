@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark de cold start de los autorizadores Lambda
+==========================================
+Cada corrida es un intérprete nuevo (como un contenedor Lambda recién creado) que mide:
+
+- init: importar el módulo del handler (imports + inicialización a nivel de módulo:
+  cachés, base GeoIP, verificador JWT, políticas compiladas) — el "Init Duration" de Lambda
+- primera invocación del handler (cachés frías) y segunda (contenedor caliente)
+- proceso completo (arranque del intérprete + init + primera invocación)
+
+Además comprueba que el init no cargue módulos pesados que ningún camino usa al arrancar
+(boto3, urllib.request/http.client/ssl, requests), y con --importtime muestra el perfil
+de `python -X importtime` del módulo. Con --max-init-ms / --max-first-ms termina con
+código 1 si la mediana supera el presupuesto (lo usa test_cold_start.py en CI).
+
+Uso:
+    python cold_start_benchmark.py [--target arquitectura|prueba-front|cognito] [--runs 20]
+                                   [--max-init-ms 150] [--max-first-ms 50] [--importtime]
+"""
+
+import argparse
+import base64
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_IP = '181.49.10.20'
+# Hora fija de las invocaciones: el autorizador niega todo de 4:00 a 5:00 (mantenimiento)
+# y la decisión no puede depender de la hora a la que corre la suite
+FIXED_HOUR = 10
+
+# Módulos que no deben entrar en el init: ningún camino los usa al arrancar
+FORBIDDEN_AT_INIT = ('boto3', 'botocore', 'requests', 'urllib.request', 'http.client', 'ssl')
+
+
+def _unsigned_jwt(claims):
+    encode = lambda data: base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b'=').decode()  # noqa: E731
+    return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode(claims)}.firma"
+
+
+def _arquitectura_event():
+    token = _unsigned_jwt({'sub': 'cold-start', 'cognito:groups': ['admin'], 'exp': int(time.time()) + 3600})
+    return {
+        'type': 'REQUEST', 'httpMethod': 'GET', 'path': '/products',
+        'methodArn': 'arn:aws:execute-api:us-east-1:123456789012:abc123/prod/GET/products',
+        'headers': {'Authorization': f'Bearer {token}', 'X-Test-IP': TEST_IP},
+        'requestContext': {'identity': {'sourceIp': TEST_IP}},
+    }
+
+
+def _cognito_event():
+    return {
+        'type': 'REQUEST',
+        'methodArn': 'arn:aws:execute-api:us-east-1:123456789012:abc123/prod/GET/test',
+        'headers': {'Authorization': 'Bearer demo.24x7.user', 'X-Forwarded-For': '10.0.0.1'},
+        'requestContext': {'identity': {'sourceIp': '10.0.0.1'}},
+    }
+
+
+# target: (directorio del paquete Lambda, módulo, handler, evento)
+TARGETS = {
+    'arquitectura': (os.path.join(ROOT, 'arquitectura-micros', 'lambda'), 'authorizer', 'lambda_handler',
+                     _arquitectura_event),
+    'prueba-front': (os.path.join(ROOT, 'prueba-front', 'lambda'), 'authorizer', 'lambda_handler',
+                     _arquitectura_event),
+    'cognito': (os.path.join(ROOT, 'experimentoConfidencialidad', 'lambda_code'),
+                'lambda_authorizer_cognito_real', 'lambda_handler', _cognito_event),
+}
+
+def pin_hour(module, hour=FIXED_HOUR):
+    """Reemplaza `datetime` en el módulo del autorizador por una clase con `now()` a la hora `hour`."""
+    import datetime as datetime_module
+
+    class FixedHourDatetime(datetime_module.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime_module.datetime.now(tz).replace(hour=hour)
+
+    module.datetime = FixedHourDatetime
+
+
+# Se ejecuta en el intérprete nuevo: argv = directorio, módulo, handler, evento JSON, hora fija.
+# Repite pin_hour en línea para no importar este módulo (y sus dependencias) en el contenedor medido.
+_RUNNER = '''
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import logging
+logging.disable(logging.CRITICAL)
+module = __import__(sys.argv[2])
+init = time.perf_counter()
+import datetime as datetime_module
+class FixedHourDatetime(datetime_module.datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return datetime_module.datetime.now(tz).replace(hour=int(sys.argv[5]))
+module.datetime = FixedHourDatetime
+handler = getattr(module, sys.argv[3])
+event = json.loads(sys.argv[4])
+result = handler(event, None)
+first = time.perf_counter()
+handler(event, None)
+second = time.perf_counter()
+print(json.dumps({
+    'init_ms': (init - start) * 1000,
+    'first_ms': (first - init) * 1000,
+    'second_ms': (second - first) * 1000,
+    'effect': result['policyDocument']['Statement'][0]['Effect'],
+    'modules': sorted(sys.modules),
+}))
+'''
+
+
+def child_env(geoip_path=None):
+    """Entorno del contenedor simulado: sin JWKS ni caché compartida, base GeoIP local."""
+    env = {key: value for key, value in os.environ.items()
+           if not key.startswith(('JWKS_', 'JWT_', 'USER_POOL', 'AUTH_L2_', 'PYTHON'))}
+    if geoip_path:
+        env['GEOIP_DB_PATH'] = geoip_path
+    return env
+
+
+def build_geoip_database(directory):
+    """Base GeoIP mínima (CO para TEST_IP) para que el autorizador no consulte ip-api.com."""
+    sys.path.insert(0, TARGETS['arquitectura'][0])
+    import geoip
+    path = os.path.join(directory, 'geoip-country.bin')
+    geoip.GeoIPDatabase.from_ranges([('181.49.0.0', '181.49.255.255', 'CO'),
+                                     ('10.0.0.0', '10.255.255.255', 'CO')]).save(path)
+    return path
+
+
+def run_once(target, env, python=sys.executable, extra_args=()):
+    directory, module, handler, event = TARGETS[target]
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [python, *extra_args, '-c', _RUNNER, directory, module, handler, json.dumps(event()), str(FIXED_HOUR)],
+        capture_output=True, text=True, env=env, cwd=directory)
+    process_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f'{target}: {completed.stderr.strip()}')
+    sample = json.loads(completed.stdout.strip().splitlines()[-1])
+    sample['process_ms'] = process_ms
+    sample['importtime'] = completed.stderr
+    return sample
+
+
+def measure(target, runs, env):
+    samples = [run_once(target, env) for _ in range(runs)]
+    summary = {}
+    for field in ('init_ms', 'first_ms', 'second_ms', 'process_ms'):
+        values = sorted(sample[field] for sample in samples)
+        summary[field] = {'p50': statistics.median(values),
+                          'p90': values[min(len(values) - 1, int(len(values) * 0.9))], 'max': values[-1]}
+    summary['effect'] = samples[0]['effect']
+    summary['forbidden'] = sorted(name for name in FORBIDDEN_AT_INIT if name in samples[0]['modules'])
+    return summary
+
+
+def import_profile(target, env):
+    """Filas de `-X importtime` (self_us, cumulative_us, módulo) del init de `target`."""
+    rows = []
+    for line in run_once(target, env, extra_args=('-X', 'importtime'))['importtime'].splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', choices=sorted(TARGETS), action='append')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--max-init-ms', type=float)
+    parser.add_argument('--max-first-ms', type=float)
+    parser.add_argument('--importtime', action='store_true', help='mostrar los imports más costosos del init')
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = child_env(build_geoip_database(tmp))
+        for target in args.target or sorted(TARGETS):
+            summary = measure(target, args.runs, env)
+            print(f"\n{target} ({args.runs} corridas, decisión {summary['effect']})")
+            for field, label in (('init_ms', 'Init (imports + módulo)'), ('first_ms', 'Primera invocación'),
+                                 ('second_ms', 'Segunda invocación'), ('process_ms', 'Proceso completo')):
+                row = summary[field]
+                print(f"  {label:26s} p50 {row['p50']:8.2f} ms  p90 {row['p90']:8.2f} ms  max {row['max']:8.2f} ms")
+            if summary['forbidden']:
+                failures.append(f"{target}: init carga {', '.join(summary['forbidden'])}")
+            for field, budget in (('init_ms', args.max_init_ms), ('first_ms', args.max_first_ms)):
+                if budget is not None and summary[field]['p50'] > budget:
+                    failures.append(f"{target}: {field} p50 {summary[field]['p50']:.1f} ms > {budget:.1f} ms")
+            if args.importtime:
+                print("  Imports más costosos (acumulado):")
+                for _, cumulative_us, name in sorted(import_profile(target, env), key=lambda row: -row[1])[:15]:
+                    print(f"    {cumulative_us / 1000:8.2f} ms  {name}")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
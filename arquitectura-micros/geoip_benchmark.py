@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark del GeoIP local del autorizador
+==========================================
+Genera una base de rangos sintética del tamaño de DB-IP Lite (~300k rangos IPv4 y
+~150k IPv6), la compila con lambda/geoip.py y mide:
+
+- tiempo de carga (CSV vs binario compilado) — lo que se paga en el cold start
+- latencia por consulta IPv4 / IPv6 (búsqueda binaria en memoria)
+- opcionalmente (--remote N) la misma consulta contra ip-api.com, como referencia
+
+Uso:
+    python geoip_benchmark.py [--ipv4-ranges 300000] [--ipv6-ranges 150000] [--lookups 200000]
+                              [--csv rangos_reales.csv] [--remote 5]
+"""
+
+import argparse
+import ipaddress
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda'))
+
+import geoip  # noqa: E402
+
+COUNTRIES = ['CO', 'PE', 'EC', 'MX', 'US', 'BR', 'AR', 'CL', 'ES', 'DE', 'FR', 'CN', 'JP', 'IN', 'CA']
+
+
+def build_synthetic_csv(path, ipv4_ranges, ipv6_ranges, rng):
+    """Rangos contiguos del mismo tamaño con un país aleatorio cada uno."""
+    with open(path, 'w') as f:
+        f.write('ip_start,ip_end,country\n')
+        step = (2 ** 32) // ipv4_ranges
+        for i in range(ipv4_ranges):
+            start = i * step
+            f.write(f'{ipaddress.IPv4Address(start)},{ipaddress.IPv4Address(start + step - 1)},'
+                    f'{rng.choice(COUNTRIES)}\n')
+        base = 0x2000 << 112
+        step = (2 ** 125) // ipv6_ranges
+        for i in range(ipv6_ranges):
+            start = base + i * step
+            f.write(f'{ipaddress.IPv6Address(start)},{ipaddress.IPv6Address(start + step - 1)},'
+                    f'{rng.choice(COUNTRIES)}\n')
+
+
+def inconsistent_ips(database, compiled, ips):
+    """IPs que la base cargada del CSV y la compilada resuelven distinto (deben ser cero)."""
+    return [ip for ip in ips if database.lookup(ip) != compiled.lookup(ip)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def measure_lookups(database, ips):
+    latencies = []
+    for ip in ips:
+        start = time.perf_counter_ns()
+        database.lookup(ip)
+        latencies.append(time.perf_counter_ns() - start)
+    latencies.sort()
+    return {
+        'mean_us': statistics.mean(latencies) / 1000,
+        'p50_us': latencies[len(latencies) // 2] / 1000,
+        'p99_us': latencies[int(len(latencies) * 0.99)] / 1000,
+        'per_second': len(ips) / (sum(latencies) / 1e9),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ipv4-ranges', type=int, default=300000)
+    parser.add_argument('--ipv6-ranges', type=int, default=150000)
+    parser.add_argument('--lookups', type=int, default=200000)
+    parser.add_argument('--csv', help='CSV de rangos real en lugar del sintético')
+    parser.add_argument('--remote', type=int, default=0, help='consultas de referencia a ip-api.com')
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = args.csv or os.path.join(tmp, 'ranges.csv')
+        if not args.csv:
+            print(f"Generando {args.ipv4_ranges} rangos IPv4 y {args.ipv6_ranges} IPv6...")
+            build_synthetic_csv(csv_path, args.ipv4_ranges, args.ipv6_ranges, rng)
+        bin_path = os.path.join(tmp, 'geoip-country.bin')
+
+        database, csv_seconds = timed(lambda: geoip.GeoIPDatabase.from_csv(csv_path))
+        database.save(bin_path)
+        compiled, bin_seconds = timed(lambda: geoip.GeoIPDatabase.load(bin_path))
+        print(f"\nBase: {compiled.stats()} — binario {os.path.getsize(bin_path) / 1024 / 1024:.1f} MiB")
+        print(f"Carga CSV:      {csv_seconds * 1000:9.1f} ms")
+        print(f"Carga binario:  {bin_seconds * 1000:9.1f} ms  (cold start)")
+
+        ipv4 = ['.'.join(str(rng.randrange(256)) for _ in range(4)) for _ in range(args.lookups)]
+        ipv6 = [str(ipaddress.IPv6Address(rng.randrange(0x2000 << 112, 0x4000 << 112)))
+                for _ in range(args.lookups // 4)]
+        for label, ips in (('IPv4', ipv4), ('IPv6', ipv6)):
+            row = measure_lookups(compiled, ips)
+            print(f"Consulta {label}:  media {row['mean_us']:.2f} µs  p50 {row['p50_us']:.2f} µs  "
+                  f"p99 {row['p99_us']:.2f} µs  ({row['per_second']:,.0f}/s)")
+
+        sample = ipv4[:10000] + ipv6[:2500]
+        mismatches = inconsistent_ips(database, compiled, sample)
+        print(f"Consistencia CSV vs binario ({len(sample)} IPs): {len(mismatches)} diferencias")
+
+    if args.remote:
+        from authorizer import get_country_from_remote_service
+        latencies = []
+        for ip in ['181.49.0.1', '190.216.0.1', '8.8.8.8', '200.37.0.1', '187.141.0.1'][:args.remote]:
+            _, seconds = timed(lambda: get_country_from_remote_service(ip))
+            latencies.append(seconds * 1000)
+        print(f"ip-api.com (remoto): media {statistics.mean(latencies):.1f} ms en {len(latencies)} consultas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark de verificación JWT del autorizador
+==========================================
+Genera una clave RSA de prueba (Python puro: no requiere cryptography), publica su
+JWKS en un archivo temporal y mide con lambda/jwt_verifier.py:
+
+- carga del JWKS (primera consulta de un kid)
+- verificación completa RS256 (firma + claims) — tokens distintos, sin memo
+- camino caliente: el mismo token ya verificado (claims memorizados hasta exp)
+- referencia: decodificar el payload sin verificar (comportamiento anterior)
+
+También comprueba que se rechacen firmas alteradas y que un kid desconocido solo
+provoque una recarga del JWKS por intervalo.
+
+Uso:
+    python jwt_benchmark.py [--bits 2048] [--tokens 2000] [--warm 200000]
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda'))
+
+import jwt_verifier  # noqa: E402
+from jwt_verifier import JWKSCache, JWTVerifier, b64url_encode  # noqa: E402
+
+SHA256_DIGEST_INFO = bytes.fromhex('3031300d060960864801650304020105000420')
+
+
+def is_probable_prime(n, rng, rounds=40):
+    if n < 4:
+        return n in (2, 3)
+    for p in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37):
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d, s = d // 2, s + 1
+    for _ in range(rounds):
+        x = pow(rng.randrange(2, n - 1), d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def random_prime(bits, rng):
+    while True:
+        candidate = rng.getrandbits(bits) | (1 << (bits - 1)) | (1 << (bits - 2)) | 1
+        if is_probable_prime(candidate, rng):
+            return candidate
+
+
+def generate_rsa_key(bits, rng, e=65537):
+    while True:
+        p, q = random_prime(bits // 2, rng), random_prime(bits // 2, rng)
+        phi = (p - 1) * (q - 1)
+        if p != q and phi % e:
+            return p * q, e, (p, q, pow(e, -1, phi))
+
+
+def sign_rs256(message, n, private):
+    """Firma PKCS#1 v1.5 con CRT (solo para generar tokens de prueba)."""
+    p, q, d = private
+    size = (n.bit_length() + 7) // 8
+    t = SHA256_DIGEST_INFO + hashlib.sha256(message).digest()
+    m = int.from_bytes(b'\x00\x01' + b'\xff' * (size - len(t) - 3) + b'\x00' + t, 'big')
+    s1, s2 = pow(m, d % (p - 1), p), pow(m, d % (q - 1), q)
+    s = s2 + q * ((pow(q, -1, p) * (s1 - s2)) % p)
+    return s.to_bytes(size, 'big')
+
+
+def make_token(claims, kid, n, private):
+    header = b64url_encode(json.dumps({'alg': 'RS256', 'kid': kid, 'typ': 'JWT'}).encode())
+    payload = b64url_encode(json.dumps(claims).encode())
+    signature = sign_rs256(f'{header}.{payload}'.encode(), n, private)
+    return f'{header}.{payload}.{b64url_encode(signature)}'
+
+
+def unverified_decode(token):
+    payload = token.split('.')[1]
+    return json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+
+
+def measure(fn, items):
+    latencies = []
+    for item in items:
+        start = time.perf_counter_ns()
+        fn(item)
+        latencies.append(time.perf_counter_ns() - start)
+    latencies.sort()
+    return {
+        'mean_us': statistics.mean(latencies) / 1000,
+        'p50_us': latencies[len(latencies) // 2] / 1000,
+        'p99_us': latencies[int(len(latencies) * 0.99)] / 1000,
+        'per_second': len(items) / (sum(latencies) / 1e9),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bits', type=int, default=2048)
+    parser.add_argument('--tokens', type=int, default=2000)
+    parser.add_argument('--warm', type=int, default=200000)
+    args = parser.parse_args()
+    rng = random.Random(11)
+
+    start = time.perf_counter()
+    n, e, private = generate_rsa_key(args.bits, rng)
+    print(f"Clave RSA-{args.bits} generada en {time.perf_counter() - start:.1f} s")
+
+    issuer = 'https://cognito-idp.us-east-1.amazonaws.com/us-east-1_bench'
+    exp = int(time.time()) + 3600
+    tokens = [make_token({'sub': f'user-{i}', 'iss': issuer, 'aud': 'bench-client', 'exp': exp,
+                          'cognito:groups': ['compras']}, 'bench-key', n, private)
+              for i in range(args.tokens)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jwks_path = os.path.join(tmp, 'jwks.json')
+        with open(jwks_path, 'w') as f:
+            json.dump({'keys': [{'kty': 'RSA', 'use': 'sig', 'alg': 'RS256', 'kid': 'bench-key',
+                                 'n': b64url_encode(n.to_bytes((n.bit_length() + 7) // 8, 'big')),
+                                 'e': b64url_encode(e.to_bytes(3, 'big'))}]}, f)
+        jwks = JWKSCache(jwks_path, min_refresh_interval=60)
+        verifier = JWTVerifier(jwks, issuer=issuer, audience='bench-client',
+                               claims_cache=jwt_verifier.TTLCache(max_entries=len(tokens) + 1))
+
+        start = time.perf_counter()
+        jwks.get_key('bench-key')
+        print(f"Carga del JWKS: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+        cold = measure(verifier.verify, tokens)
+        warm_token = tokens[0]
+        warm = measure(verifier.verify, [warm_token] * args.warm)
+        legacy = measure(unverified_decode, [warm_token] * args.warm)
+        for label, row in (('Verificación RS256', cold), ('Camino caliente', warm), ('Sin verificar', legacy)):
+            print(f"{label:20s} media {row['mean_us']:8.2f} µs  p50 {row['p50_us']:8.2f} µs  "
+                  f"p99 {row['p99_us']:8.2f} µs  ({row['per_second']:,.0f}/s)")
+
+        # Payload con otro grupo sobre la firma original, y un token firmado con un kid que no está en el JWKS
+        header, _, signature = tokens[1].split('.')
+        escalated = b64url_encode(json.dumps({'sub': 'user-1', 'iss': issuer, 'aud': 'bench-client', 'exp': exp,
+                                              'cognito:groups': ['admin']}).encode())
+        unknown_kid = make_token({'sub': 'user-x', 'iss': issuer, 'aud': 'bench-client', 'exp': exp},
+                                 'otra', n, private)
+        for label, token in (('firma alterada', f'{header}.{escalated}.{signature}'),
+                             ('kid desconocido', unknown_kid)):
+            for _ in range(3):
+                try:
+                    verifier.verify(token)
+                    print(f"❌ {label}: aceptado")
+                except jwt_verifier.InvalidTokenError as error:
+                    rejection = error
+            print(f"✅ {label}: rechazado ({rejection})")
+        print(f"JWKS: {verifier.stats()}")
+
+
+if __name__ == '__main__':
+    main()
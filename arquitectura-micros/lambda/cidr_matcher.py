@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+🧭 Matcher CIDR de prefijo más largo (IPv4 / IPv6)
+====================================================
+Para whitelists con cientos o miles de rangos por grupo. Cada red se guarda en una
+tabla hash por longitud de prefijo ({longitud: {prefijo_entero: cidr}}); una consulta
+prueba las longitudes presentes de la más larga a la más corta, así que cuesta como
+mucho 33 (IPv4) o 129 (IPv6) búsquedas en diccionario, independiente del número de
+rangos — y en la práctica solo unas pocas, porque las whitelists usan pocas longitudes.
+
+    matcher = CIDRMatcher.from_cidrs(['10.0.0.0/8', '10.20.0.0/16', '2001:db8::/32'])
+    matcher.match('10.20.1.1')   # '10.20.0.0/16' (el prefijo más largo)
+    matcher.match('8.8.8.8')     # None
+"""
+
+import ipaddress
+import socket
+
+_BITS = {4: 32, 6: 128}
+_IPV4_MAPPED_PREFIX = 0xFFFF << 32
+
+
+def parse_ip(ip_address):
+    """(versión, entero). Las IPv4 mapeadas (::ffff:a.b.c.d) se tratan como IPv4. ValueError si no es una IP."""
+    ip_address = ip_address.strip()
+    try:
+        if ':' not in ip_address:
+            return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, ip_address), 'big')
+        value = int.from_bytes(socket.inet_pton(socket.AF_INET6, ip_address), 'big')
+    except OSError:
+        raise ValueError(f'{ip_address!r} does not appear to be an IPv4 or IPv6 address')
+    if value >> 32 == 0xFFFF:
+        return 4, value ^ _IPV4_MAPPED_PREFIX
+    return 6, value
+
+
+class CIDRMatcher:
+    """Conjunto de redes con consulta de prefijo más largo."""
+
+    def __init__(self):
+        # versión -> {longitud_prefijo: {red >> (bits - longitud): cidr}}
+        self._tables = {4: {}, 6: {}}
+        # versión -> longitudes presentes, de la más larga a la más corta
+        self._lengths = {4: (), 6: ()}
+        self._size = 0
+
+    @classmethod
+    def from_cidrs(cls, cidrs):
+        matcher = cls()
+        for cidr in cidrs:
+            matcher.add(cidr)
+        return matcher
+
+    def add(self, cidr):
+        network = ipaddress.ip_network(cidr, strict=False)
+        bits = _BITS[network.version]
+        tables = self._tables[network.version]
+        if network.prefixlen not in tables:
+            tables[network.prefixlen] = {}
+            self._lengths[network.version] = tuple(sorted(tables, reverse=True))
+        table = tables[network.prefixlen]
+        key = int(network.network_address) >> (bits - network.prefixlen)
+        if key not in table:
+            self._size += 1
+        # Ante duplicados equivalentes se conserva el primero (mismo orden que la configuración)
+        table.setdefault(key, cidr)
+
+    def match(self, ip_address):
+        """CIDR (tal como se configuró) del prefijo más largo que contiene la IP, o None."""
+        version, value = parse_ip(ip_address)
+        bits = _BITS[version]
+        tables = self._tables[version]
+        for length in self._lengths[version]:
+            cidr = tables[length].get(value >> (bits - length))
+            if cidr is not None:
+                return cidr
+        return None
+
+    def __contains__(self, ip_address):
+        try:
+            return self.match(ip_address) is not None
+        except ValueError:
+            return False
+
+    def __len__(self):
+        return self._size
+
+    def stats(self):
+        return {'networks': self._size,
+                'ipv4_prefix_lengths': list(self._lengths[4]),
+                'ipv6_prefix_lengths': list(self._lengths[6])}
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+🌍 GeoIP local para el autorizador
+====================================================
+Resuelve IP -> país sin llamadas de red: los rangos se cargan en arreglos
+ordenados de enteros (uno para IPv4 y otro para IPv6) durante el cold start y
+cada consulta es una búsqueda binaria (microsegundos).
+
+Formatos de entrada:
+- CSV de rangos `ip_inicio,ip_fin,país` (DB-IP Lite, IP2Location Lite, exportes de
+  MaxMind convertidos a rangos). Los extremos pueden ser IPs o enteros; se
+  ignoran encabezados y comentarios (#).
+- Binario compilado (`.bin`), generado con este mismo módulo:
+
+    python lambda/geoip.py compile dbip-country-lite.csv lambda/geoip-country.bin
+
+  Carga varias veces más rápido que el CSV; es el archivo que se empaqueta con la Lambda.
+"""
+
+import array
+import bisect
+import csv
+import ipaddress
+import os
+import socket
+import struct
+import sys
+
+MAGIC = b'GEOIPv1\x00'
+_HEADER = struct.Struct('<8sHII')  # magic, países, rangos IPv4, rangos IPv6
+UNKNOWN = 'UNKNOWN'
+_IPV4_MAPPED_PREFIX = 0xFFFF << 32
+
+
+def _parse_endpoint(value):
+    """'1.2.3.0' / '2001:db8::' / '16909056' -> (versión, entero)."""
+    value = value.strip()
+    if value.isdigit():
+        number = int(value)
+        return (4 if number <= 0xFFFFFFFF else 6), number
+    address = ipaddress.ip_address(value)
+    return address.version, int(address)
+
+
+def _merge(ranges):
+    """Ordena y une rangos contiguos del mismo país (reduce el tamaño del arreglo)."""
+    merged = []
+    for start, end, country in sorted(ranges):
+        if merged and merged[-1][2] == country and merged[-1][1] + 1 >= start:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end, country])
+    return merged
+
+
+class GeoIPDatabase:
+    """Rangos ordenados por IP inicial; `lookup` hace bisect + comparación con el fin."""
+
+    def __init__(self, countries, v4_starts, v4_ends, v4_index, v6_starts, v6_ends, v6_index):
+        self.countries = countries
+        self.v4_starts = v4_starts
+        self.v4_ends = v4_ends
+        self.v4_index = v4_index
+        self.v6_starts = v6_starts
+        self.v6_ends = v6_ends
+        self.v6_index = v6_index
+
+    # ------------------------------------------------------------------
+    # Construcción
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_ranges(cls, ranges):
+        """`ranges`: iterable de (ip_inicio, ip_fin, país) como cadenas o enteros."""
+        by_version = {4: [], 6: []}
+        for start, end, country in ranges:
+            version, start_int = _parse_endpoint(str(start))
+            _, end_int = _parse_endpoint(str(end))
+            country = country.strip().upper()
+            if len(country) != 2 or not country.isalpha():
+                continue
+            by_version[version].append((start_int, end_int, country))
+
+        countries = sorted({country for rows in by_version.values() for _, _, country in rows})
+        position = {country: i for i, country in enumerate(countries)}
+        v4 = _merge(by_version[4])
+        v6 = _merge(by_version[6])
+        return cls(
+            countries,
+            array.array('I', (row[0] for row in v4)),
+            array.array('I', (row[1] for row in v4)),
+            array.array('H', (position[row[2]] for row in v4)),
+            [row[0] for row in v6],
+            [row[1] for row in v6],
+            array.array('H', (position[row[2]] for row in v6)),
+        )
+
+    @classmethod
+    def from_csv(cls, path):
+        def rows():
+            with open(path, newline='') as f:
+                for row in csv.reader(f):
+                    if len(row) < 3 or not row[0] or row[0].startswith('#'):
+                        continue
+                    try:
+                        _parse_endpoint(row[0])
+                    except ValueError:
+                        continue  # encabezado
+                    yield row[0], row[1], row[2]
+        return cls.from_ranges(rows())
+
+    # ------------------------------------------------------------------
+    # Formato binario
+    # ------------------------------------------------------------------
+    def save(self, path):
+        def little_endian(values):
+            if sys.byteorder == 'big':
+                values = array.array(values.typecode, values)
+                values.byteswap()
+            return values.tobytes()
+
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, len(self.countries), len(self.v4_starts), len(self.v6_starts)))
+            f.write(''.join(self.countries).encode('ascii'))
+            for values in (self.v4_starts, self.v4_ends, self.v4_index):
+                f.write(little_endian(values))
+            f.write(b''.join(start.to_bytes(16, 'big') for start in self.v6_starts))
+            f.write(b''.join(end.to_bytes(16, 'big') for end in self.v6_ends))
+            f.write(little_endian(self.v6_index))
+
+    @classmethod
+    def load(cls, path):
+        """Carga un archivo compilado (o un CSV si la extensión no es .bin)."""
+        if not path.endswith('.bin'):
+            return cls.from_csv(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, n_countries, n4, n6 = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f'{path} no es una base GeoIP compilada')
+        offset = _HEADER.size
+        codes = data[offset:offset + 2 * n_countries].decode('ascii')
+        offset += 2 * n_countries
+        countries = [codes[i:i + 2] for i in range(0, len(codes), 2)]
+
+        def read_array(typecode, count):
+            nonlocal offset
+            values = array.array(typecode)
+            values.frombytes(data[offset:offset + values.itemsize * count])
+            offset += values.itemsize * count
+            if sys.byteorder == 'big':
+                values.byteswap()
+            return values
+
+        def read_v6(count):
+            nonlocal offset
+            chunk = data[offset:offset + 16 * count]
+            offset += 16 * count
+            return [int.from_bytes(chunk[i:i + 16], 'big') for i in range(0, len(chunk), 16)]
+
+        v4_starts = read_array('I', n4)
+        v4_ends = read_array('I', n4)
+        v4_index = read_array('H', n4)
+        v6_starts = read_v6(n6)
+        v6_ends = read_v6(n6)
+        v6_index = read_array('H', n6)
+        return cls(countries, v4_starts, v4_ends, v4_index, v6_starts, v6_ends, v6_index)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _find(starts, ends, value):
+        i = bisect.bisect_right(starts, value) - 1
+        if i >= 0 and value <= ends[i]:
+            return i
+        return -1
+
+    def lookup(self, ip_address):
+        """Código de país ISO (dos letras) o 'UNKNOWN' (IP inválida, privada o sin rango)."""
+        ip_address = ip_address.strip()
+        try:
+            if ':' not in ip_address:
+                value = int.from_bytes(socket.inet_pton(socket.AF_INET, ip_address), 'big')
+                i = self._find(self.v4_starts, self.v4_ends, value)
+                return self.countries[self.v4_index[i]] if i >= 0 else UNKNOWN
+            value = int.from_bytes(socket.inet_pton(socket.AF_INET6, ip_address), 'big')
+        except (OSError, ValueError):
+            return UNKNOWN
+        if value >> 32 == 0xFFFF:  # ::ffff:a.b.c.d (IPv4 mapeada)
+            i = self._find(self.v4_starts, self.v4_ends, value ^ _IPV4_MAPPED_PREFIX)
+            return self.countries[self.v4_index[i]] if i >= 0 else UNKNOWN
+        i = self._find(self.v6_starts, self.v6_ends, value)
+        return self.countries[self.v6_index[i]] if i >= 0 else UNKNOWN
+
+    def stats(self):
+        return {'countries': len(self.countries), 'ipv4_ranges': len(self.v4_starts),
+                'ipv6_ranges': len(self.v6_starts)}
+
+
+def load_default(path=None):
+    """
+    Base empaquetada con la Lambda (GEOIP_DB_PATH o geoip-country.bin junto a este
+    módulo). Devuelve None si no existe: el autorizador usa entonces el servicio remoto.
+    """
+    path = path or os.environ.get('GEOIP_DB_PATH') or \
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'geoip-country.bin')
+    if not os.path.exists(path):
+        return None
+    return GeoIPDatabase.load(path)
+
+
+def main(argv):
+    if len(argv) == 4 and argv[1] == 'compile':
+        database = GeoIPDatabase.from_csv(argv[2])
+        database.save(argv[3])
+        print(f"✅ {argv[3]}: {database.stats()} ({os.path.getsize(argv[3]) / 1024:.0f} KiB)")
+        return 0
+    if len(argv) >= 3 and argv[1] == 'lookup':
+        database = GeoIPDatabase.load(argv[2])
+        for ip in argv[3:]:
+            print(f"{ip}\t{database.lookup(ip)}")
+        return 0
+    print("Uso:\n  python geoip.py compile <rangos.csv> <salida.bin>\n"
+          "  python geoip.py lookup <base.bin|rangos.csv> <ip> [<ip> ...]")
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+🔑 Verificación de JWT (RS256) con caché de JWKS
+====================================================
+Sin dependencias externas (el paquete de la Lambda no lleva PyJWT ni cryptography):
+la firma RSASSA-PKCS1-v1_5 se verifica con `pow` sobre enteros.
+
+- JWKSCache carga las claves públicas una vez (archivo local o URL) y guarda el objeto
+  ya parseado por `kid`. Un `kid` desconocido provoca una recarga, limitada a una cada
+  `min_refresh_interval` segundos (rotación de claves sin abrir la puerta a que tokens
+  basura fuercen una descarga por petición).
+- JWTVerifier memoriza los claims de cada token verificado hasta su `exp`: el camino
+  caliente (mismo token en invocaciones seguidas) no repite la operación RSA.
+
+Configuración (from_environment):
+    JWKS_PATH    archivo JWKS local (o jwks.json junto a este módulo)
+    JWKS_URL     URL del JWKS; por defecto la de Cognito si hay USER_POOL_ID y AWS_REGION
+    JWT_ISSUER   emisor esperado (por defecto el del User Pool)
+    JWT_AUDIENCE client id esperado en `aud` (ID token) o `client_id` (access token)
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+
+from ttl_cache import TTLCache
+
+logger = logging.getLogger()
+
+# DigestInfo DER (RFC 8017, 9.2) por algoritmo
+_DIGEST_INFO = {
+    'RS256': ('sha256', bytes.fromhex('3031300d060960864801650304020105000420')),
+    'RS384': ('sha384', bytes.fromhex('3041300d060960864801650304020205000430')),
+    'RS512': ('sha512', bytes.fromhex('3051300d060960864801650304020305000440')),
+}
+
+
+class InvalidTokenError(Exception):
+    """Token mal formado, con firma inválida o con claims no aceptados."""
+
+
+def b64url_decode(value):
+    if isinstance(value, str):
+        value = value.encode('ascii')
+    return base64.urlsafe_b64decode(value + b'=' * (-len(value) % 4))
+
+
+def b64url_encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+class RSAPublicKey:
+    """Clave pública RSA de un JWK (`n`, `e`)."""
+
+    __slots__ = ('kid', 'n', 'e', 'size')
+
+    def __init__(self, n, e, kid=None):
+        self.kid = kid
+        self.n = n
+        self.e = e
+        self.size = (n.bit_length() + 7) // 8
+
+    @classmethod
+    def from_jwk(cls, jwk):
+        return cls(int.from_bytes(b64url_decode(jwk['n']), 'big'),
+                   int.from_bytes(b64url_decode(jwk['e']), 'big'), jwk.get('kid'))
+
+    def verify(self, message, signature, alg='RS256'):
+        """RSASSA-PKCS1-v1_5: compara EM = firma^e mod n con la codificación esperada."""
+        hash_name, digest_info = _DIGEST_INFO[alg]
+        if len(signature) != self.size:
+            return False
+        value = int.from_bytes(signature, 'big')
+        if value >= self.n:
+            return False
+        encoded = pow(value, self.e, self.n).to_bytes(self.size, 'big')
+        t = digest_info + hashlib.new(hash_name, message).digest()
+        expected = b'\x00\x01' + b'\xff' * (self.size - len(t) - 3) + b'\x00' + t
+        return hmac.compare_digest(encoded, expected)
+
+
+class JWKSCache:
+    """Claves públicas por `kid`, cargadas de `source` (ruta local o URL http[s])."""
+
+    def __init__(self, source, min_refresh_interval=300.0, timeout=3.0, clock=time.monotonic):
+        self.source = source
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._last_fetch = None
+        self.fetches = 0
+        self.fetch_errors = 0
+
+    def _read_source(self):
+        if self.source.startswith(('http://', 'https://')):
+            import urllib.request  # solo JWKS remoto: http.client/ssl no entran en el cold start
+            with urllib.request.urlopen(self.source, timeout=self.timeout) as response:
+                return json.loads(response.read().decode())
+        with open(self.source) as f:
+            return json.load(f)
+
+    def refresh(self):
+        """Recarga el JWKS (conserva las claves anteriores si la descarga falla)."""
+        self._last_fetch = self._clock()
+        self.fetches += 1
+        try:
+            document = self._read_source()
+        except Exception as e:
+            self.fetch_errors += 1
+            logger.warning(f"Error loading JWKS from {self.source}: {e}")
+            return
+        keys = {}
+        for jwk in document.get('keys', []):
+            if jwk.get('kty') == 'RSA' and jwk.get('use', 'sig') == 'sig' and 'kid' in jwk:
+                keys[jwk['kid']] = RSAPublicKey.from_jwk(jwk)
+        self._keys = keys
+        logger.info(f"JWKS loaded from {self.source}: {len(keys)} keys")
+
+    def get_key(self, kid):
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+        with self._lock:
+            key = self._keys.get(kid)
+            if key is None and (self._last_fetch is None or
+                                self._clock() - self._last_fetch >= self.min_refresh_interval):
+                self.refresh()
+                key = self._keys.get(kid)
+        return key
+
+    def stats(self):
+        return {'keys': len(self._keys), 'fetches': self.fetches, 'fetch_errors': self.fetch_errors}
+
+
+class JWTVerifier:
+    """Verifica firma y claims (exp, nbf, iss, aud/client_id) y memoriza los claims hasta `exp`."""
+
+    def __init__(self, jwks, issuer=None, audience=None, algorithms=('RS256',), leeway=30,
+                 claims_cache=None, clock=time.time):
+        self.jwks = jwks
+        self.issuer = issuer
+        self.audience = audience
+        self.algorithms = tuple(algorithms)
+        self.leeway = leeway
+        self.claims_cache = claims_cache if claims_cache is not None else TTLCache(max_entries=10000)
+        self._clock = clock
+
+    def verify(self, token):
+        """Claims del token. InvalidTokenError si no es válido."""
+        claims = self.claims_cache.get(token)
+        if claims is not None:
+            return claims
+
+        parts = token.split('.')
+        if len(parts) != 3:
+            raise InvalidTokenError('JWT must have 3 parts')
+        try:
+            header = json.loads(b64url_decode(parts[0]))
+            claims = json.loads(b64url_decode(parts[1]))
+            signature = b64url_decode(parts[2])
+        except ValueError as e:
+            raise InvalidTokenError(f'Malformed JWT: {e}')
+        if not isinstance(header, dict) or not isinstance(claims, dict):
+            raise InvalidTokenError('Malformed JWT: header and payload must be objects')
+
+        alg = header.get('alg')
+        if alg not in self.algorithms or alg not in _DIGEST_INFO:
+            raise InvalidTokenError(f'Unsupported JWT algorithm: {alg}')
+        kid = header.get('kid')
+        if not isinstance(kid, str):
+            raise InvalidTokenError('Malformed JWT: kid must be a string')
+        key = self.jwks.get_key(kid)
+        if key is None:
+            raise InvalidTokenError(f'Unknown signing key: {kid}')
+        if not key.verify(f'{parts[0]}.{parts[1]}'.encode('ascii'), signature, alg):
+            raise InvalidTokenError('Invalid JWT signature')
+
+        now = self._clock()
+        self._validate_claims(claims, now)
+        self.claims_cache.set(token, claims, ttl=claims['exp'] + self.leeway - now)
+        return claims
+
+    def _validate_claims(self, claims, now):
+        exp = claims.get('exp')
+        if not isinstance(exp, (int, float)):
+            raise InvalidTokenError('JWT without exp')
+        if exp + self.leeway <= now:
+            raise InvalidTokenError('JWT expired')
+        nbf = claims.get('nbf')
+        if isinstance(nbf, (int, float)) and nbf - self.leeway > now:
+            raise InvalidTokenError('JWT not yet valid')
+        if self.issuer and claims.get('iss') != self.issuer:
+            raise InvalidTokenError(f"Unexpected issuer: {claims.get('iss')}")
+        if self.audience:
+            audience = claims.get('aud', claims.get('client_id'))
+            audiences = audience if isinstance(audience, list) else [audience]
+            if self.audience not in audiences:
+                raise InvalidTokenError(f'Unexpected audience: {audience}')
+
+    def stats(self):
+        return dict(self.jwks.stats(), claims_cache=self.claims_cache.stats())
+
+
+def from_environment():
+    """
+    Verificador configurado por variables de entorno, o None si no hay fuente de claves
+    (el autorizador conserva entonces la decodificación sin verificar).
+    """
+    region = os.environ.get('AWS_REGION')
+    user_pool_id = os.environ.get('USER_POOL_ID')
+    pool_issuer = f'https://cognito-idp.{region}.amazonaws.com/{user_pool_id}' if region and user_pool_id else None
+    local_jwks = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jwks.json')
+
+    source = os.environ.get('JWKS_PATH') or os.environ.get('JWKS_URL')
+    if not source and os.path.exists(local_jwks):
+        source = local_jwks
+    if not source and pool_issuer:
+        source = f'{pool_issuer}/.well-known/jwks.json'
+    if not source:
+        return None
+
+    return JWTVerifier(
+        JWKSCache(source, min_refresh_interval=float(os.environ.get('JWKS_MIN_REFRESH_SECONDS', '300'))),
+        issuer=os.environ.get('JWT_ISSUER') or pool_issuer,
+        audience=os.environ.get('JWT_AUDIENCE') or os.environ.get('USER_POOL_CLIENT_ID'),
+        claims_cache=TTLCache(max_entries=int(os.environ.get('JWT_CLAIMS_CACHE_MAX_ENTRIES', '10000'))),
+    )
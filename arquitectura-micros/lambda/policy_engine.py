@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+🛡️ Motor de políticas por grupo (precompiladas)
+====================================================
+`compile_policies` se ejecuta una vez en el cold start y convierte GROUP_POLICIES en
+estructuras listas para evaluar:
+
+- horario  -> máscara de 24 bits (bit h = hora h permitida)
+- países   -> frozenset (None = sin restricción)
+- whitelist -> CIDRMatcher (prefijo más largo, coste independiente del número de rangos)
+- apis     -> rutas exactas (frozenset) + prefijos de comodín ('/x/*') para str.startswith
+
+Cada decisión queda en unas pocas comprobaciones de tiempo constante, más la
+resolución del país cuando el grupo la exige.
+"""
+
+from cidr_matcher import CIDRMatcher
+
+
+def hours_mask(start, end):
+    """Máscara de horas permitidas (rango inclusivo; start > end cruza la medianoche)."""
+    if start <= end:
+        hours = range(start, end + 1)
+    else:
+        hours = list(range(start, 24)) + list(range(0, end + 1))
+    mask = 0
+    for hour in hours:
+        mask |= 1 << hour
+    return mask
+
+
+def compile_whitelist(ip_whitelist):
+    """CIDRMatcher con las redes permitidas, o None si no hay restricción por IP."""
+    if not ip_whitelist:
+        return None
+    return CIDRMatcher.from_cidrs(ip_whitelist)
+
+
+def compile_routes(apis):
+    """(todas, exactas, prefijos) a partir de patrones tipo '/products/*', '/orders/create' o '*'."""
+    exact, prefixes = set(), []
+    for pattern in apis or ():
+        if pattern == '*':
+            return True, frozenset(), ()
+        if pattern.endswith('*'):
+            prefixes.append(pattern[:-1])
+        else:
+            exact.add(pattern)
+    return False, frozenset(exact), tuple(prefixes)
+
+
+class CompiledPolicy:
+    """Política de un grupo lista para evaluar."""
+
+    __slots__ = ('name', 'description', 'hours', 'hours_mask', 'countries', 'allowed_countries', 'networks',
+                 'ip_whitelist', 'apis', 'all_routes', 'exact_routes', 'route_prefixes')
+
+    def __init__(self, name, policy):
+        self.name = name
+        self.description = policy['description']
+        self.hours = (policy['hours']['start'], policy['hours']['end'])
+        self.hours_mask = hours_mask(*self.hours)
+        countries = policy.get('countries')
+        self.allowed_countries = countries
+        self.countries = None if not countries or 'UNKNOWN' in countries else frozenset(countries)
+        self.ip_whitelist = policy.get('ip_whitelist')
+        self.networks = compile_whitelist(self.ip_whitelist)
+        self.apis = tuple(policy.get('apis') or ())
+        self.all_routes, self.exact_routes, self.route_prefixes = compile_routes(self.apis)
+
+    def allows_hour(self, hour):
+        return (self.hours_mask >> hour) & 1 == 1
+
+    def has_routes(self):
+        return self.all_routes or bool(self.exact_routes) or bool(self.route_prefixes)
+
+    def allows_route(self, path):
+        return self.all_routes or path in self.exact_routes or path.startswith(self.route_prefixes)
+
+    def check_whitelist(self, user_ip):
+        """Mismo resultado (y motivo) que el antiguo validate_ip_whitelist."""
+        if self.networks is None:
+            return {'allowed': True, 'reason': 'No IP restrictions'}
+        try:
+            cidr = self.networks.match(user_ip)
+        except ValueError:
+            return {'allowed': False, 'reason': f'Invalid IP format: {user_ip}'}
+        if cidr is not None:
+            return {'allowed': True, 'reason': f'IP {user_ip} allowed in network {cidr}'}
+        return {'allowed': False,
+                'reason': f'IP {user_ip} not in whitelist. Allowed networks: {self._whitelist_summary()}'}
+
+    def _whitelist_summary(self, limit=10):
+        # Con cientos de rangos de socios el motivo (que se registra en el log) se recorta
+        if len(self.ip_whitelist) <= limit:
+            return self.ip_whitelist
+        return f'{list(self.ip_whitelist[:limit])} ... ({len(self.ip_whitelist)} total)'
+
+
+def routes_overlap(a, b):
+    """True si alguna ruta la cubren los `apis` de ambas políticas."""
+    if not (a.has_routes() and b.has_routes()):
+        return False
+    if a.all_routes or b.all_routes or a.exact_routes & b.exact_routes:
+        return True
+    for prefix in a.route_prefixes:
+        if any(other.startswith(prefix) or prefix.startswith(other) for other in b.route_prefixes):
+            return True
+        if any(route.startswith(prefix) for route in b.exact_routes):
+            return True
+    return any(route.startswith(prefix) for prefix in b.route_prefixes for route in a.exact_routes)
+
+
+# ----------------------------------------------------------------------
+# Statements IAM para API Gateway
+# ----------------------------------------------------------------------
+HTTP_METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS')
+
+
+def api_arn_prefix(method_arn):
+    """'arn:aws:execute-api:región:cuenta:api/stage/GET/ruta' -> 'arn:aws:execute-api:región:cuenta:api/stage'."""
+    head, _, resource = method_arn.rpartition(':')
+    api_id, stage = resource.split('/')[:2]
+    return f'{head}:{api_id}/{stage}'
+
+
+def route_resources(arn_prefix, pattern):
+    """ARNs que cubren exactamente un patrón de `apis` ('*', '/x/*' o ruta exacta)."""
+    if pattern == '*':
+        return [f'{arn_prefix}/*']
+    # En los ARN el '*' también cruza '/', por eso el método se enumera en lugar de usar '*/ruta'
+    return [f'{arn_prefix}/{method}{pattern}' for method in HTTP_METHODS]
+
+
+def policy_statement(effect, resources):
+    return {'Action': 'execute-api:Invoke', 'Effect': effect, 'Resource': list(dict.fromkeys(resources))}
+
+
+def compile_policies(group_policies):
+    return {name: CompiledPolicy(name, policy) for name, policy in group_policies.items()}
+
+
+class PolicyEngine:
+    """
+    Evalúa los grupos de Cognito contra las políticas compiladas.
+
+    - `resolve_country(ip)`: IP -> código de país (solo se llama si el grupo restringe países
+      y la IP no pasó por una whitelist).
+    - `whitelist_cache`: caché opcional con `get_or_compute` para las decisiones (IP, grupo).
+    - `enforce_apis`: si es True y se conoce la ruta, solo cuentan los grupos cuyo `apis`
+      la cubre.
+    """
+
+    def __init__(self, policies, resolve_country, whitelist_cache=None, enforce_apis=False):
+        self.policies = policies
+        self.resolve_country = resolve_country
+        self.whitelist_cache = whitelist_cache
+        self.enforce_apis = enforce_apis
+
+    def _whitelist_decision(self, policy, user_ip):
+        if self.whitelist_cache is None:
+            return policy.check_whitelist(user_ip)
+        return self.whitelist_cache.get_or_compute((user_ip, policy.name),
+                                                   lambda: policy.check_whitelist(user_ip))
+
+    def decide(self, policy, current_hour, user_ip=None):
+        """Decisión de un grupo (horario, whitelist y país); no depende de la ruta."""
+        if not policy.allows_hour(current_hour):
+            start, end = policy.hours
+            return {
+                'allowed': False,
+                'reason': f'Access denied for {policy.name} group: outside allowed hours ({start}:00-{end}:59). Current hour: {current_hour}'
+            }
+
+        # Whitelist primero; las IPs que pasan por ella no se validan por país
+        whitelisted = False
+        if user_ip and policy.networks is not None:
+            ip_validation = self._whitelist_decision(policy, user_ip)
+            if not ip_validation['allowed']:
+                return ip_validation
+            whitelisted = True
+
+        if user_ip and policy.countries is not None and not whitelisted:
+            country = self.resolve_country(user_ip)
+            if country not in policy.countries:
+                return {
+                    'allowed': False,
+                    'reason': f'Geographic access denied from {country}. Allowed countries: {policy.allowed_countries}'
+                }
+
+        return {'allowed': True, 'reason': f"Access granted by {policy.name} group - {policy.description}"}
+
+    def evaluate(self, cognito_groups, current_hour, user_ip=None, path=None):
+        """El primer grupo conocido (y que cubre la ruta, si se aplica `apis`) decide."""
+        check_route = self.enforce_apis and path is not None
+        for group in cognito_groups:
+            policy = self.policies.get(group)
+            if policy is None or (check_route and not policy.allows_route(path)):
+                continue
+            return self.decide(policy, current_hour, user_ip)
+        return self._no_group_decision(cognito_groups, path)
+
+    def _no_group_decision(self, cognito_groups, path):
+        if self.enforce_apis and path is not None and any(group in self.policies for group in cognito_groups):
+            return {'allowed': False, 'reason': f'No group in {cognito_groups} grants access to {path}'}
+        return {'allowed': False, 'reason': f'User not in any valid MediSupply group. Current groups: {cognito_groups}'}
+
+    def authorize(self, cognito_groups, current_hour, user_ip, path, method_arn):
+        """
+        (decisión para `path`, statements para toda la API).
+
+        Los statements reproducen, para cualquier ruta y método de la API, la misma
+        decisión que `evaluate`, de modo que API Gateway puede cachear el resultado del
+        autorizador y reutilizarlo en todas las llamadas del usuario durante el TTL.
+        Son None cuando no se pueden expresar con patrones de ARN (un grupo denegado
+        cuyas rutas se solapan con las de un grupo permitido anterior); en ese caso se
+        usa la política del methodArn exacto.
+        """
+        groups = list(dict.fromkeys(group for group in cognito_groups if group in self.policies))
+        if not self.enforce_apis:
+            # Sin `apis` la decisión la toma el primer grupo y vale para todas las rutas
+            groups = groups[:1]
+        decisions = [(self.policies[group], self.decide(self.policies[group], current_hour, user_ip))
+                     for group in groups]
+
+        decision = None
+        for policy, group_decision in decisions:
+            if not self.enforce_apis or path is None or policy.allows_route(path):
+                decision = group_decision
+                break
+        if decision is None:
+            decision = self._no_group_decision(cognito_groups, path)
+        return decision, self._resource_statements(decisions, method_arn)
+
+    def _resource_statements(self, decisions, method_arn):
+        prefix = api_arn_prefix(method_arn)
+        if not self.enforce_apis:
+            allowed = bool(decisions) and decisions[0][1]['allowed']
+            return [policy_statement('Allow' if allowed else 'Deny', [f'{prefix}/*'])]
+
+        allow, deny = [], []
+        for i, (policy, decision) in enumerate(decisions):
+            resources = [arn for pattern in policy.apis for arn in route_resources(prefix, pattern)]
+            if decision['allowed']:
+                allow.extend(resources)
+                continue
+            # El Deny explícito gana en IAM: solo es correcto si ningún grupo permitido
+            # anterior (que decidiría primero) comparte rutas con este
+            if any(earlier['allowed'] and routes_overlap(earlier_policy, policy)
+                   for earlier_policy, earlier in decisions[:i]):
+                return None
+            deny.extend(resources)
+
+        if not allow:
+            return [policy_statement('Deny', [f'{prefix}/*'])]
+        # Rutas sin Allow quedan denegadas implícitamente; los Deny cubren las rutas de
+        # grupos denegados que un grupo permitido posterior también incluye
+        statements = [policy_statement('Allow', allow)]
+        if deny:
+            statements.append(policy_statement('Deny', deny))
+        return statements
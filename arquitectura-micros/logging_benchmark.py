@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark del logging de los autorizadores
+==========================================
+Compara, por invocación caliente del handler, el costo del logging anterior (f-strings
+a INFO con el evento, el payload JWT y la política completos; json.dumps(event, indent=2)
+en el autorizador Cognito) con lambda/authz_log.py:
+
+- sin logs          solo la lógica de autorización (referencia)
+- anterior          referencia + las mismas llamadas a logger.info del código anterior
+- estructurado      muestreo por defecto (INFO 1%, DEBUG 0) + registro de decisión
+- estructurado 100% todas las peticiones con detalle INFO y DEBUG (evento redactado)
+
+Los registros pasan por un handler con el formato de Lambda que solo cuenta bytes (lo
+que se factura como ingesta en CloudWatch), sin escribir a disco.
+
+Uso:
+    python logging_benchmark.py [--invocations 20000]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import cold_start_benchmark  # noqa: E402
+
+ARQUITECTURA_DIR, COGNITO_DIR = cold_start_benchmark.TARGETS['arquitectura'][0], cold_start_benchmark.TARGETS['cognito'][0]
+
+
+class CountingHandler(logging.Handler):
+    """Formatea como el runtime de Lambda y cuenta registros y bytes."""
+
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(logging.Formatter('[%(levelname)s]\t%(asctime)s.%(msecs)03dZ\t%(message)s'))
+        self.records = 0
+        self.bytes = 0
+
+    def emit(self, record):
+        self.records += 1
+        self.bytes += len(self.format(record).encode()) + 1
+
+
+def legacy_arquitectura_logs(logger, event, result):
+    """Las llamadas por invocación del autorizador anterior (camino Allow)."""
+    payload_part = event['headers']['Authorization'][7:].split('.')[1]
+    payload = cold_start_benchmark.json.loads(
+        cold_start_benchmark.base64.urlsafe_b64decode(payload_part + '=' * (-len(payload_part) % 4)))
+    logger.info(f"Authorization request received: {event}")
+    logger.info(f"Processing {event['httpMethod']} request")
+    logger.info(f"User IP: {event['headers']['X-Test-IP']}")
+    logger.info(f"Token received: {event['headers']['Authorization'][7:27]}...")
+    logger.info(f"JWT payload decoded: {payload}")
+    logger.info(f"Cognito groups: {payload['cognito:groups']}")
+    logger.info(f"IP {event['headers']['X-Test-IP']} resolved locally to country: CO")
+    logger.info("Access ALLOWED - Access granted")
+    logger.info(f"Generated policy with CORS: {result}")
+
+
+def legacy_cognito_logs(logger, event, result):
+    """Las llamadas por invocación del autorizador Cognito anterior (tokens y perfil en caché)."""
+    ip = event['headers']['X-Forwarded-For']
+    username = result['principalId']
+    logger.info("🔍 Evento recibido para MeddySupply Real")
+    logger.info(f"📋 Estructura del evento: {json.dumps(event, indent=2)}")
+    logger.info(f"🌐 IP extraída de X-Forwarded-For header: {ip}")
+    logger.info(f"🚀 Token cache HIT: {username}")
+    logger.info(f"🚀 User cache HIT: {username}")
+    logger.info(f"🚨 Usuario 24/7 detectado: {username} - fin de semana permitido")
+    logger.info(f"🔍 Detectando país para IP: {ip}")
+    logger.info(f"🏠 IP privada/local detectada: {ip} → US")
+    logger.info(f"🗺️ Evaluación geográfica: IP={ip}, País=US, Autorizados=['US', 'CA', 'MX']")
+    logger.info("✅ Acceso geográfico autorizado: US")
+    logger.info(f"⚡ MEDISUPPLY_REAL: {username} - allow - 0ms")
+
+
+def load_handlers():
+    sys.path.insert(0, ARQUITECTURA_DIR)
+    import authorizer
+    # Los módulos auxiliares compartidos (ttl_cache, jwt_verifier, authz_log) son copias idénticas
+    sys.path.insert(0, COGNITO_DIR)
+    import lambda_authorizer_cognito_real
+    return authorizer, lambda_authorizer_cognito_real
+
+
+def run(module, event, invocations, handler, legacy=None):
+    handler.records = handler.bytes = 0
+    module.lambda_handler(event, None)  # calentar cachés
+    handler.records = handler.bytes = 0
+    start = time.perf_counter()
+    for _ in range(invocations):
+        result = module.lambda_handler(event, None)
+        if legacy is not None:
+            legacy(module.logger, event, result)
+    elapsed = time.perf_counter() - start
+    assert result['policyDocument']['Statement'][0]['Effect'] == 'Allow', result
+    return {'us': elapsed / invocations * 1e6, 'records': handler.records / invocations,
+            'bytes': handler.bytes / invocations}
+
+
+def configure(log, info, debug, decisions):
+    log.sample_rates[logging.INFO] = info
+    log.sample_rates[logging.DEBUG] = debug
+    log.decisions = decisions
+    log.logger.setLevel(logging.DEBUG if debug else logging.INFO)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--invocations', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['GEOIP_DB_PATH'] = cold_start_benchmark.build_geoip_database(tmp)
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        handler = CountingHandler()
+        root.addHandler(handler)
+        arquitectura, cognito = load_handlers()
+
+        targets = (('arquitectura', arquitectura, cold_start_benchmark._arquitectura_event(), legacy_arquitectura_logs),
+                   ('cognito', cognito, cold_start_benchmark._cognito_event(), legacy_cognito_logs))
+        for name, module, event, legacy in targets:
+            print(f"\n{name} ({args.invocations} invocaciones)")
+            rows = []
+            configure(module.LOG, 0, 0, False)
+            rows.append(('Sin logs', run(module, event, args.invocations, handler)))
+            rows.append(('Anterior', run(module, event, args.invocations, handler, legacy)))
+            configure(module.LOG, 0.01, 0, True)
+            rows.append(('Estructurado (1% INFO)', run(module, event, args.invocations, handler)))
+            configure(module.LOG, 1.0, 1.0, True)
+            rows.append(('Estructurado (100%)', run(module, event, args.invocations, handler)))
+            configure(module.LOG, 0.01, 0, True)
+            for label, row in rows:
+                print(f"  {label:24s} {row['us']:8.1f} µs/inv  {row['records']:6.2f} registros/inv  "
+                      f"{row['bytes']:8.0f} bytes/inv")
+
+
+if __name__ == '__main__':
+    main()
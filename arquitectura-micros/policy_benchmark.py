@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+⏱️ Micro-benchmark de la decisión de políticas del autorizador
+============================================================
+Compara, por decisión (grupos + hora + IP), la evaluación anterior —que reconstruía
+GROUP_POLICIES y parseaba cada CIDR con ipaddress en cada invocación— con
+lambda/policy_engine.py (políticas compiladas en el cold start).
+
+La resolución de país se sustituye por un diccionario fijo para medir solo la
+lógica de decisión (sin GeoIP ni red). También verifica que ambas den el mismo
+resultado en todas las combinaciones probadas.
+
+Uso:
+    python policy_benchmark.py [--decisions 200000]
+"""
+
+import argparse
+import ipaddress
+import itertools
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda'))
+
+from policy_engine import PolicyEngine, compile_policies  # noqa: E402
+
+COUNTRY_BY_IP = {'181.49.0.1': 'CO', '200.37.0.1': 'PE', '8.8.8.8': 'US', '10.1.2.3': 'UNKNOWN',
+                 '192.168.1.10': 'UNKNOWN'}
+GROUP_SETS = [['admin'], ['compras'], ['logistica'], ['ventas'], ['clientes'], ['clientes', 'admin'],
+              ['otro'], []]
+
+
+def group_policies():
+    # Copia literal de las políticas del autorizador (se reconstruían en cada invocación)
+    return {
+        'admin': {'countries': ['CO', 'PE', 'EC', 'MX'], 'hours': {'start': 0, 'end': 23},
+                  'ip_whitelist': None, 'description': 'Acceso completo 24/7',
+                  'permissions': ['read_all', 'write_all', 'delete_all', 'audit_all'], 'apis': ['*']},
+        'compras': {'countries': ['CO', 'PE', 'EC', 'MX'], 'hours': {'start': 6, 'end': 22},
+                    'ip_whitelist': ['10.0.0.0/8'], 'description': 'Horario laboral, red corporativa',
+                    'permissions': ['read_purchases', 'write_purchases', 'manage_suppliers'],
+                    'apis': ['/purchases/*', '/suppliers/*', '/products/*']},
+        'logistica': {'countries': ['CO', 'PE', 'EC', 'MX'], 'hours': {'start': 5, 'end': 23},
+                      'ip_whitelist': None, 'description': 'Horario extendido para logística',
+                      'permissions': ['read_logistics', 'write_inventory', 'manage_routes'],
+                      'apis': ['/logistics/*', '/inventory/*', '/routes/*', '/vehicles/*']},
+        'ventas': {'countries': ['CO', 'PE', 'EC', 'MX'], 'hours': {'start': 5, 'end': 23},
+                   'ip_whitelist': None, 'description': 'Horario extendido para ventas',
+                   'permissions': ['read_sales', 'write_orders', 'manage_clients'],
+                   'apis': ['/sales/*', '/clients/*', '/orders/*', '/visits/*']},
+        'clientes': {'countries': ['CO'], 'hours': {'start': 6, 'end': 22}, 'ip_whitelist': None,
+                     'description': 'Horario comercial, solo Colombia',
+                     'permissions': ['read_products', 'create_orders', 'track_deliveries'],
+                     'apis': ['/products/available', '/orders/create', '/deliveries/track']},
+    }
+
+
+def legacy_decision(cognito_groups, current_hour, user_ip):
+    """Algoritmo anterior del autorizador (allowed únicamente)."""
+    policies = group_policies()
+    for group in cognito_groups:
+        if group not in policies:
+            continue
+        policy = policies[group]
+        if not (policy['hours']['start'] <= current_hour <= policy['hours']['end']):
+            return False
+        if user_ip and policy['ip_whitelist']:
+            try:
+                address = ipaddress.ip_address(user_ip)
+                if not any(address in ipaddress.ip_network(n) for n in policy['ip_whitelist']):
+                    return False
+            except ValueError:
+                return False
+        if user_ip and policy['countries']:
+            skip_geo = False
+            if policy['ip_whitelist']:
+                address = ipaddress.ip_address(user_ip)
+                skip_geo = any(address in ipaddress.ip_network(n) for n in policy['ip_whitelist'])
+            if not skip_geo and 'UNKNOWN' not in policy['countries'] \
+                    and COUNTRY_BY_IP[user_ip] not in policy['countries']:
+                return False
+        return True
+    return False
+
+
+def measure(decide, cases, rounds):
+    latencies = []
+    for _ in range(rounds):
+        for groups, hour, ip in cases:
+            start = time.perf_counter_ns()
+            decide(groups, hour, ip)
+            latencies.append(time.perf_counter_ns() - start)
+    latencies.sort()
+    return {
+        'mean_us': statistics.mean(latencies) / 1000,
+        'p50_us': latencies[len(latencies) // 2] / 1000,
+        'p99_us': latencies[int(len(latencies) * 0.99)] / 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--decisions', type=int, default=200000)
+    args = parser.parse_args()
+
+    engine = PolicyEngine(compile_policies(group_policies()), resolve_country=COUNTRY_BY_IP.__getitem__)
+    cases = list(itertools.product(GROUP_SETS, range(24), list(COUNTRY_BY_IP) + [None]))
+
+    mismatches = [case for case in cases if legacy_decision(*case) != engine.evaluate(*case)['allowed']]
+    print(f"Casos: {len(cases)} — diferencias legacy vs compilado: {len(mismatches)}")
+    for case in mismatches[:5]:
+        print(f"  {case}: legacy={legacy_decision(*case)} compilado={engine.evaluate(*case)['allowed']}")
+
+    rounds = max(1, args.decisions // len(cases))
+    for label, decide in (('legacy', legacy_decision), ('compilado', engine.evaluate)):
+        row = measure(decide, cases, rounds)
+        print(f"{label:10s} media {row['mean_us']:6.2f} µs  p50 {row['p50_us']:6.2f} µs  "
+              f"p99 {row['p99_us']:6.2f} µs  ({rounds * len(cases)} decisiones)")
+
+
+if __name__ == '__main__':
+    main()
@@ -253,7 +253,13 @@ class MediSupplyStack(Stack):
             self, "MediSupplyLambdaAuthorizer",
             handler=self.authorizer_lambda,
             authorizer_name="MediSupply-Security-Authorizer",
-            identity_sources=[apigateway.IdentitySource.header("Authorization")]
+            # La decisión depende de la IP (whitelist por grupo, país): la caché del
+            # autorizador se indexa por token + IP de origen para no reutilizarla entre IPs
+            identity_sources=[
+                apigateway.IdentitySource.header("Authorization"),
+                apigateway.IdentitySource.context("identity.sourceIp"),
+            ],
+            results_cache_ttl=Duration.minutes(5)
         )
 
 
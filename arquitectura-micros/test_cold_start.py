@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Presupuesto de cold start de los autorizadores (cold_start_benchmark.py): cada prueba
+arranca intérpretes nuevos, así que una regresión en el init (un import pesado a nivel
+de módulo, un cliente AWS creado al importar) hace fallar la suite.
+
+Presupuestos (medianas, ms) ajustables para máquinas de CI lentas:
+    COLD_START_MAX_INIT_MS   (por defecto 150)
+    COLD_START_MAX_FIRST_MS  (por defecto 50)
+    COLD_START_MAX_IMPORT_MS (por defecto 150, módulo del handler bajo -X importtime)
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cold_start_benchmark as benchmark  # noqa: E402
+
+MAX_INIT_MS = float(os.environ.get('COLD_START_MAX_INIT_MS', '150'))
+MAX_FIRST_MS = float(os.environ.get('COLD_START_MAX_FIRST_MS', '50'))
+MAX_IMPORT_MS = float(os.environ.get('COLD_START_MAX_IMPORT_MS', '150'))
+RUNS = 5
+
+
+class TestColdStart(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.env = benchmark.child_env(benchmark.build_geoip_database(cls.tmp.name))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_init_does_not_load_heavy_modules(self):
+        for target in sorted(benchmark.TARGETS):
+            with self.subTest(target=target):
+                modules = set(benchmark.run_once(target, self.env)['modules'])
+                self.assertEqual(sorted(modules.intersection(benchmark.FORBIDDEN_AT_INIT)), [])
+
+    def test_import_profile_within_budget(self):
+        for target in sorted(benchmark.TARGETS):
+            module = benchmark.TARGETS[target][1]
+            with self.subTest(target=target):
+                rows = benchmark.import_profile(target, self.env)
+                cumulative_us = next(cumulative for _, cumulative, name in rows if name.strip() == module)
+                self.assertLess(cumulative_us / 1000, MAX_IMPORT_MS,
+                                f'{module}: {cumulative_us / 1000:.1f} ms bajo -X importtime')
+
+    def test_cold_start_within_budget(self):
+        for target in sorted(benchmark.TARGETS):
+            with self.subTest(target=target):
+                summary = benchmark.measure(target, RUNS, self.env)
+                self.assertEqual(summary['effect'], 'Allow')
+                self.assertLess(summary['init_ms']['p50'], MAX_INIT_MS)
+                self.assertLess(summary['first_ms']['p50'], MAX_FIRST_MS)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Pruebas del GeoIP local de los autorizadores (lambda/geoip.py y la copia de
+prueba-front/lambda): ida y vuelta CSV -> binario, bordes de rango, IPs inválidas
+o desconocidas, IPv4 mapeadas en IPv6 y la verificación de consistencia de
+geoip_benchmark.py sobre una base sintética pequeña.
+"""
+
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import geoip_benchmark  # noqa: E402
+
+
+def load_geoip(path, name):
+    """Importa una copia de geoip.py por ruta (ambas se llaman `geoip`)."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+CSV = """ip_start,ip_end,country
+# comentario
+181.49.0.0,181.49.255.255,co
+181.50.0.0,181.50.255.255,CO
+190.216.0.0,190.216.127.255,PE
+3232235520,3232235775,EC
+2800:e0::,2800:e0:ffff:ffff:ffff:ffff:ffff:ffff,CO
+2001:1388::,2001:1388:ffff:ffff:ffff:ffff:ffff:ffff,PE
+200.0.0.0,200.0.0.255,XXX
+"""
+
+
+class GeoIPTestMixin:
+    """Casos comunes; cada subclase fija el módulo `geoip` a probar."""
+
+    geoip = None
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, 'ranges.csv')
+        with open(self.csv_path, 'w') as f:
+            f.write(CSV)
+        self.database = self.geoip.GeoIPDatabase.from_csv(self.csv_path)
+        self.bin_path = os.path.join(self.tmp.name, 'geoip-country.bin')
+        self.database.save(self.bin_path)
+        self.compiled = self.geoip.GeoIPDatabase.load(self.bin_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assertCountry(self, ip, country):
+        for database in (self.database, self.compiled):
+            self.assertEqual(database.lookup(ip), country, ip)
+
+    def test_csv_to_binary_round_trip(self):
+        for attribute in ('countries', 'v4_starts', 'v4_ends', 'v4_index', 'v6_starts', 'v6_ends', 'v6_index'):
+            self.assertEqual(list(getattr(self.compiled, attribute)), list(getattr(self.database, attribute)),
+                             attribute)
+        # Rangos contiguos del mismo país se unen; el código de tres letras se descarta
+        self.assertEqual(self.compiled.stats(), {'countries': 3, 'ipv4_ranges': 3, 'ipv6_ranges': 2})
+        self.assertEqual(self.geoip.GeoIPDatabase.load(self.csv_path).stats(), self.compiled.stats())
+
+    def test_range_boundaries(self):
+        self.assertCountry('181.49.0.0', 'CO')
+        self.assertCountry('181.50.255.255', 'CO')
+        self.assertCountry('181.48.255.255', self.geoip.UNKNOWN)
+        self.assertCountry('181.51.0.0', self.geoip.UNKNOWN)
+        self.assertCountry('190.216.127.255', 'PE')
+        self.assertCountry('190.216.128.0', self.geoip.UNKNOWN)
+        self.assertCountry('192.168.0.0', 'EC')  # extremos enteros
+        self.assertCountry('192.168.0.255', 'EC')
+        self.assertCountry('192.168.1.0', self.geoip.UNKNOWN)
+        self.assertCountry('2800:e0::', 'CO')
+        self.assertCountry('2800:e0:ffff:ffff:ffff:ffff:ffff:ffff', 'CO')
+        self.assertCountry('2800:e1::', self.geoip.UNKNOWN)
+        self.assertCountry('2001:1388:abcd::1', 'PE')
+        self.assertCountry('0.0.0.0', self.geoip.UNKNOWN)
+        self.assertCountry('255.255.255.255', self.geoip.UNKNOWN)
+
+    def test_unknown_and_invalid_ips(self):
+        for ip in ('', '   ', 'abc', '999.1.1.1', '1.2.3', '1.2.3.4.5', '::ffff:zz', '2800:e0:::1',
+                   '200.0.0.1', '8.8.8.8', '::1'):
+            with self.subTest(ip=ip):
+                self.assertCountry(ip, self.geoip.UNKNOWN)
+        self.assertCountry(' 181.49.0.1 ', 'CO')
+
+    def test_ipv4_mapped_ipv6_uses_the_ipv4_ranges(self):
+        self.assertCountry('::ffff:181.49.0.1', 'CO')
+        self.assertCountry('::ffff:190.216.0.1', 'PE')
+        self.assertCountry('::ffff:b531:1', 'CO')  # 181.49.0.1 en hexadecimal
+        self.assertCountry('::ffff:8.8.8.8', self.geoip.UNKNOWN)
+
+    def test_load_rejects_foreign_binary(self):
+        path = os.path.join(self.tmp.name, 'other.bin')
+        with open(path, 'wb') as f:
+            f.write(b'NOTGEOIP' + bytes(16))
+        with self.assertRaises(ValueError):
+            self.geoip.GeoIPDatabase.load(path)
+
+    def test_benchmark_consistency_check(self):
+        rng = random.Random(42)
+        csv_path = os.path.join(self.tmp.name, 'synthetic.csv')
+        geoip_benchmark.build_synthetic_csv(csv_path, 2000, 1000, rng)
+        database = self.geoip.GeoIPDatabase.from_csv(csv_path)
+        database.save(self.bin_path)
+        compiled = self.geoip.GeoIPDatabase.load(self.bin_path)
+        ips = ['.'.join(str(rng.randrange(256)) for _ in range(4)) for _ in range(2000)]
+        ips += [f'2{rng.randrange(16 ** 3):03x}:{rng.randrange(16 ** 4):x}::{rng.randrange(16 ** 4):x}'
+                for _ in range(500)]
+        self.assertEqual(geoip_benchmark.inconsistent_ips(database, compiled, ips), [])
+        self.assertNotEqual({database.lookup(ip) for ip in ips}, {self.geoip.UNKNOWN})
+
+
+class TestGeoIP(GeoIPTestMixin, unittest.TestCase):
+    geoip = load_geoip(os.path.join(HERE, 'lambda', 'geoip.py'), 'geoip_arquitectura_micros')
+
+
+class TestPruebaFrontGeoIP(GeoIPTestMixin, unittest.TestCase):
+    geoip = load_geoip(os.path.join(HERE, os.pardir, 'prueba-front', 'lambda', 'geoip.py'), 'geoip_prueba_front')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
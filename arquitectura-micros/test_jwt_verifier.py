@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Pruebas del verificador JWT de los autorizadores (lambda/jwt_verifier.py): firma RS256,
+algoritmos no permitidos, claims, recarga limitada del JWKS y memo de claims hasta exp.
+Las claves RSA se generan en Python puro con los helpers de jwt_benchmark.py.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, 'lambda'))
+sys.path.insert(0, HERE)
+
+from fake_clock import FakeClock  # noqa: E402
+from jwt_benchmark import generate_rsa_key, sign_rs256  # noqa: E402
+from jwt_verifier import InvalidTokenError, JWKSCache, JWTVerifier, b64url_encode  # noqa: E402
+from ttl_cache import TTLCache  # noqa: E402
+
+ISSUER = 'https://cognito-idp.us-east-1.amazonaws.com/us-east-1_test'
+CLIENT_ID = 'test-client'
+NOW = 1_700_000_000
+REFRESH = 300
+
+_RNG = random.Random(7)
+KEY = generate_rsa_key(1024, _RNG)
+OTHER_KEY = generate_rsa_key(1024, _RNG)
+
+
+def encode(data):
+    return b64url_encode(json.dumps(data).encode())
+
+
+def sign(claims, kid='key-1', key=KEY, header=None):
+    header = header or {'alg': 'RS256', 'kid': kid, 'typ': 'JWT'}
+    n, _, private = key
+    signing_input = f'{encode(header)}.{encode(claims)}'
+    return f'{signing_input}.{b64url_encode(sign_rs256(signing_input.encode(), n, private))}'
+
+
+def claims(**overrides):
+    base = {'sub': 'user-1', 'iss': ISSUER, 'aud': CLIENT_ID, 'exp': NOW + 3600, 'iat': NOW,
+            'cognito:groups': ['compras']}
+    base.update(overrides)
+    return {key: value for key, value in base.items() if value is not None}
+
+
+def jwk(kid, key):
+    n, e, _ = key
+    return {'kty': 'RSA', 'use': 'sig', 'alg': 'RS256', 'kid': kid,
+            'n': b64url_encode(n.to_bytes((n.bit_length() + 7) // 8, 'big')),
+            'e': b64url_encode(e.to_bytes(3, 'big'))}
+
+
+class TestJWTVerifier(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.jwks_path = os.path.join(self.tmp.name, 'jwks.json')
+        self.write_jwks({'keys': [jwk('key-1', KEY)]})
+        # Un único reloj para el verificador, el JWKS y la caché de claims
+        self.clock = FakeClock(NOW)
+        self.jwks = JWKSCache(self.jwks_path, min_refresh_interval=REFRESH, clock=self.clock)
+        self.verifier = JWTVerifier(self.jwks, issuer=ISSUER, audience=CLIENT_ID, leeway=30,
+                                    claims_cache=TTLCache(max_entries=100, clock=self.clock), clock=self.clock)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_jwks(self, document):
+        with open(self.jwks_path, 'w') as f:
+            f.write(document if isinstance(document, str) else json.dumps(document))
+
+    def assertRejected(self, token, message):
+        with self.assertRaises(InvalidTokenError) as raised:
+            self.verifier.verify(token)
+        self.assertIn(message, str(raised.exception))
+
+    # -- firma y algoritmo --------------------------------------------------
+    def test_valid_token(self):
+        self.assertEqual(self.verifier.verify(sign(claims()))['cognito:groups'], ['compras'])
+
+    def test_tampered_payload_is_rejected(self):
+        header, _, signature = sign(claims()).split('.')
+        escalated = encode(claims(**{'cognito:groups': ['admin']}))
+        self.assertRejected(f'{header}.{escalated}.{signature}', 'Invalid JWT signature')
+
+    def test_tampered_signature_is_rejected(self):
+        header, payload, signature = sign(claims()).split('.')
+        forged = sign(claims(), key=OTHER_KEY).split('.')[2]
+        self.assertRejected(f'{header}.{payload}.{forged}', 'Invalid JWT signature')
+        self.assertRejected(f'{header}.{payload}.{signature[:-4]}', 'Invalid JWT signature')
+
+    def test_alg_none_and_hs256_are_rejected(self):
+        payload = encode(claims())
+        none_header = encode({'alg': 'none', 'kid': 'key-1'})
+        self.assertRejected(f'{none_header}.{payload}.', 'Unsupported JWT algorithm: none')
+
+        # HS256 firmado con la clave pública como secreto (confusión de algoritmos)
+        hs_header = encode({'alg': 'HS256', 'kid': 'key-1'})
+        secret = json.dumps(jwk('key-1', KEY)).encode()
+        mac = hmac.new(secret, f'{hs_header}.{payload}'.encode(), hashlib.sha256).digest()
+        self.assertRejected(f'{hs_header}.{payload}.{b64url_encode(mac)}', 'Unsupported JWT algorithm: HS256')
+
+    def test_non_string_kid_is_rejected(self):
+        for kid in (['key-1'], {'id': 'key-1'}, None, 1):
+            with self.subTest(kid=kid):
+                token = sign(claims(), header={'alg': 'RS256', 'kid': kid})
+                self.assertRejected(token, 'kid must be a string')
+
+    def test_malformed_tokens_are_rejected(self):
+        self.assertRejected('a.b', 'JWT must have 3 parts')
+        self.assertRejected('%%%.e30.', 'Malformed JWT')
+        self.assertRejected(f"{encode(['RS256'])}.{encode(claims())}.", 'must be objects')
+
+    # -- claims -----------------------------------------------------------------
+    def test_expiry_and_nbf_with_leeway(self):
+        self.assertTrue(self.verifier.verify(sign(claims(exp=NOW - 20))))
+        self.assertRejected(sign(claims(exp=NOW - 30)), 'JWT expired')
+        self.assertRejected(sign(claims(exp=None)), 'JWT without exp')
+        self.assertTrue(self.verifier.verify(sign(claims(nbf=NOW + 20))))
+        self.assertRejected(sign(claims(nbf=NOW + 31)), 'JWT not yet valid')
+
+    def test_wrong_issuer_or_audience(self):
+        self.assertRejected(sign(claims(iss='https://evil.example.com')), 'Unexpected issuer')
+        self.assertRejected(sign(claims(aud='other-client')), 'Unexpected audience')
+        self.assertTrue(self.verifier.verify(sign(claims(aud=['other-client', CLIENT_ID]))))
+
+    def test_access_token_client_id(self):
+        access = claims(aud=None, client_id=CLIENT_ID, token_use='access')
+        self.assertEqual(self.verifier.verify(sign(access))['client_id'], CLIENT_ID)
+        self.assertRejected(sign(claims(aud=None, client_id='other-client')), 'Unexpected audience')
+
+    # -- JWKS ---------------------------------------------------------------------
+    def test_unknown_kid_refetches_at_most_once_per_interval(self):
+        self.verifier.verify(sign(claims()))
+        self.assertEqual(self.jwks.fetches, 1)
+
+        unknown = sign(claims(sub='user-2'), kid='rotated', key=OTHER_KEY)
+        for _ in range(5):
+            self.assertRejected(unknown, 'Unknown signing key: rotated')
+        self.assertEqual(self.jwks.fetches, 1)
+
+        self.clock.advance(REFRESH)
+        for _ in range(5):
+            self.assertRejected(unknown, 'Unknown signing key: rotated')
+        self.assertEqual(self.jwks.fetches, 2)
+
+        # Rotación: la nueva clave se publica y se acepta tras el siguiente intervalo
+        self.write_jwks({'keys': [jwk('key-1', KEY), jwk('rotated', OTHER_KEY)]})
+        self.clock.advance(REFRESH - 1)
+        self.assertRejected(unknown, 'Unknown signing key')
+        self.clock.advance(1)
+        self.assertEqual(self.verifier.verify(unknown)['sub'], 'user-2')
+        self.assertEqual(self.jwks.fetches, 3)
+
+    def test_failed_fetch_keeps_previous_keys(self):
+        self.verifier.verify(sign(claims()))
+        self.write_jwks('{not json')
+        self.clock.advance(REFRESH)
+        self.assertRejected(sign(claims(), kid='rotated'), 'Unknown signing key')
+        self.assertEqual((self.jwks.fetches, self.jwks.fetch_errors), (2, 1))
+        self.assertEqual(self.verifier.verify(sign(claims(sub='user-3')))['sub'], 'user-3')
+
+    # -- memo de claims ----------------------------------------------------------
+    def test_claims_memo_expires_at_exp(self):
+        token = sign(claims(exp=NOW + 60))
+        self.verifier.verify(token)
+        self.verifier.verify(token)
+        self.assertEqual(self.verifier.claims_cache.stats()['hits'], 1)
+
+        self.clock.advance(60 + 30 - 1)
+        self.assertEqual(self.verifier.verify(token)['sub'], 'user-1')
+        self.clock.advance(1)
+        self.assertRejected(token, 'JWT expired')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Pruebas de las políticas comodín del autorizador: los statements generados para toda
+la API deben dar, en cada ruta y método, la misma decisión que la evaluación por methodArn.
+"""
+
+import fnmatch
+import itertools
+import os
+import sys
+import unittest
+
+# Agregar el directorio de la Lambda al path
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_DIR = os.path.join(BASE_DIR, 'lambda')
+sys.path.insert(0, LAMBDA_DIR)
+
+from policy_engine import HTTP_METHODS, PolicyEngine, compile_policies  # noqa: E402
+
+ARN_PREFIX = 'arn:aws:execute-api:us-east-1:123456789012:abc123/prod'
+COUNTRY_BY_IP = {'181.49.0.1': 'CO', '200.37.0.1': 'PE', '8.8.8.8': 'US', '10.1.2.3': 'UNKNOWN'}
+
+GROUP_POLICIES = {
+    'admin': {'countries': ['CO', 'PE', 'EC', 'MX'], 'hours': {'start': 0, 'end': 23}, 'ip_whitelist': None,
+              'description': 'Acceso completo 24/7', 'apis': ['*']},
+    'compras': {'countries': ['CO', 'PE', 'EC', 'MX'], 'hours': {'start': 6, 'end': 22},
+                'ip_whitelist': ['10.0.0.0/8'], 'description': 'Horario laboral, red corporativa',
+                'apis': ['/purchases/*', '/suppliers/*', '/products/*']},
+    'ventas': {'countries': ['CO', 'PE', 'EC', 'MX'], 'hours': {'start': 5, 'end': 23}, 'ip_whitelist': None,
+               'description': 'Horario extendido para ventas',
+               'apis': ['/sales/*', '/clients/*', '/orders/*', '/visits/*']},
+    'clientes': {'countries': ['CO'], 'hours': {'start': 6, 'end': 22}, 'ip_whitelist': None,
+                 'description': 'Horario comercial, solo Colombia',
+                 'apis': ['/products/available', '/orders/create', '/deliveries/track']},
+}
+
+GROUP_SETS = [[], ['otro'], ['admin'], ['compras'], ['ventas'], ['clientes'], ['clientes', 'ventas'],
+              ['ventas', 'clientes'], ['compras', 'clientes'], ['clientes', 'compras'], ['clientes', 'admin'],
+              ['admin', 'compras'], ['otro', 'ventas', 'compras']]
+PATHS = ['/products', '/products/available', '/products/42', '/orders/create', '/orders/9/items',
+         '/purchases/1', '/deliveries/track', '/deliveries/track/1', '/reports', '/']
+HOURS = [3, 5, 12, 23]
+IPS = [None, '181.49.0.1', '200.37.0.1', '8.8.8.8', '10.1.2.3']
+
+
+def method_arn(method, path):
+    return f'{ARN_PREFIX}/{method}{path}'
+
+
+def iam_allows(statements, arn):
+    """Evaluación IAM: un Deny explícito gana; si no, hace falta un Allow que coincida."""
+    def matches(statement):
+        resources = statement['Resource']
+        if isinstance(resources, str):
+            resources = [resources]
+        return any(fnmatch.fnmatchcase(arn, resource) for resource in resources)
+
+    if any(s['Effect'] == 'Deny' and matches(s) for s in statements):
+        return False
+    return any(s['Effect'] == 'Allow' and matches(s) for s in statements)
+
+
+class TestWildcardPolicies(unittest.TestCase):
+
+    def engine(self, enforce_apis):
+        return PolicyEngine(compile_policies(GROUP_POLICIES), resolve_country=COUNTRY_BY_IP.__getitem__,
+                            enforce_apis=enforce_apis)
+
+    def assert_equivalent(self, enforce_apis):
+        engine = self.engine(enforce_apis)
+        fallbacks = 0
+        for groups, hour, ip in itertools.product(GROUP_SETS, HOURS, IPS):
+            decision, statements = engine.authorize(groups, hour, ip, PATHS[0], method_arn('GET', PATHS[0]))
+            self.assertEqual(decision, engine.evaluate(groups, hour, ip, PATHS[0]))
+            if statements is None:
+                fallbacks += 1
+                continue
+            for method, path in itertools.product(HTTP_METHODS, PATHS):
+                with self.subTest(groups=groups, hour=hour, ip=ip, method=method, path=path):
+                    self.assertEqual(iam_allows(statements, method_arn(method, path)),
+                                     engine.evaluate(groups, hour, ip, path)['allowed'])
+        return fallbacks
+
+    def test_route_independent_decisions_cover_the_whole_api(self):
+        self.assertEqual(self.assert_equivalent(enforce_apis=False), 0)
+
+    def test_statements_match_per_arn_evaluation_with_api_patterns(self):
+        fallbacks = self.assert_equivalent(enforce_apis=True)
+        total = len(GROUP_SETS) * len(HOURS) * len(IPS)
+        self.assertLess(fallbacks, total // 10)
+
+    def test_wildcard_does_not_leak_across_path_segments(self):
+        engine = self.engine(enforce_apis=True)
+        _, statements = engine.authorize(['clientes'], 12, '181.49.0.1', '/products/available',
+                                         method_arn('GET', '/products/available'))
+        self.assertTrue(iam_allows(statements, method_arn('POST', '/orders/create')))
+        self.assertFalse(iam_allows(statements, method_arn('GET', '/admin/products/available')))
+        self.assertFalse(iam_allows(statements, method_arn('GET', '/orders/create/extra')))
+
+    def test_denied_group_overlapping_an_earlier_allowed_group_falls_back_to_method_arn(self):
+        engine = self.engine(enforce_apis=True)
+        # compras se permite (IP corporativa); clientes se deniega (no es CO) y comparte /products/available
+        decision, statements = engine.authorize(['compras', 'clientes'], 12, '10.1.2.3', '/products/available',
+                                                method_arn('GET', '/products/available'))
+        self.assertTrue(decision['allowed'])
+        self.assertIsNone(statements)
+
+    def test_same_token_from_two_ips_gets_separate_cache_entries(self):
+        engine = self.engine(enforce_apis=True)
+        arn = method_arn('GET', '/products/42')
+        # Caché de API Gateway indexada por las fuentes de identidad (token + IP de origen)
+        cache = {}
+        for ip in ('10.1.2.3', '181.49.0.1'):
+            cache[('Bearer token-compras', ip)] = engine.authorize(['compras'], 12, ip, '/products/42', arn)
+
+        # El mismo token: permitido desde la red corporativa, denegado fuera de la whitelist
+        _, corporate = cache[('Bearer token-compras', '10.1.2.3')]
+        _, outside = cache[('Bearer token-compras', '181.49.0.1')]
+        self.assertTrue(iam_allows(corporate, arn))
+        self.assertFalse(iam_allows(outside, arn))
+
+        with open(os.path.join(BASE_DIR, 'stack.py')) as f:
+            stack_source = f.read()
+        self.assertIn('IdentitySource.context("identity.sourceIp")', stack_source)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
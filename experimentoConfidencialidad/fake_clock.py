@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+Reloj controlable compartido por las pruebas (cachés con TTL, circuit breaker, JWKS):
+se inyecta como `clock` y se adelanta a mano para no esperar los tiempos reales.
+"""
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+📝 Logging estructurado y muestreado para los autorizadores
+==========================================================
+Cada línea es un JSON compacto. Por petición (begin) se decide una vez qué niveles de
+detalle se registran:
+
+- DEBUG / INFO se muestrean por petición (LOG_SAMPLE_DEBUG / LOG_SAMPLE_INFO): una
+  petición muestreada conserva todo su rastro, las demás no pagan ni el formateo.
+- WARNING / ERROR se registran siempre.
+- El mensaje usa argumentos estilo %: solo se formatea si la línea se emite. Los campos
+  pueden ser funciones sin argumentos (valores costosos, p. ej. stats() de una caché).
+- Tokens (JWT, Bearer), claves sensibles (Authorization, email, password...) y correos se
+  ocultan; las IPs se reducen a /24 (IPv4) o /64 (IPv6) salvo LOG_MASK_IPS=false.
+- decision() emite un único registro `authz_decision` por petición (siempre, salvo
+  LOG_DECISIONS=false) con los campos acumulados con add() y la duración.
+
+Configuración (from_environment):
+    LOG_LEVEL         nivel del logger raíz (por defecto el que ya tenga)
+    LOG_SAMPLE_INFO   fracción de peticiones con logs INFO de detalle (0.01)
+    LOG_SAMPLE_DEBUG  fracción de peticiones con logs DEBUG, p. ej. el evento completo (0)
+    LOG_DECISIONS     'false' para no emitir el registro de decisión
+    LOG_MASK_IPS      'false' para registrar IPs completas
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import time
+
+DEBUG, INFO, WARNING, ERROR = logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR
+
+SENSITIVE_KEYS = frozenset({
+    'authorization', 'authorizationtoken', 'token', 'jwt', 'access_token', 'id_token', 'refresh_token',
+    'password', 'secret', 'cookie', 'set-cookie', 'x-api-key', 'x-amz-security-token', 'email', 'phone_number',
+})
+IP_KEYS = frozenset({'ip', 'user_ip', 'source_ip', 'sourceip', 'client_ip', 'x-forwarded-for', 'x-test-ip',
+                     'x-real-ip', 'x-client-ip'})
+REDACTED = '[REDACTED]'
+
+_JWT = re.compile(r'eyJ[\w-]*\.[\w-]*\.[\w-]*')
+_BEARER = re.compile(r'(?i)\bbearer\s+[^\s"\\]+')
+_EMAIL = re.compile(r'[\w.+-]+@([\w-]+\.[\w.-]+)')
+_SUSPECT = re.compile(r'eyJ|@|(?i:bearer)')  # un solo search descarta la mayoría de los textos
+_COMPACT = (',', ':')
+_SCALARS = (int, float, bool)
+
+
+def mask_ip(value):
+    """IPv4 → a.b.c.0/24, IPv6 → primeros 4 grupos /64; listas X-Forwarded-For elemento a elemento."""
+    if not isinstance(value, str):
+        return value
+    if ',' in value:
+        return ', '.join(mask_ip(part.strip()) for part in value.split(','))
+    parts = value.split('.')
+    if len(parts) == 4:
+        return '.'.join(parts[:3]) + '.0/24'
+    if ':' in value:
+        return ':'.join(value.split(':')[:4]) + '::/64'
+    return value
+
+
+def redact_text(text):
+    if not _SUSPECT.search(text):
+        return text
+    text = _JWT.sub('[JWT]', text)
+    text = _BEARER.sub('Bearer [REDACTED]', text)
+    return _EMAIL.sub(r'***@\1', text)
+
+
+def redact(value, mask_ips=True, texts=True):
+    """
+    Copia de `value` sin secretos ni PII (dicts y listas recursivamente). Con texts=False
+    solo aplica las reglas por clave: el logger pasa redact_text una vez sobre la línea JSON.
+    """
+    if isinstance(value, dict):
+        clean = {}
+        for key, item in value.items():
+            lowered = key.lower() if isinstance(key, str) else key
+            if lowered in SENSITIVE_KEYS:
+                clean[key] = REDACTED
+            elif mask_ips and lowered in IP_KEYS:
+                clean[key] = mask_ip(item)
+            elif item is None or type(item) in _SCALARS:
+                clean[key] = item
+            elif type(item) is str:
+                clean[key] = redact_text(item) if texts else item
+            else:
+                clean[key] = redact(item, mask_ips, texts)
+        return clean
+    if isinstance(value, (list, tuple)):
+        return [redact(item, mask_ips, texts) for item in value]
+    if isinstance(value, str) and texts:
+        return redact_text(value)
+    return value
+
+
+class AuthzLogger:
+    """Logger por petición sobre `logging` (una línea JSON por registro)."""
+
+    def __init__(self, logger=None, sample_rates=None, decisions=True, mask_ips=True,
+                 rng=random.random, clock=time.perf_counter):
+        self.logger = logger or logging.getLogger()
+        self.sample_rates = {DEBUG: 0.0, INFO: 0.01}
+        self.sample_rates.update(sample_rates or {})
+        self.decisions = decisions
+        self.mask_ips = mask_ips
+        self._rng = rng
+        self._clock = clock
+        self.request_id = None
+        self._sampled = set()
+        self._fields = {}
+        self._start = clock()
+        self._decided = False
+
+    # -- ciclo de la petición ------------------------------------------
+    def begin(self, request_id=None):
+        """Nueva petición: decide el muestreo y limpia los campos del registro de decisión."""
+        self.request_id = request_id
+        self._sampled = {level for level, rate in self.sample_rates.items()
+                         if rate > 0 and (rate >= 1 or self._rng() < rate)}
+        self._fields = {}
+        self._start = self._clock()
+        self._decided = False
+
+    def enabled(self, level):
+        if level < WARNING and level not in self._sampled:
+            return False
+        return self.logger.isEnabledFor(level)
+
+    def add(self, **fields):
+        """Campos para el registro de decisión de esta petición."""
+        self._fields.update(fields)
+
+    def decision(self, effect, principal, **fields):
+        """Registro único `authz_decision` de la petición (las llamadas siguientes se ignoran)."""
+        if self._decided:
+            return
+        self._decided = True
+        if not self.decisions or not self.logger.isEnabledFor(INFO):
+            return
+        record = {'event': 'authz_decision', 'effect': effect, 'principal': principal,
+                  'duration_ms': round((self._clock() - self._start) * 1000, 3)}
+        record.update(self._fields)
+        record.update(fields)
+        self._write(INFO, record)
+
+    def event(self, name, **fields):
+        """Registro INFO sin muestreo para eventos poco frecuentes (p. ej. métricas periódicas)."""
+        if self.logger.isEnabledFor(INFO):
+            record = {'event': name}
+            record.update(fields)
+            self._write(INFO, record)
+
+    # -- niveles -----------------------------------------------------------
+    def debug(self, msg, *args, **fields):
+        if self.enabled(DEBUG):
+            self._log(DEBUG, msg, args, fields)
+
+    def info(self, msg, *args, **fields):
+        if self.enabled(INFO):
+            self._log(INFO, msg, args, fields)
+
+    def warning(self, msg, *args, **fields):
+        if self.logger.isEnabledFor(WARNING):
+            self._log(WARNING, msg, args, fields)
+
+    def error(self, msg, *args, **fields):
+        if self.logger.isEnabledFor(ERROR):
+            self._log(ERROR, msg, args, fields)
+
+    # -- salida --------------------------------------------------------------
+    def _log(self, level, msg, args, fields):
+        record = {'level': logging.getLevelName(level), 'msg': msg % args if args else msg}
+        for key, value in fields.items():
+            record[key] = value() if callable(value) else value
+        self._write(level, record)
+
+    def _write(self, level, record):
+        if self.request_id:
+            record['request_id'] = self.request_id
+        line = json.dumps(redact(record, self.mask_ips, texts=False), separators=_COMPACT,
+                          ensure_ascii=False, default=str)
+        self.logger.log(level, redact_text(line))
+
+
+def from_environment(logger=None):
+    logger = logger or logging.getLogger()
+    if os.environ.get('LOG_LEVEL'):
+        logger.setLevel(os.environ['LOG_LEVEL'].upper())
+    return AuthzLogger(
+        logger,
+        sample_rates={DEBUG: float(os.environ.get('LOG_SAMPLE_DEBUG', '0')),
+                      INFO: float(os.environ.get('LOG_SAMPLE_INFO', '0.01'))},
+        decisions=os.environ.get('LOG_DECISIONS', 'true').lower() == 'true',
+        mask_ips=os.environ.get('LOG_MASK_IPS', 'true').lower() == 'true',
+    )
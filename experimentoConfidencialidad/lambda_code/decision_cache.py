@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+🗄️ Caché compartida (segundo nivel) de perfiles y decisiones
+================================================================
+TOKEN_CACHE / USER_CACHE viven en cada contenedor: con scale-out la mayoría de las
+invocaciones caen en contenedores fríos y vuelven a resolver el perfil. Esta caché
+guarda perfiles y decisiones en un backend compartido entre contenedores:
+
+- redis     Redis / ElastiCache (AUTH_L2_REDIS_URL), requiere el paquete `redis`
+- dynamodb  tabla DynamoDB (AUTH_L2_TABLE) con clave `pk` (S) y TTL en `expires_at`
+- memory    sustituto local en memoria (pruebas y ejecución local)
+
+Las decisiones se indexan por (sub, hash de grupos, IP de origen, hora UTC). Todas las
+claves llevan la versión de políticas: la estática (AUTH_POLICY_VERSION o hash del
+código del autorizador) más un contador en el backend que `invalidate()` incrementa,
+así un cambio de políticas deja inalcanzables las entradas anteriores en todos los
+contenedores sin borrarlas. Un fallo del backend se trata como fallo de caché.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from ttl_cache import TTLCache
+
+logger = logging.getLogger()
+
+
+# ----------------------------------------------------------------------
+# Backends
+# ----------------------------------------------------------------------
+class InMemoryBackend:
+    """Sustituto local del backend compartido (varias DecisionCache pueden compartirlo)."""
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._items = {}
+        self._counters = {}
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is None or item[0] <= self._clock():
+            return None
+        return item[1]
+
+    def set(self, key, value, ttl):
+        self._items[key] = (self._clock() + ttl, value)
+
+    def get_counter(self, key):
+        return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisBackend:
+    def __init__(self, url, client=None):
+        if client is None:
+            import redis  # opcional: solo si AUTH_L2_CACHE=redis
+            client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self.client = client
+
+    def get(self, key):
+        value = self.client.get(key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, key, value, ttl):
+        self.client.setex(key, max(1, int(ttl)), value)
+
+    def get_counter(self, key):
+        return int(self.client.get(key) or 0)
+
+    def incr(self, key):
+        return int(self.client.incr(key))
+
+
+class DynamoDBBackend:
+    """
+    Tabla con clave de partición `pk` (S). El TTL nativo de DynamoDB borra tarde (hasta
+    horas), por eso `get` también descarta los ítems con `expires_at` vencido.
+    """
+
+    def __init__(self, table_name, client=None, clock=time.time):
+        if client is None:
+            import boto3
+            client = boto3.client('dynamodb')
+        self.client = client
+        self.table_name = table_name
+        self._clock = clock
+
+    def get(self, key):
+        item = self.client.get_item(TableName=self.table_name, Key={'pk': {'S': key}}).get('Item')
+        if not item or int(item['expires_at']['N']) <= self._clock():
+            return None
+        return item['value']['S']
+
+    def set(self, key, value, ttl):
+        self.client.put_item(TableName=self.table_name, Item={
+            'pk': {'S': key},
+            'value': {'S': value},
+            'expires_at': {'N': str(int(self._clock() + ttl))},
+        })
+
+    def get_counter(self, key):
+        item = self.client.get_item(TableName=self.table_name, Key={'pk': {'S': key}}).get('Item')
+        return int(item['counter']['N']) if item and 'counter' in item else 0
+
+    def incr(self, key):
+        response = self.client.update_item(
+            TableName=self.table_name, Key={'pk': {'S': key}},
+            UpdateExpression='ADD #c :one', ExpressionAttributeNames={'#c': 'counter'},
+            ExpressionAttributeValues={':one': {'N': '1'}}, ReturnValues='UPDATED_NEW')
+        return int(response['Attributes']['counter']['N'])
+
+
+# ----------------------------------------------------------------------
+# Claves
+# ----------------------------------------------------------------------
+def groups_hash(groups):
+    return hashlib.sha256(','.join(sorted(groups or [])).encode()).hexdigest()[:16]
+
+
+def hour_bucket(when):
+    """Hora UTC (incluye la fecha: el día de la semana también cambia la decisión)."""
+    return when.strftime('%Y%m%d%H')
+
+
+# ----------------------------------------------------------------------
+# Caché de dos niveles
+# ----------------------------------------------------------------------
+class DecisionCache:
+    """L1 pequeña en el contenedor + backend compartido (L2)."""
+
+    def __init__(self, backend, namespace='authz', policy_version='0', ttl=300, l1_ttl=60,
+                 l1_max_entries=5000, version_check_interval=30, clock=time.monotonic):
+        self.backend = backend
+        self.namespace = namespace
+        self.policy_version = policy_version
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self._clock = clock
+        self.l1 = TTLCache(max_entries=l1_max_entries, ttl=min(l1_ttl, ttl), clock=clock)
+        self._version_key = f'{namespace}:policy-version'
+        self._dynamic_version = None
+        self._version_checked_at = None
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.errors = 0
+
+    # -- versión de políticas ------------------------------------------
+    def version(self):
+        now = self._clock()
+        if self._version_checked_at is None or now - self._version_checked_at >= self.version_check_interval:
+            self._version_checked_at = now
+            try:
+                self._dynamic_version = self.backend.get_counter(self._version_key)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"L2 cache: error reading policy version: {e}")
+                if self._dynamic_version is None:
+                    self._dynamic_version = 0
+        return f'{self.policy_version}.{self._dynamic_version}'
+
+    def invalidate(self):
+        """Invalida perfiles y decisiones de todos los contenedores (nueva versión de políticas)."""
+        self._dynamic_version = self.backend.incr(self._version_key)
+        self._version_checked_at = self._clock()
+        self.l1.clear()
+        return self.version()
+
+    # -- acceso genérico -------------------------------------------------
+    def _key(self, kind, *parts):
+        return ':'.join((self.namespace, f'v{self.version()}', kind) + parts)
+
+    def _get(self, key):
+        value = self.l1.get(key)
+        if value is not None:
+            return value
+        try:
+            raw = self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"L2 cache: error reading {key}: {e}")
+            return None
+        if raw is None:
+            self.l2_misses += 1
+            return None
+        self.l2_hits += 1
+        value = json.loads(raw)
+        self.l1.set(key, value)
+        return value
+
+    def _set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        self.l1.set(key, value, ttl=min(ttl, self.l1.ttl))
+        try:
+            self.backend.set(key, json.dumps(value, default=str), ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"L2 cache: error writing {key}: {e}")
+
+    # -- perfiles y decisiones -------------------------------------------
+    def get_profile(self, username):
+        return self._get(self._key('profile', username))
+
+    def set_profile(self, username, profile):
+        self._set(self._key('profile', username), profile)
+
+    def decision_key(self, sub, groups, source_ip, when):
+        # IP completa: el país (geolocalización por IP) y el tipo de IP se resuelven por dirección
+        return self._key('decision', sub, groups_hash(groups), source_ip or 'none', hour_bucket(when))
+
+    def get_decision(self, key):
+        return self._get(key)
+
+    def set_decision(self, key, decision):
+        self._set(key, decision)
+
+    def stats(self):
+        return {'l1': self.l1.stats(), 'l2_hits': self.l2_hits, 'l2_misses': self.l2_misses,
+                'errors': self.errors, 'version': self.version()}
+
+
+def from_environment(policy_version):
+    """DecisionCache según AUTH_L2_CACHE (redis | dynamodb | memory), o None si no está habilitada."""
+    kind = os.environ.get('AUTH_L2_CACHE', 'none').lower()
+    if kind in ('', 'none'):
+        return None
+    try:
+        if kind == 'redis':
+            backend = RedisBackend(os.environ['AUTH_L2_REDIS_URL'])
+        elif kind == 'dynamodb':
+            backend = DynamoDBBackend(os.environ['AUTH_L2_TABLE'])
+        elif kind == 'memory':
+            backend = InMemoryBackend()
+        else:
+            raise ValueError(f'unknown backend {kind!r}')
+    except Exception as e:
+        logger.error(f"L2 cache disabled: {e}")
+        return None
+    return DecisionCache(
+        backend,
+        namespace=os.environ.get('AUTH_L2_NAMESPACE', 'medisupply-authz'),
+        policy_version=policy_version,
+        ttl=int(os.environ.get('AUTH_L2_TTL_SECONDS', '300')),
+        l1_ttl=int(os.environ.get('AUTH_L2_LOCAL_TTL_SECONDS', '60')),
+    )
@@ -5,39 +5,67 @@ Implementa validación JWT real y parámetros dinámicos desde Cognito
 """
 
 import json
-import boto3
 from datetime import datetime, timezone, timedelta
 import logging
 import os
 import hashlib
 import base64
-import urllib.request
-import urllib.parse
+
+import authz_log
+import decision_cache
+import jwt_verifier
+from ttl_cache import TTLCache
 # Removidas dependencias problemáticas: jwt, requests, pytz, ipaddress
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Clientes AWS
-cognito_client = boto3.client('cognito-idp')
+# Logs JSON compactos: detalle muestreado por petición (LOG_SAMPLE_INFO / LOG_SAMPLE_DEBUG),
+# sin tokens ni PII, y un único registro `authz_decision` por petición
+LOG = authz_log.from_environment(logger)
+
+# Clientes AWS: se crean en la primera llamada que los necesite (importar boto3 y crear el
+# cliente cuesta cientos de ms de cold start y ningún camino actual consulta Cognito)
+_cognito_client = None
+
+def get_cognito_client():
+    """Cliente cognito-idp del contenedor (perezoso)"""
+    global _cognito_client
+    if _cognito_client is None:
+        import boto3
+        _cognito_client = boto3.client('cognito-idp')
+    return _cognito_client
+
+# CACHE GLOBAL para tokens y usuarios (mejora rendimiento), acotada en tamaño y tiempo:
+# LRU + heap de vencimientos, la memoria del contenedor no crece con tokens distintos
+CACHE_TTL = int(os.environ.get('AUTH_CACHE_TTL_SECONDS', '300'))  # 5 minutos de cache
+TOKEN_CACHE = TTLCache(max_entries=int(os.environ.get('TOKEN_CACHE_MAX_ENTRIES', '10000')), ttl=CACHE_TTL)
+USER_CACHE = TTLCache(max_entries=int(os.environ.get('USER_CACHE_MAX_ENTRIES', '5000')), ttl=CACHE_TTL)
 
-# CACHE GLOBAL para tokens y usuarios (mejora rendimiento)
-TOKEN_CACHE = {}  # Cache de tokens validados
-USER_CACHE = {}   # Cache de perfiles de usuario
-CACHE_TTL = 300   # 5 minutos de cache
+# Verificación de firma con JWKS en memoria (claves por kid, claims memorizados hasta exp).
+# None si no hay USER_POOL_ID / JWKS_URL / JWKS_PATH: se conserva la decodificación simple
+JWT_VERIFIER = jwt_verifier.from_environment()
+
+# Caché compartida entre contenedores (segundo nivel) de perfiles y decisiones: AUTH_L2_CACHE =
+# redis | dynamodb | memory (por defecto deshabilitada). La versión estática invalida las entradas
+# cuando cambia el código de políticas; SHARED_CACHE.invalidate() las invalida en caliente
+with open(__file__, 'rb') as _source:
+    POLICY_VERSION = os.environ.get('AUTH_POLICY_VERSION') or hashlib.sha256(_source.read()).hexdigest()[:12]
+SHARED_CACHE = decision_cache.from_environment(POLICY_VERSION)
 
 def lambda_handler(event, context):
     """Handler principal con validación JWT real de Cognito"""
     start_time = datetime.now()
+    LOG.begin(getattr(context, 'aws_request_id', None))
     
     try:
-        logger.info(f"🔍 Evento recibido para MeddySupply Real")
-        logger.info(f"📋 Estructura del evento: {json.dumps(event, indent=2)}")
+        LOG.debug("📋 Evento recibido para MeddySupply Real", event=event)
         
         # Extraer información básica
         token = extract_token(event)
         method_arn = event.get('methodArn', '')
         source_ip = get_source_ip(event)
+        LOG.add(ip=source_ip)
         
         # Validación de token
         if not token:
@@ -50,18 +78,38 @@ def lambda_handler(event, context):
         
         # 2. OBTENER PARÁMETROS DINÁMICOS DESDE COGNITO
         username = jwt_claims.get('cognito:username') or jwt_claims.get('username')
-        user_profile = get_user_profile_from_cognito(username)
-        if not user_profile:
-            return create_deny_policy(method_arn, "NO_USER_PROFILE", f"Perfil no encontrado para {username}")
-        
-        # 3. EVALUACIÓN DE SEGURIDAD CON PARÁMETROS REALES
-        evaluation = evaluate_security_with_cognito_data(user_profile, source_ip)
+        sub = jwt_claims.get('sub') or username
+        groups = jwt_claims.get('cognito:groups', [])
+        decision_key = None
+        cached_decision = None
+        if SHARED_CACHE is not None:
+            decision_key = SHARED_CACHE.decision_key(sub, groups, source_ip, datetime.now(timezone.utc))
+            cached_decision = SHARED_CACHE.get_decision(decision_key)
+        
+        if cached_decision is not None:
+            LOG.info("🚀 Decision cache HIT: %s", username)
+            LOG.add(decision_cache='hit')
+            user_profile = cached_decision['profile']
+            evaluation = cached_decision['evaluation']
+        else:
+            user_profile = get_user_profile_from_cognito(username)
+            if not user_profile:
+                return create_deny_policy(method_arn, "NO_USER_PROFILE", f"Perfil no encontrado para {username}")
+            
+            # 3. EVALUACIÓN DE SEGURIDAD CON PARÁMETROS REALES
+            evaluation = evaluate_security_with_cognito_data(user_profile, source_ip)
+            
+            # Solo si la evaluación cayó en la misma hora de la clave
+            if (decision_key and decision_cacheable(evaluation) and
+                    decision_key == SHARED_CACHE.decision_key(sub, groups, source_ip, datetime.now(timezone.utc))):
+                SHARED_CACHE.set_decision(decision_key, {'profile': user_profile, 'evaluation': evaluation})
         
         # Calcular tiempo de respuesta
         response_time = int((datetime.now() - start_time).total_seconds() * 1000)
         
         # Log para experimento
-        logger.info(f"⚡ MEDISUPPLY_REAL: {username} - {evaluation['decision']} - {response_time}ms")
+        LOG.add(decision=evaluation['decision'], risk_score=evaluation.get('risk_score'),
+                reason=evaluation.get('reason'), response_time_ms=response_time)
         
         # Decidir acceso
         if evaluation['decision'] == 'allow':
@@ -72,7 +120,7 @@ def lambda_handler(event, context):
             return create_deny_policy(method_arn, evaluation['reason'], evaluation['message'])
             
     except Exception as e:
-        logger.error(f"❌ Error: {str(e)}")
+        LOG.error("❌ Error: %s", e)
         return create_deny_policy(method_arn, "INTERNAL_ERROR", f"Error: {str(e)}")
 
 def validate_cognito_jwt_real(token):
@@ -84,19 +132,14 @@ def validate_cognito_jwt_real(token):
         
         # 1. VERIFICAR CACHE PRIMERO
         cache_key = hashlib.md5(token.encode()).hexdigest()
-        if cache_key in TOKEN_CACHE:
-            cached_data = TOKEN_CACHE[cache_key]
-            if datetime.now().timestamp() - cached_data['timestamp'] < CACHE_TTL:
-                logger.info(f"🚀 Token cache HIT: {cached_data['username']}")
-                return cached_data['claims']
-            else:
-                # Cache expirado
-                del TOKEN_CACHE[cache_key]
-                logger.info("♻️ Cache de token expirado, renovando...")
+        cached_data = TOKEN_CACHE.get(cache_key)
+        if cached_data is not None:
+            LOG.info("🚀 Token cache HIT: %s", cached_data['username'])
+            return cached_data['claims']
         
         # 2. Para testing: permitir tokens demo 
         if token.startswith('demo.'):
-            logger.info(f"🧪 Token demo detectado: {token}")
+            LOG.info("🧪 Token demo detectado")
             claims = {
                 'cognito:username': token.replace('.', '_'),
                 'username': token.replace('.', '_'),
@@ -106,19 +149,41 @@ def validate_cognito_jwt_real(token):
             }
             
             # Guardar en cache
-            TOKEN_CACHE[cache_key] = {
+            TOKEN_CACHE.set(cache_key, {
                 'claims': claims,
                 'username': claims['username'],
                 'timestamp': datetime.now().timestamp()
-            }
+            })
             return claims
         
-        # 3. VALIDACIÓN JWT SIMPLIFICADA (sin verificación cryptográfica)
+        # 3. VERIFICACIÓN CRIPTOGRÁFICA (RS256 contra el JWKS del User Pool)
+        if JWT_VERIFIER is not None:
+            try:
+                payload = JWT_VERIFIER.verify(token)
+            except jwt_verifier.InvalidTokenError as e:
+                LOG.error("❌ JWT rechazado: %s", e)
+                return None
+            
+            # Access tokens traen `username`; ID tokens, `cognito:username`
+            username = payload.get('cognito:username', payload.get('username', payload.get('sub', 'unknown')))
+            LOG.info("✅ JWT verificado: %s", username)
+            
+            # El verificador ya memoriza los claims hasta `exp` (no se usa TOKEN_CACHE)
+            return {
+                'cognito:username': username,
+                'username': username,
+                'email': payload.get('email', ''),
+                'sub': payload.get('sub', ''),
+                'exp': payload['exp'],
+                'token_type': 'cognito_jwt'
+            }
+        
+        # 4. Sin JWKS: VALIDACIÓN JWT SIMPLIFICADA (sin verificación cryptográfica)
         try:
             # Decodificar payload JWT manualmente (base64)
             parts = token.split('.')
             if len(parts) != 3:
-                logger.error("❌ JWT mal formado - debe tener 3 partes")
+                LOG.error("❌ JWT mal formado - debe tener 3 partes")
                 return None
             
             # Decodificar payload (segunda parte)
@@ -128,7 +193,7 @@ def validate_cognito_jwt_real(token):
             payload_bytes = base64.urlsafe_b64decode(payload_b64)
             payload = json.loads(payload_bytes.decode('utf-8'))
             
-            logger.info(f"✅ JWT decodificado: {payload.get('cognito:username', payload.get('sub', 'unknown'))}")
+            LOG.info("✅ JWT decodificado: %s", payload.get('cognito:username', payload.get('sub', 'unknown')))
             
             # Construir claims
             claims = {
@@ -142,43 +207,49 @@ def validate_cognito_jwt_real(token):
             
             # Verificar expiración básica
             if claims['exp'] > 0 and claims['exp'] < datetime.now().timestamp():
-                logger.error("❌ Token JWT expirado")
+                LOG.error("❌ Token JWT expirado")
                 return None
             
-            # Guardar en cache
-            TOKEN_CACHE[cache_key] = {
+            # Guardar en cache (nunca más allá del exp del token)
+            ttl = CACHE_TTL
+            if claims['exp'] > 0:
+                ttl = min(ttl, claims['exp'] - datetime.now().timestamp())
+            TOKEN_CACHE.set(cache_key, {
                 'claims': claims,
                 'username': claims['username'],
                 'timestamp': datetime.now().timestamp()
-            }
+            }, ttl=ttl)
             
             return claims
             
         except Exception as e:
-            logger.error(f"❌ Error decodificando JWT manualmente: {str(e)}")
+            LOG.error("❌ Error decodificando JWT manualmente: %s", e)
             return None
         
     except Exception as e:
-        logger.error(f"❌ Error validando JWT: {str(e)}")
+        LOG.error("❌ Error validando JWT: %s", e)
         return None
 
 def get_user_profile_from_cognito(username):
     """Obtener perfil de usuario REAL desde Cognito con CACHE"""
     try:
         # 1. VERIFICAR CACHE DE USUARIO PRIMERO
-        if username in USER_CACHE:
-            cached_user = USER_CACHE[username]
-            if datetime.now().timestamp() - cached_user['timestamp'] < CACHE_TTL:
-                logger.info(f"🚀 User cache HIT: {username}")
-                return cached_user['profile']
-            else:
-                # Cache expirado
-                del USER_CACHE[username]
-                logger.info(f"♻️ Cache de usuario expirado para {username}")
-        
-        # 2. Para testing: usar datos demo para tokens demo
+        cached_user = USER_CACHE.get(username)
+        if cached_user is not None:
+            LOG.info("🚀 User cache HIT: %s", username)
+            return cached_user['profile']
+        
+        # 2. CACHE COMPARTIDA ENTRE CONTENEDORES (si está habilitada)
+        if SHARED_CACHE is not None:
+            shared_profile = SHARED_CACHE.get_profile(username)
+            if shared_profile is not None:
+                LOG.info("🚀 Shared user cache HIT: %s", username)
+                USER_CACHE.set(username, {'profile': shared_profile, 'timestamp': datetime.now().timestamp()})
+                return shared_profile
+        
+        # 3. Para testing: usar datos demo para tokens demo
         if username.startswith('demo_'):
-            logger.info(f"🧪 Perfil demo para: {username}")
+            LOG.info("🧪 Perfil demo para: %s", username)
             
             # Configurar diferentes perfiles según el token
             if 'admin' in username:
@@ -222,15 +293,17 @@ def get_user_profile_from_cognito(username):
             }
             
             # Guardar en cache
-            USER_CACHE[username] = {
+            USER_CACHE.set(username, {
                 'profile': profile,
                 'timestamp': datetime.now().timestamp()
-            }
+            })
+            if SHARED_CACHE is not None:
+                SHARED_CACHE.set_profile(username, profile)
             return profile
         
         # Para JWT simplificados
         if username == 'jwt_user':
-            logger.info(f"🔧 Perfil JWT simplificado")
+            LOG.info("🔧 Perfil JWT simplificado")
             return {
                 'username': username,
                 'email': f"{username}@medisupply.com",
@@ -251,7 +324,7 @@ def get_user_profile_from_cognito(username):
             }
         
         # Para testing: usar datos predeterminados basados en el username
-        logger.info(f"🔧 Perfil simplificado para usuario Cognito: {username}")
+        LOG.info("🔧 Perfil simplificado para usuario Cognito: %s", username)
         
         # Mapear usernames específicos a perfiles
         if 'restricted' in username or 'deny' in username:
@@ -332,11 +405,12 @@ def get_user_profile_from_cognito(username):
                 'data_source': 'cognito_mapped'
             }
         
-    except cognito_client.exceptions.UserNotFoundException:
-        logger.error(f"❌ Usuario no encontrado en Cognito: {username}")
-        return None
     except Exception as e:
-        logger.error(f"❌ Error obteniendo perfil desde Cognito: {str(e)}")
+        # ClientError de botocore: se compara el código para no crear el cliente solo por el except
+        if getattr(e, 'response', {}).get('Error', {}).get('Code') == 'UserNotFoundException':
+            LOG.error("❌ Usuario no encontrado en Cognito: %s", username)
+        else:
+            LOG.error("❌ Error obteniendo perfil desde Cognito: %s", e)
         return None
 
 def evaluate_security_with_cognito_data(user_profile, source_ip):
@@ -381,22 +455,22 @@ def evaluate_security_with_cognito_data(user_profile, source_ip):
         # Ajuste por departamento (reducir falsos positivos)
         if department == 'medical':
             risk_score *= 0.8  # Personal médico tiene menos restricciones
-            logger.info(f"🏥 Ajuste médico aplicado: risk_score reducido 20%")
+            LOG.info("🏥 Ajuste médico aplicado: risk_score reducido 20%")
         elif department == 'management':
             risk_score *= 0.9  # Management tiene más flexibilidad
-            logger.info(f"👨‍💼 Ajuste management aplicado: risk_score reducido 10%")
+            LOG.info("👨‍💼 Ajuste management aplicado: risk_score reducido 10%")
         
         # Ajuste por acceso fuera de horario pero geografía válida
         if (not checks['business_hours']['valid'] and 
             checks['geography']['authorized']):
             risk_score *= 0.9  # Reducir penalización si la geografía es válida
-            logger.info(f"🕒 Ajuste horario + geografía válida: risk_score reducido 10%")
+            LOG.info("🕒 Ajuste horario + geografía válida: risk_score reducido 10%")
         
         # Ajuste para IPs no reconocidas de usuarios con dispositivos conocidos
         if (checks['geography']['country'] == 'UNKNOWN' and 
             'device.known' in user_profile.get('username', '')):
             risk_score -= 0.5  # Reducir penalización significativamente para dispositivos conocidos
-            logger.info(f"📱 Ajuste dispositivo conocido + IP desconocida: risk_score reducido 0.5")
+            LOG.info("📱 Ajuste dispositivo conocido + IP desconocida: risk_score reducido 0.5")
         
         # 6. Tomar decisión basada en umbrales adaptativos mejorados
         role = user_profile.get('role', 'user')
@@ -418,7 +492,7 @@ def evaluate_security_with_cognito_data(user_profile, source_ip):
             if risk_score <= (mfa_threshold + 0.2):  # Zona de MFA extendida
                 decision = 'mfa_required'
                 message = f'MFA requerido - resolución rápida vs denegación (riesgo: {risk_score:.2f})'
-                logger.info(f"🚀 Mejora tiempo resolución: MFA en lugar de deny para risk_score {risk_score:.3f}")
+                LOG.info("🚀 Mejora tiempo resolución: MFA en lugar de deny para risk_score %.3f", risk_score)
             else:
                 decision = 'deny'
                 message = f'Acceso denegado (riesgo crítico: {risk_score:.2f})'
@@ -433,7 +507,7 @@ def evaluate_security_with_cognito_data(user_profile, source_ip):
         }
         
     except Exception as e:
-        logger.error(f"❌ Error en evaluación: {str(e)}")
+        LOG.error("❌ Error en evaluación: %s", e)
         return {
             'decision': 'deny',
             'reason': 'EVALUATION_ERROR',
@@ -442,6 +516,21 @@ def evaluate_security_with_cognito_data(user_profile, source_ip):
             'checks': {}
         }
 
+def decision_cacheable(evaluation):
+    """
+    Una decisión se comparte solo si vale para toda la hora de su clave: sin error de
+    evaluación y sin un límite del horario laboral (inicio/fin) dentro de la hora actual.
+    """
+    if 'data_source' not in evaluation:
+        return False
+    business = evaluation.get('checks', {}).get('business_hours', {})
+    if 'error' in business:
+        return False
+    window = business.get('business_hours', '').split('-')
+    if len(window) == 2 and 'current_time' in business:
+        return business['current_time'][:2] not in (window[0][:2], window[1][:2])
+    return True
+
 def check_user_status(user_profile):
     """Verificar estado del usuario en Cognito"""
     try:
@@ -499,7 +588,7 @@ def check_business_hours_real(user_profile):
             }
         elif current_weekday > 4 and is_24x7_user:
             # Usuario 24/7 - permitir fin de semana pero continuar validando horario
-            logger.info(f"🚨 Usuario 24/7 detectado: {username} - fin de semana permitido")
+            LOG.info("🚨 Usuario 24/7 detectado: %s - fin de semana permitido", username)
         
         # Verificar horario
         try:
@@ -516,7 +605,7 @@ def check_business_hours_real(user_profile):
                 'day': now.strftime('%A')
             }
         except Exception as e:
-            logger.error(f"❌ Error parseando horarios: {str(e)}")
+            LOG.error("❌ Error parseando horarios: %s", e)
             # Si hay error de parsing, DENEGAR acceso por seguridad
             return {
                 'valid': False,
@@ -528,7 +617,7 @@ def check_business_hours_real(user_profile):
             }
         
     except Exception as e:
-        logger.error(f"❌ Error validando horario: {str(e)}")
+        LOG.error("❌ Error validando horario: %s", e)
         return {'valid': False, 'error': str(e), 'note': 'Acceso denegado por error de validación - política de seguridad'}
 
 def check_geographic_access_real(source_ip, user_profile):
@@ -538,10 +627,10 @@ def check_geographic_access_real(source_ip, user_profile):
         country = detect_country_simple(source_ip)
         authorized_countries = user_profile.get('authorized_countries', ['US'])
         
-        logger.info(f"🗺️ Evaluación geográfica: IP={source_ip}, País={country}, Autorizados={authorized_countries}")
+        LOG.info("🗺️ Evaluación geográfica: País=%s, Autorizados=%s", country, authorized_countries, ip=source_ip)
         
         if country in authorized_countries:
-            logger.info(f"✅ Acceso geográfico autorizado: {country}")
+            LOG.info("✅ Acceso geográfico autorizado: %s", country)
             return {
                 'authorized': True,
                 'country': country,
@@ -550,7 +639,7 @@ def check_geographic_access_real(source_ip, user_profile):
                 'authorized_list': authorized_countries
             }
         else:
-            logger.info(f"❌ Acceso geográfico DENEGADO: {country} no está en {authorized_countries}")
+            LOG.info("❌ Acceso geográfico DENEGADO: %s no está en %s", country, authorized_countries)
             return {
                 'authorized': False,
                 'country': country,
@@ -622,22 +711,21 @@ def check_ip_type(source_ip):
 
 def detect_country_simple(ip):
     """Detección básica de país por IP"""
-    logger.info(f"🔍 Detectando país para IP: {ip}")
     
     if ip.startswith(('192.168.', '10.', '172.', '127.')):
-        logger.info(f"🏠 IP privada/local detectada: {ip} → US")
+        LOG.info("🏠 IP privada/local detectada → US", ip=ip)
         return 'US'  # IPs privadas/locales
     elif ip.startswith('8.8.'):
-        logger.info(f"🌐 Google DNS detectado: {ip} → US")
+        LOG.info("🌐 Google DNS detectado → US", ip=ip)
         return 'US'  # Google DNS
     elif ip.startswith('201.'):
-        logger.info(f"🇲🇽 IP de México detectada: {ip} → MX")
+        LOG.info("🇲🇽 IP de México detectada → MX", ip=ip)
         return 'MX'  # Rango México
     elif ip.startswith('200.'):
-        logger.info(f"🇨🇦 IP de Canadá detectada: {ip} → CA")
+        LOG.info("🇨🇦 IP de Canadá detectada → CA", ip=ip)
         return 'CA'  # Rango Canadá
     else:
-        logger.info(f"❌ IP no reconocida: {ip} → UNKNOWN (DENEGADA)")
+        LOG.info("❌ IP no reconocida → UNKNOWN (DENEGADA)", ip=ip)
         return 'UNKNOWN'  # País no identificado - DENEGACIÓN POR DEFECTO
 
 # Funciones auxiliares
@@ -665,16 +753,30 @@ def get_source_ip(event):
     if x_forwarded_for:
         # Tomar la primera IP de la lista (IP original del cliente)
         client_ip = x_forwarded_for.split(',')[0].strip()
-        logger.info(f"🌐 IP extraída de X-Forwarded-For header: {client_ip}")
+        LOG.info("🌐 IP extraída de X-Forwarded-For header", ip=client_ip)
         return client_ip
     
     # 2. Fallback a sourceIp de requestContext
     source_ip = event.get('requestContext', {}).get('identity', {}).get('sourceIp', '127.0.0.1')
-    logger.info(f"🌐 IP extraída de requestContext.identity.sourceIp: {source_ip}")
+    LOG.info("🌐 IP extraída de requestContext.identity.sourceIp", ip=source_ip)
     return source_ip
 
+def cache_context():
+    """Contadores de TOKEN_CACHE / USER_CACHE para el contexto del autorizador (valores planos)."""
+    context = {}
+    for prefix, cache in (('token_cache', TOKEN_CACHE), ('user_cache', USER_CACHE)):
+        stats = cache.stats()
+        for field in ('size', 'hits', 'misses', 'evictions', 'expirations'):
+            context[f'{prefix}_{field}'] = stats[field]
+    if SHARED_CACHE is not None:
+        context['shared_cache_hits'] = SHARED_CACHE.l2_hits
+        context['shared_cache_misses'] = SHARED_CACHE.l2_misses
+        context['shared_cache_errors'] = SHARED_CACHE.errors
+    return context
+
 def create_allow_policy(method_arn, user_profile, evaluation, response_time):
     """Crear política de acceso permitido"""
+    LOG.decision('Allow', user_profile['username'], auth_status='AUTHORIZED')
     return {
         'principalId': user_profile['username'],
         'policyDocument': {
@@ -696,12 +798,14 @@ def create_allow_policy(method_arn, user_profile, evaluation, response_time):
             'auth_status': 'AUTHORIZED',
             'data_source': 'cognito_real',
             'service': 'medisupply',
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            **cache_context()
         }
     }
 
 def create_mfa_policy(method_arn, user_profile, evaluation):
     """Crear política que requiere MFA"""
+    LOG.decision('Deny', user_profile['username'], auth_status='MFA_REQUIRED')
     return {
         'principalId': f"{user_profile['username']}_mfa_required",
         'policyDocument': {
@@ -720,12 +824,14 @@ def create_mfa_policy(method_arn, user_profile, evaluation):
             'mfa_url': '/auth/mfa',
             'data_source': 'cognito_real',
             'service': 'medisupply',
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            **cache_context()
         }
     }
 
 def create_deny_policy(method_arn, reason_code, message):
     """Crear política de acceso denegado"""
+    LOG.decision('Deny', 'denied', auth_status='DENIED', reason=reason_code)
     return {
         'principalId': 'denied',
         'policyDocument': {
@@ -742,6 +848,7 @@ def create_deny_policy(method_arn, reason_code, message):
             'deny_message': message,
             'data_source': 'cognito_real',
             'service': 'medisupply',
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            **cache_context()
         }
     }
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Prueba de crecimiento de memoria de TOKEN_CACHE / USER_CACHE (TTLCache de lambda_code)
+con millones de tokens distintos, como un contenedor caliente que nunca repite token.
+
+AUTH_CACHE_MEMORY_TOKENS ajusta el número de tokens (por defecto 2 millones).
+"""
+
+import gc
+import hashlib
+import os
+import sys
+import unittest
+
+# Agregar el directorio lambda_code al path para importar el módulo
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, 'lambda_code'))
+sys.path.append(HERE)
+
+from fake_clock import FakeClock  # noqa: E402
+from ttl_cache import TTLCache  # noqa: E402
+
+TOKENS = int(os.environ.get('AUTH_CACHE_MEMORY_TOKENS', '2000000'))
+MAX_ENTRIES = 10000
+
+
+def token_entry(i):
+    """Misma forma que las entradas de validate_cognito_jwt_real (clave md5 + claims)."""
+    token = f'demo.user{i}.token'
+    claims = {'cognito:username': token.replace('.', '_'), 'username': token.replace('.', '_'),
+              'email': f"{token.replace('.', '_')}@medisupply.com", 'sub': f'demo-{token}',
+              'token_type': 'demo'}
+    return hashlib.md5(token.encode()).hexdigest(), {'claims': claims, 'username': claims['username'],
+                                                     'timestamp': float(i)}
+
+
+class TestAuthCacheMemory(unittest.TestCase):
+
+    def fill(self, cache, clock, start, count, step=0.0):
+        for i in range(start, start + count):
+            clock.now += step
+            key, value = token_entry(i)
+            cache.set(key, value)
+
+    def test_memory_is_flat_under_millions_of_unique_tokens(self):
+        clock = FakeClock(0.0)
+        cache = TTLCache(max_entries=MAX_ENTRIES, ttl=300, clock=clock)
+        # Calentamiento: la caché llega a su tamaño máximo
+        self.fill(cache, clock, 0, MAX_ENTRIES * 2)
+        gc.collect()
+        baseline = sys.getallocatedblocks()
+        self.fill(cache, clock, MAX_ENTRIES * 2, TOKENS - MAX_ENTRIES * 2)
+        gc.collect()
+        current = sys.getallocatedblocks()
+
+        self.assertEqual(len(cache), MAX_ENTRIES)
+        self.assertEqual(cache.stats()['evictions'], TOKENS - MAX_ENTRIES)
+        self.assertLessEqual(len(cache._expiry_heap), 2 * MAX_ENTRIES + 64)
+        # Tras llenarse, millones de tokens más no deben añadir memoria apreciable
+        # (bloques vivos del asignador de Python; la caché llena ocupa ~MAX_ENTRIES * 10)
+        self.assertLess(current - baseline, MAX_ENTRIES, f'baseline={baseline} current={current}')
+
+    def test_expired_entries_are_purged_without_being_read(self):
+        clock = FakeClock(0.0)
+        cache = TTLCache(max_entries=MAX_ENTRIES, ttl=300, clock=clock)
+        # 1 token por segundo durante mucho más que el TTL: solo quedan los de los últimos 300 s
+        self.fill(cache, clock, 0, 5000, step=1.0)
+        self.assertLessEqual(len(cache), 301)
+        self.assertEqual(cache.stats()['evictions'], 0)
+        self.assertGreater(cache.stats()['expirations'], 4000)
+
+    def test_counters(self):
+        cache = TTLCache(max_entries=2, ttl=300)
+        key, value = token_entry(1)
+        self.assertIsNone(cache.get(key))
+        cache.set(key, value)
+        self.assertEqual(cache.get(key), value)
+        for i in range(2, 5):
+            cache.set(*token_entry(i))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions'], stats['size']), (1, 1, 2, 2))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
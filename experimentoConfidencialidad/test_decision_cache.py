@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la caché compartida de perfiles y decisiones (decision_cache de lambda_code)
+con el backend en memoria como sustituto de Redis / DynamoDB.
+"""
+
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+
+# Agregar el directorio lambda_code al path para importar el módulo
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, 'lambda_code'))
+sys.path.append(HERE)
+
+from decision_cache import DecisionCache, InMemoryBackend  # noqa: E402
+from fake_clock import FakeClock  # noqa: E402
+
+
+class FailingBackend:
+    def get(self, key):
+        raise ConnectionError('backend caído')
+
+    set = get_counter = incr = get
+
+
+EVALUATION = {'decision': 'allow', 'reason': 'ALLOW', 'risk_score': 0.1,
+              'checks': {'ip_type': {'type': 'public'}}, 'data_source': 'cognito_real'}
+WHEN = datetime(2025, 3, 4, 15, 20, tzinfo=timezone.utc)
+
+
+class TestDecisionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.backend = InMemoryBackend(clock=self.clock)
+
+    def container(self, **kwargs):
+        """Un contenedor Lambda: L1 propia, backend compartido."""
+        return DecisionCache(self.backend, policy_version='p1', ttl=300, l1_ttl=60, clock=self.clock, **kwargs)
+
+    def test_decision_shared_between_containers(self):
+        warm, cold = self.container(), self.container()
+        key = warm.decision_key('sub-1', ['compras'], '201.10.20.30', WHEN)
+        warm.set_decision(key, {'profile': {'username': 'u1'}, 'evaluation': EVALUATION})
+
+        same_key = cold.decision_key('sub-1', ['compras'], '201.10.20.30', WHEN)
+        self.assertEqual(same_key, key)
+        self.assertEqual(cold.get_decision(same_key)['evaluation'], EVALUATION)
+        self.assertEqual((cold.l2_hits, cold.l2_misses), (1, 0))
+        # Segunda lectura desde la L1 del contenedor
+        cold.get_decision(same_key)
+        self.assertEqual(cold.l2_hits, 1)
+
+    def test_key_components(self):
+        cache = self.container()
+        key = cache.decision_key('sub-1', ['compras', 'ventas'], '201.10.20.30', WHEN)
+        self.assertEqual(key, cache.decision_key('sub-1', ['ventas', 'compras'], '201.10.20.30', WHEN))
+        for other in (cache.decision_key('sub-2', ['compras', 'ventas'], '201.10.20.30', WHEN),
+                      cache.decision_key('sub-1', ['compras'], '201.10.20.30', WHEN),
+                      cache.decision_key('sub-1', ['compras', 'ventas'], '201.10.21.30', WHEN),
+                      cache.decision_key('sub-1', ['compras', 'ventas'], '201.10.20.30', WHEN.replace(hour=16))):
+            self.assertNotEqual(key, other)
+
+    def test_same_subnet_different_country_is_not_shared(self):
+        # Dos IPs del mismo /24 que la geolocalización ubica en países distintos
+        country_by_ip = {'201.10.20.30': 'CO', '201.10.20.99': 'US'}
+        warm, cold = self.container(), self.container()
+        colombia = dict(EVALUATION, checks={'geographic': {'country': country_by_ip['201.10.20.30']}})
+        warm.set_decision(warm.decision_key('sub-1', ['compras'], '201.10.20.30', WHEN), {'evaluation': colombia})
+
+        self.assertIsNone(cold.get_decision(cold.decision_key('sub-1', ['compras'], '201.10.20.99', WHEN)))
+        self.assertEqual(cold.get_decision(cold.decision_key('sub-1', ['compras'], '201.10.20.30', WHEN))
+                         ['evaluation']['checks']['geographic']['country'], 'CO')
+
+    def test_profiles(self):
+        warm, cold = self.container(), self.container()
+        self.assertIsNone(cold.get_profile('demo_user'))
+        warm.set_profile('demo_user', {'username': 'demo_user', 'role': 'user'})
+        self.assertEqual(cold.get_profile('demo_user')['role'], 'user')
+
+    def test_ttl(self):
+        warm, cold = self.container(), self.container()
+        key = warm.decision_key('sub-1', [], '10.0.0.1', WHEN)
+        warm.set_decision(key, {'evaluation': EVALUATION})
+        self.clock.now += 301
+        self.assertIsNone(warm.get_decision(key))
+        self.assertIsNone(cold.get_decision(key))
+
+    def test_invalidation_reaches_every_container(self):
+        admin, other = self.container(), self.container(version_check_interval=30)
+        key = admin.decision_key('sub-1', [], '10.0.0.1', WHEN)
+        admin.set_decision(key, {'evaluation': EVALUATION})
+        self.assertIsNotNone(other.get_decision(other.decision_key('sub-1', [], '10.0.0.1', WHEN)))
+
+        admin.invalidate()
+        self.assertIsNone(admin.get_decision(admin.decision_key('sub-1', [], '10.0.0.1', WHEN)))
+        # Los demás contenedores ven la nueva versión en el siguiente chequeo
+        self.clock.now += 30
+        new_key = other.decision_key('sub-1', [], '10.0.0.1', WHEN)
+        self.assertNotEqual(new_key, key)
+        self.assertIsNone(other.get_decision(new_key))
+
+    def test_policy_version_change_misses(self):
+        old = self.container()
+        key = old.decision_key('sub-1', [], '10.0.0.1', WHEN)
+        old.set_decision(key, {'evaluation': EVALUATION})
+        new = DecisionCache(self.backend, policy_version='p2', clock=self.clock)
+        self.assertIsNone(new.get_decision(new.decision_key('sub-1', [], '10.0.0.1', WHEN)))
+
+    def test_backend_errors_are_misses(self):
+        cache = DecisionCache(FailingBackend(), policy_version='p1', clock=self.clock)
+        key = cache.decision_key('sub-1', [], '10.0.0.1', WHEN)
+        cache.set_decision(key, {'evaluation': EVALUATION})
+        cache.l1.clear()
+        self.assertIsNone(cache.get_decision(key))
+        self.assertGreaterEqual(cache.errors, 3)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
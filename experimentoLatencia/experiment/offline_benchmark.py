@@ -0,0 +1,247 @@
+"""
+Benchmark offline del servicio de productos (sin CDK, ALB, RDS ni ElastiCache).
+
+Arranca `services/products/app.py` dentro del proceso con el adaptador SQLite (o un
+Postgres local con --adapter postgres y las variables DB_*) y una caché en memoria
+en lugar de Redis, y lo somete a carga en lazo cerrado: cada cliente envía la
+siguiente petición en cuanto recibe la respuesta anterior.
+
+Cada estrategia de caché corre en un subproceso propio (la app se configura al
+importarse) y reporta throughput, p50/p95/p99, tasa de aciertos y latencia de
+propagación de las actualizaciones.
+
+Estrategias:
+    nocache        NullCache: todas las lecturas llegan a la base
+    cached         SimpleCache en memoria, solo lecturas
+    cached-writes  SimpleCache con un porcentaje de PUT /products/update/<id>
+    redis          RedisCache real (--redis-host), con escrituras
+
+Nota: las peticiones usan el test client de Flask, así que no incluyen red ni
+gunicorn; sirve para comparar cambios del servicio entre sí, no para estimar la
+latencia absoluta en AWS.
+
+Uso:
+    python experiment/offline_benchmark.py [--products 20000] [--clients 8] [--duration 10]
+                                          [--strategies nocache,cached,cached-writes]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+EXPERIMENT_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVICE_DIR = os.path.abspath(os.path.join(EXPERIMENT_DIR, '..', 'services', 'products'))
+
+STRATEGIES = {
+    'nocache': {'cache_type': 'NullCache', 'write_ratio': 0.0},
+    'cached': {'cache_type': 'SimpleCache', 'write_ratio': 0.0},
+    'cached-writes': {'cache_type': 'SimpleCache', 'write_ratio': 0.05},
+    'redis': {'cache_type': 'RedisCache', 'write_ratio': 0.05},
+}
+
+# Mezcla de lecturas: (peso, tipo)
+READ_MIX = [(70, 'available'), (25, 'detail'), (5, 'search')]
+SEARCH_TERMS = ['sku-med', 'sku-rea', 'monitor', 'suturas', 'analgésico', 'guantes']
+PROPAGATION_TIMEOUT = 2.0
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+# -------------------------------------------------------------------------------------
+# Proceso hijo: una estrategia
+# -------------------------------------------------------------------------------------
+def _read_request(client, rng, product_ids):
+    kind = rng.choices([kind for _, kind in READ_MIX], weights=[weight for weight, _ in READ_MIX])[0]
+    if kind == 'available':
+        return kind, client.get('/products/available')
+    if kind == 'detail':
+        return kind, client.get(f'/products/{rng.choice(product_ids)}')
+    return kind, client.get('/products/search', query_string={'q': rng.choice(SEARCH_TERMS)})
+
+
+def _update_and_wait(client, product_id, price):
+    """PUT de un precio único y espera hasta que una lectura del detalle lo refleje."""
+    response = client.put(f'/products/update/{product_id}', json={'price': price, 'stock': 500})
+    if response.status_code != 200:
+        return None
+    updated_at = time.perf_counter()
+    while time.perf_counter() - updated_at < PROPAGATION_TIMEOUT:
+        detail = client.get(f'/products/{product_id}')
+        if detail.status_code == 200 and abs(detail.get_json()['value'] - price) < 1e-9:
+            return time.perf_counter() - updated_at
+        time.sleep(0.001)
+    return PROPAGATION_TIMEOUT
+
+
+def _client_loop(flask_app, product_ids, write_ratio, deadline, seed, results, lock):
+    client = flask_app.test_client()
+    rng = random.Random(seed)
+    latencies, cache_results, errors, propagation = [], {}, 0, []
+    while time.perf_counter() < deadline:
+        if write_ratio and rng.random() < write_ratio:
+            lag = _update_and_wait(client, rng.choice(product_ids), round(rng.uniform(1, 5000), 2))
+            if lag is None:
+                errors += 1
+            else:
+                propagation.append(lag)
+            continue
+        start = time.perf_counter()
+        kind, response = _read_request(client, rng, product_ids)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code >= 500:
+            errors += 1
+        x_cache = response.headers.get('X-Cache', 'NONE')
+        cache_results[x_cache] = cache_results.get(x_cache, 0) + 1
+    with lock:
+        results['latencies'].extend(latencies)
+        results['propagation'].extend(propagation)
+        results['errors'] += errors
+        for key, count in cache_results.items():
+            results['cache'][key] = results['cache'].get(key, 0) + count
+
+
+def run_strategy(name, args):
+    """Importa la app con la configuración de la estrategia y ejecuta la carga."""
+    strategy = STRATEGIES[name]
+    os.environ.update({
+        'PRODUCTS_ADAPTER': args.adapter,
+        'SQLITE_DB_PATH': args.db,
+        'CACHE_TYPE': strategy['cache_type'],
+        'CACHE_THRESHOLD': '1000000',
+        'PRODUCT_FILTER_REFRESH_SECONDS': '0',
+        # Todas las estrategias arrancan con la caché fría
+        'WARMUP_ENABLED': 'false',
+    })
+    if args.redis_host:
+        os.environ['CACHE_HOST'] = args.redis_host
+    sys.path.insert(0, SERVICE_DIR)
+    import app as products_app  # noqa: E402
+
+    product_ids = products_app.product_service.list_product_ids()
+    if strategy['cache_type'] == 'RedisCache':
+        products_app.cache.clear()
+
+    results = {'latencies': [], 'propagation': [], 'errors': 0, 'cache': {}}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=_client_loop, args=(products_app.app, product_ids, strategy['write_ratio'],
+                                                    deadline, 1000 + i, results, lock))
+        for i in range(args.clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency * 1000 for latency in results['latencies']]
+    hits = results['cache'].get('HIT', 0)
+    misses = results['cache'].get('MISS', 0)
+    propagation = [lag * 1000 for lag in results['propagation']]
+    return {
+        'strategy': name,
+        'requests': len(latencies),
+        'throughput': len(latencies) / elapsed,
+        'p50': percentile(latencies, 50) if latencies else None,
+        'p95': percentile(latencies, 95) if latencies else None,
+        'p99': percentile(latencies, 99) if latencies else None,
+        'hit_ratio': hits / (hits + misses) if hits + misses else None,
+        'cache': results['cache'],
+        'errors': results['errors'],
+        'updates': len(propagation),
+        'propagation_mean': statistics.mean(propagation) if propagation else None,
+        'propagation_p95': percentile(propagation, 95) if propagation else None,
+    }
+
+
+# -------------------------------------------------------------------------------------
+# Proceso padre: dataset, subprocesos y reporte
+# -------------------------------------------------------------------------------------
+def _fmt(value, pattern='{:8.2f}'):
+    return pattern.format(value) if value is not None else f"{'-':>8}"
+
+
+def print_report(rows):
+    print(f"\n{'estrategia':<15}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'hit %':>8}{'errores':>9}{'prop. ms':>10}{'prop. p95':>10}")
+    for row in rows:
+        hit = row['hit_ratio'] * 100 if row['hit_ratio'] is not None else None
+        print(f"{row['strategy']:<15}{row['throughput']:>10.1f}{_fmt(row['p50'], '{:9.2f}')}"
+              f"{_fmt(row['p95'], '{:9.2f}')}{_fmt(row['p99'], '{:9.2f}')}{_fmt(hit, '{:8.1f}')}"
+              f"{row['errors']:>9}{_fmt(row['propagation_mean'], '{:10.2f}')}"
+              f"{_fmt(row['propagation_p95'], '{:10.2f}')}")
+        if row['errors']:
+            print(f"  ⚠️  {row['errors']} errores en {row['strategy']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=20000, help='tamaño del catálogo sintético')
+    parser.add_argument('--db', help='base SQLite existente (por defecto se genera una sintética)')
+    parser.add_argument('--adapter', choices=['sqlite', 'postgres'], default='sqlite')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0, help='segundos por estrategia')
+    parser.add_argument('--strategies', default='nocache,cached,cached-writes')
+    parser.add_argument('--redis-host', help='Redis local para la estrategia redis')
+    parser.add_argument('--output', help='guarda los resultados en JSON')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_strategy(args.child, args)))
+        return
+
+    strategies = [name.strip() for name in args.strategies.split(',') if name.strip()]
+    unknown = [name for name in strategies if name not in STRATEGIES]
+    if unknown:
+        parser.error(f"estrategias desconocidas: {', '.join(unknown)}")
+    if 'redis' in strategies and not args.redis_host:
+        parser.error('la estrategia redis requiere --redis-host')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.adapter == 'sqlite' and not args.db:
+            sys.path.insert(0, EXPERIMENT_DIR)
+            from search_benchmark import build_database
+            args.db = os.path.join(tmp, 'offline_benchmark.db')
+            print(f"Generando catálogo de {args.products} productos...")
+            build_database(args.db, args.products)
+
+        rows = []
+        for name in strategies:
+            print(f"Ejecutando {name} ({args.clients} clientes, {args.duration:.0f}s)...")
+            db_copy = args.db
+            if args.adapter == 'sqlite':
+                # Cada estrategia parte del mismo estado (las escrituras modifican la base)
+                db_copy = os.path.join(tmp, f'{name}.db')
+                with open(args.db, 'rb') as src, open(db_copy, 'wb') as dst:
+                    dst.write(src.read())
+            command = [sys.executable, os.path.abspath(__file__), '--child', name, '--adapter', args.adapter,
+                       '--db', db_copy or '', '--clients', str(args.clients), '--duration', str(args.duration)]
+            if args.redis_host:
+                command += ['--redis-host', args.redis_host]
+            completed = subprocess.run(command, cwd=SERVICE_DIR, capture_output=True, text=True)
+            if completed.returncode != 0:
+                print(f"  ⚠️  {name} falló:\n{completed.stderr[-2000:]}")
+                continue
+            rows.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    print_report(rows)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(rows, f, indent=2)
+        print(f"\nResultados guardados en {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,8 @@
 import os
+import re
 import json
+import requests
+from collections import defaultdict
 from locust import HttpUser, task, between, events
 import time
 import statistics
@@ -7,6 +10,65 @@ import statistics
 # Lee la URL base del servicio desde una variable de entorno.
 # Se ha corregido para incluir el esquema https:// por defecto
 BASE_URL = os.environ.get("BASE_URL", "https://localhost:8080")
+# /metrics exige el METRICS_TOKEN del servicio. VERIFY_TLS=false solo para certificados
+# autofirmados en pruebas locales: por defecto se valida el certificado
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+VERIFY_TLS = os.environ.get("VERIFY_TLS", "true").lower() == "true"
+_METRIC_LINE = re.compile(r'^(\w+)(?:\{(.*)\})?\s+(\S+)$')
+_METRIC_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_server_timing(header_value):
+    """'cache;dur=0.8, db-query;dur=12.3' -> {'cache': 0.8, 'db-query': 12.3} (ms)."""
+    phases = {}
+    for entry in header_value.split(','):
+        name, _, params = entry.strip().partition(';')
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if name and key == 'dur':
+                phases[name] = phases.get(name, 0.0) + float(value)
+    return phases
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def fetch_server_metrics(base_url):
+    """Descarga /metrics del servicio y devuelve [(nombre, {labels}, valor)]."""
+    headers = {'Authorization': f'Bearer {METRICS_TOKEN}'} if METRICS_TOKEN else {}
+    response = requests.get(f"{base_url}/metrics", headers=headers, timeout=10, verify=VERIFY_TLS)
+    response.raise_for_status()
+    samples = []
+    for line in response.text.splitlines():
+        match = _METRIC_LINE.match(line)
+        if line.startswith('#') or not match:
+            continue
+        name, labels, value = match.groups()
+        samples.append((name, dict(_METRIC_LABEL.findall(labels or '')), float(value)))
+    return samples
+
+
+def summarize_server_metrics(samples):
+    """Conteos de caché por resultado y latencias medias del lado del servidor."""
+    cache_events = defaultdict(float)
+    sums, counts = defaultdict(float), defaultdict(float)
+    for name, labels, value in samples:
+        if name == 'products_cache_events_total':
+            cache_events[(labels.get('family'), labels.get('result'))] += value
+        elif name == 'products_http_request_duration_seconds_sum':
+            sums[('http', labels.get('route'))] += value
+        elif name == 'products_http_request_duration_seconds_count':
+            counts[('http', labels.get('route'))] += value
+        elif name == 'products_repository_query_duration_seconds_sum':
+            sums[('repository', labels.get('method'))] += value
+        elif name == 'products_repository_query_duration_seconds_count':
+            counts[('repository', labels.get('method'))] += value
+    averages = {key: sums[key] / counts[key] * 1000 for key in counts if counts[key]}
+    return cache_events, averages
+
+
 global PRODCUCT_STOCK
 global start_time_to_miss
 global end_time_to_miss
@@ -26,6 +88,9 @@ class ProductsServiceUser(HttpUser):
     # Un diccionario para llevar el conteo de los 'cache hits' y 'cache misses'.
     cache_metrics = {"hit": 0, "miss": 0, "time":0, "ttl":[], "propagation":[], "consistency":0}
 
+    # Duraciones por fase (ms) reportadas por el servidor en Server-Timing, separadas por HIT/MISS
+    server_timing_phases = defaultdict(list)
+
     # Lista para almacenar los resultados de latencia de propagación
     propagation_latencies = []
 
@@ -63,6 +128,8 @@ class ProductsServiceUser(HttpUser):
             x_cache_header = response.headers.get('X-Cache', 'UNKNOWN')
             total_time = (end_time - start_time) * 1000  # en ms
             self.cache_metrics["time"] += total_time
+            for phase, duration in parse_server_timing(response.headers.get('Server-Timing', '')).items():
+                self.server_timing_phases[(x_cache_header, phase)].append(duration)
             # Registra la métrica para el análisis posterior.
             if x_cache_header == 'HIT':
                 end_propagation = time.time()
@@ -139,5 +206,26 @@ class ProductsServiceUser(HttpUser):
                     "No se realizaron solicitudes de caché. La prueba podría haber fallado antes de la ejecución.\n")
             f.write("------------------------------------------------------------------------\n\n")
 
+            # --------------------------------------------------------------------------------------
+            # Desglose por fase reportado por el servidor (Server-Timing)
+            f.write("--- Desglose Server-Timing por fase (ms) ---\n")
+            for (x_cache, phase), durations in sorted(ProductsServiceUser.server_timing_phases.items()):
+                f.write(f"{x_cache:<15} {phase:<12} n={len(durations):<6} p50={percentile(durations, 50):8.2f} "
+                        f"p95={percentile(durations, 95):8.2f} p99={percentile(durations, 99):8.2f}\n")
+            f.write("------------------------------------------------------------------------\n\n")
+
+            # --------------------------------------------------------------------------------------
+            # Métricas del lado del servidor (/metrics, agregadas entre workers)
+            f.write("--- Métricas del servidor (/metrics) ---\n")
+            try:
+                cache_events, averages = summarize_server_metrics(fetch_server_metrics(BASE_URL))
+                for (family, result), value in sorted(cache_events.items()):
+                    f.write(f"Caché {family} {result}: {value:.0f}\n")
+                for (kind, name), avg_ms in sorted(averages.items()):
+                    f.write(f"Latencia media {kind} {name}: {avg_ms:.2f}ms\n")
+            except requests.RequestException as e:
+                f.write(f"No se pudieron obtener las métricas del servidor: {e}\n")
+            f.write("------------------------------------------------------------------------\n\n")
+
 
         print(f"\nResultados de la prueba consolidados en {output_file}")
@@ -0,0 +1,127 @@
+"""
+Benchmark de latencia de /products/search sobre el adaptador SQLite/offline.
+
+Genera un catálogo sintético (100k SKUs por defecto) en una base SQLite temporal y
+compara la búsqueda indexada (arreglo ordenado de SKUs + bisect y trigramas) con un
+escaneo `LIKE` equivalente a lo que haría la base sin índices.
+
+Uso:
+    python experiment/search_benchmark.py [--products 100000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+SERVICE_DIR = os.path.join(os.path.dirname(__file__), '..', 'services', 'products')
+sys.path.append(os.path.abspath(SERVICE_DIR))
+
+from adapters.sqlite_adapter import SQLiteProductAdapter  # noqa: E402
+
+CATEGORIES = [(1, 'MEDICATION', 'MED'), (2, 'SURGICAL_SUPPLIES', 'SUR'), (3, 'REAGENTS', 'REA'),
+              (4, 'EQUIPMENT', 'EQU'), (5, 'OTHERS', 'OTH')]
+WORDS = ['antibiótico', 'amplio', 'espectro', 'monitor', 'signos', 'vitales', 'portátil', 'suturas',
+         'reabsorbibles', 'reactivo', 'pruebas', 'laboratorio', 'inyectable', 'analgésico', 'agujas',
+         'hipodérmicas', 'solución', 'calibración', 'bomba', 'infusión', 'guantes', 'nitrilo', 'gasas']
+COUNTRIES = [('W-001', 'USA'), ('W-002', 'CAN'), ('W-003', 'MEX')]
+
+SCHEMA = '''
+CREATE TABLE Category (category_id INT PRIMARY KEY, name VARCHAR(50) NOT NULL);
+CREATE TABLE Provider (provider_id VARCHAR(50) PRIMARY KEY, name VARCHAR(100) NOT NULL);
+CREATE TABLE Product (
+    product_id VARCHAR(50) PRIMARY KEY, sku VARCHAR(50) NOT NULL UNIQUE, value FLOAT NOT NULL,
+    provider_id VARCHAR(50) NOT NULL, category_id INT NOT NULL, objective_profile VARCHAR(255) NOT NULL);
+CREATE TABLE ProductStock (
+    stock_id VARCHAR(50) PRIMARY KEY, product_id VARCHAR(50) NOT NULL, quantity INT NOT NULL,
+    lote VARCHAR(50) NOT NULL, warehouse_id VARCHAR(50) NOT NULL, country VARCHAR(50) NOT NULL);
+'''
+
+
+def build_database(path, size):
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.executemany("INSERT INTO Category VALUES (?, ?)", [(cid, name) for cid, name, _ in CATEGORIES])
+    conn.execute("INSERT INTO Provider VALUES ('prov_001', 'PharmaCorp')")
+    products, stock = [], []
+    for i in range(size):
+        cid, _, code = CATEGORIES[i % len(CATEGORIES)]
+        profile = ' '.join(rng.sample(WORDS, 3))
+        products.append((f'prod_{i:06d}', f'SKU-{code}-{i:06d}', round(rng.uniform(1, 5000), 2),
+                         'prov_001', cid, profile))
+        warehouse, country = COUNTRIES[i % len(COUNTRIES)]
+        stock.append((f'stock_{i:06d}', f'prod_{i:06d}', rng.randint(1, 500), 'L-1', warehouse, country))
+    conn.executemany("INSERT INTO Product VALUES (?, ?, ?, ?, ?, ?)", products)
+    conn.executemany("INSERT INTO ProductStock VALUES (?, ?, ?, ?, ?, ?)", stock)
+    conn.commit()
+    conn.close()
+
+
+def naive_search(path, query, limit):
+    """Línea base: LIKE sobre SKU y nombre sin índices de apoyo."""
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('''
+            SELECT p.product_id, p.sku, p.value, c.name, SUM(ps.quantity)
+            FROM Product p
+            JOIN Category c ON p.category_id = c.category_id
+            JOIN ProductStock ps ON p.product_id = ps.product_id
+            WHERE ps.quantity > 0 AND (p.sku LIKE ? OR p.objective_profile LIKE ?)
+            GROUP BY p.product_id ORDER BY p.sku LIMIT ?
+        ''', (query.upper() + '%', f'%{query}%', limit)).fetchall()
+    finally:
+        conn.close()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(label, fn, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<28} p50={statistics.median(timings):8.2f} ms  "
+          f"p95={percentile(timings, 95):8.2f} ms  max={max(timings):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'search_benchmark.db')
+        print(f"Generando catálogo de {args.products} productos...")
+        build_database(path, args.products)
+
+        adapter = SQLiteProductAdapter(db_path=path)
+        adapter.create_indexes()
+        start = time.perf_counter()
+        adapter._ensure_search_indexes()
+        print(f"Construcción de índices en proceso: {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+        prefix_queries = [f'sku-{rng.choice(CATEGORIES)[2].lower()}-{rng.randint(0, 99):03d}'
+                          for _ in range(args.queries)]
+        fuzzy_queries = [rng.choice(WORDS)[:-1] for _ in range(args.queries)]
+
+        print("Prefijo de SKU:")
+        run("  indexado (bisect)", lambda q: adapter.search_products(q, args.limit), prefix_queries)
+        run("  LIKE sin índice", lambda q: naive_search(path, q, args.limit), prefix_queries)
+        print("Nombre aproximado:")
+        run("  indexado (trigramas)", lambda q: adapter.search_products(q, args.limit), fuzzy_queries)
+        run("  LIKE '%q%' sin índice", lambda q: naive_search(path, q, args.limit), fuzzy_queries)
+
+
+if __name__ == '__main__':
+    main()
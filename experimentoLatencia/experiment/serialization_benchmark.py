@@ -0,0 +1,103 @@
+"""
+Benchmark de serialización de respuestas del servicio de productos.
+
+Compara el camino actual (`jsonify` sobre `p.__dict__`) con los serializadores
+de `serializers/product_serializer.py` para catálogos de 1k a 100k productos.
+
+Uso:
+    python experiment/serialization_benchmark.py [--sizes 1000,10000,100000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+# Los módulos del servicio se importan igual que dentro del contenedor (PYTHONPATH=/app)
+SERVICE_DIR = os.path.join(os.path.dirname(__file__), '..', 'services', 'products')
+sys.path.append(os.path.abspath(SERVICE_DIR))
+
+from domain.models import Product  # noqa: E402
+from serializers.product_serializer import NativeProductSerializer, OrjsonProductSerializer, orjson  # noqa: E402
+
+CATEGORIES = ['MEDICATION', 'SURGICAL_SUPPLIES', 'REAGENTS', 'EQUIPMENT', 'OTHERS']
+
+
+def build_catalog(size, decimal_values=False):
+    """Genera un catálogo sintético con la misma forma que devuelve el adaptador."""
+    rng = random.Random(42)
+    catalog = []
+    for i in range(size):
+        value = round(rng.uniform(1, 5000), 2)
+        catalog.append(Product(
+            product_id=f'prod_{i:06d}',
+            sku=f'SKU-{CATEGORIES[i % 5][:3]}-{i:06d}',
+            value=Decimal(str(value)) if decimal_values else value,
+            category_name=CATEGORIES[i % 5],
+            total_quantity=rng.randint(1, 1000)
+        ))
+    return catalog
+
+
+def baseline_dumps():
+    """Camino actual: jsonify([p.__dict__ ...]). Sin Flask se emula con json.dumps."""
+    try:
+        from flask import Flask, jsonify
+    except ImportError:
+        print("⚠️ Flask no disponible: la línea base usa json.dumps con la configuración de jsonify")
+
+        def dumps(products):
+            return json.dumps([p.__dict__ for p in products], sort_keys=True,
+                              separators=(',', ':'), default=str).encode('utf-8')
+        return dumps
+
+    app = Flask(__name__)
+
+    def dumps(products):
+        with app.app_context():
+            return jsonify([p.__dict__ for p in products]).data
+    return dumps
+
+
+def measure(fn, products, repeat):
+    """Devuelve (mediana en ms, tamaño en bytes)."""
+    timings = []
+    payload = b''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = fn(products)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--decimal', action='store_true', help='Simular la columna value como Decimal')
+    args = parser.parse_args()
+
+    candidates = [('jsonify (actual)', baseline_dumps())]
+    candidates.append(('native', NativeProductSerializer().dumps_products))
+    if orjson is not None:
+        candidates.append(('orjson', OrjsonProductSerializer().dumps_products))
+    else:
+        print("⚠️ orjson no instalado: se omite")
+
+    print(f"{'productos':>10} | {'serializador':<18} | {'mediana ms':>10} | {'bytes':>10} | {'speedup':>7}")
+    print("-" * 68)
+    for size in [int(s) for s in args.sizes.split(',')]:
+        products = build_catalog(size, decimal_values=args.decimal)
+        baseline_ms = None
+        for name, fn in candidates:
+            median_ms, size_bytes = measure(fn, products, args.repeat)
+            baseline_ms = baseline_ms or median_ms
+            print(f"{size:>10} | {name:<18} | {median_ms:>10.2f} | {size_bytes:>10} | {baseline_ms / median_ms:>6.1f}x")
+        print("-" * 68)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark del adaptador SQLite (equipos edge sin RDS) contra el adaptador PostgreSQL.
+
+Genera el catálogo sintético de search_benchmark en una base SQLite temporal y mide,
+llamando directamente a los adaptadores (sin Flask ni caché):
+
+    sqlite-per-call     una conexión nueva por llamada (comportamiento anterior)
+    sqlite-persistent   conexión persistente por hilo, WAL, mmap y caché de páginas
+    postgres            PostgreSQLProductAdapter sobre el mismo dataset (--postgres)
+
+Con --postgres se ejecuta database_setup.setup_database() contra la base de las
+variables DB_* y se VACÍAN sus tablas para cargar el mismo catálogo: usar solo con
+una base local de pruebas.
+
+Uso:
+    python experiment/sqlite_vs_postgres_benchmark.py [--products 20000] [--iterations 300]
+                                                      [--threads 4] [--postgres]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+EXPERIMENT_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVICE_DIR = os.path.abspath(os.path.join(EXPERIMENT_DIR, '..', 'services', 'products'))
+sys.path.append(SERVICE_DIR)
+
+from adapters.sqlite_adapter import SQLiteProductAdapter  # noqa: E402
+from search_benchmark import COUNTRIES, build_database, percentile  # noqa: E402
+
+TABLES = ('Category', 'Provider', 'Product', 'ProductStock')
+
+
+def load_postgres(sqlite_path):
+    """Crea el esquema e índices de PostgreSQL y copia las filas de la base SQLite."""
+    import database_setup
+    from psycopg2.extras import execute_values
+    from config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER
+
+    database_setup.setup_database()
+    source = sqlite3.connect(sqlite_path)
+    conn = database_setup.connect_app_db(DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {', '.join(reversed(TABLES))} CASCADE")
+            for table in TABLES:
+                rows = source.execute(f"SELECT * FROM {table}").fetchall()
+                execute_values(cursor, f"INSERT INTO {table} VALUES %s", rows, page_size=5000)
+            cursor.execute(f"ANALYZE {', '.join(TABLES)}")
+        conn.commit()
+    finally:
+        conn.close()
+        source.close()
+
+
+def operations(product_ids):
+    """Mezcla de llamadas de un worker; cada una recibe (adaptador, rng)."""
+    return {
+        'available (todo)': lambda repo, rng: repo.get_available_products(),
+        'available (país)': lambda repo, rng: repo.get_available_products(country=rng.choice(COUNTRIES)[1]),
+        'by id': lambda repo, rng: repo.get_product_by_id(rng.choice(product_ids)),
+        'by id (inexistente)': lambda repo, rng: repo.get_product_by_id(f'missing_{rng.randrange(10 ** 6)}'),
+        'update': lambda repo, rng: repo.update_product(rng.choice(product_ids), round(rng.uniform(1, 5000), 2),
+                                                         rng.randint(1, 500), COUNTRIES[0][0]),
+    }
+
+
+def run(repository, operation, iterations, threads):
+    """Ejecuta `iterations` llamadas repartidas entre `threads` hilos; latencias en ms."""
+    latencies, lock = [], threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local = []
+        for _ in range(iterations // threads):
+            start = time.perf_counter()
+            operation(repository, rng)
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        'ops': len(latencies) / elapsed,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'mean': statistics.mean(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--iterations', type=int, default=300, help='llamadas por operación y adaptador')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--postgres', action='store_true',
+                        help='incluye PostgreSQL (variables DB_*); vacía sus tablas')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'edge.db')
+        print(f"Generando catálogo de {args.products} productos...")
+        build_database(db_path, args.products)
+        SQLiteProductAdapter(db_path=db_path).create_indexes()
+        product_ids = [f'prod_{i:06d}' for i in range(args.products)]
+
+        adapters = {
+            'sqlite-per-call': SQLiteProductAdapter(db_path=db_path, persistent=False),
+            'sqlite-persistent': SQLiteProductAdapter(db_path=db_path),
+        }
+        if args.postgres:
+            try:
+                load_postgres(db_path)
+                from adapters.sql_adapter import PostgreSQLProductAdapter
+                adapters['postgres'] = PostgreSQLProductAdapter()
+            except Exception as e:
+                print(f"⚠️  PostgreSQL no disponible, se omite: {e}")
+
+        print(f"\n{'operación':<22}{'adaptador':<20}{'ops/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'media ms':>10}")
+        for label, operation in operations(product_ids).items():
+            # El listado completo es mucho más lento que el resto: menos iteraciones
+            iterations = max(args.threads, args.iterations // 10) if label == 'available (todo)' else args.iterations
+            for name, repository in adapters.items():
+                row = run(repository, operation, iterations, args.threads)
+                print(f"{label:<22}{name:<20}{row['ops']:>10.1f}{row['p50']:>9.2f}{row['p95']:>9.2f}"
+                      f"{row['mean']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# adapters/cache_backends.py
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Mapping
+
+
+class CacheBackend(ABC):
+    """Almacén clave/valor con TTL usado por CachedProductRepository."""
+
+    @abstractmethod
+    def get_many(self, keys: List[str]) -> Dict[str, object]:
+        """Valores de las claves presentes (las ausentes o expiradas no aparecen)."""
+        pass
+
+    @abstractmethod
+    def set_many(self, mapping: Mapping[str, object], timeout: int) -> None:
+        pass
+
+    @abstractmethod
+    def delete_many(self, keys: Iterable[str]) -> None:
+        pass
+
+
+class InProcessCacheBackend(CacheBackend):
+    """
+    Diccionario por worker con expiración y límite de entradas (se descartan primero
+    las expiradas y luego las más antiguas). Los objetos se comparten sin copiar: quien
+    los lee no debe modificarlos. Cada worker tiene su copia, así que las invalidaciones
+    solo llegan al worker que hizo la escritura: usar TTLs cortos con varios workers.
+    """
+
+    def __init__(self, max_entries: int = 10000, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, tuple] = {}
+
+    def get_many(self, keys: List[str]) -> Dict[str, object]:
+        now = self._clock()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                else:
+                    found[key] = value
+        return found
+
+    def set_many(self, mapping: Mapping[str, object], timeout: int) -> None:
+        expires_at = self._clock() + timeout
+        with self._lock:
+            for key, value in mapping.items():
+                self._entries.pop(key, None)
+                self._entries[key] = (expires_at, value)
+            if len(self._entries) > self.max_entries:
+                self._evict()
+
+    def _evict(self) -> None:
+        now = self._clock()
+        for key in [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        # Los dict conservan el orden de inserción: las primeras son las más antiguas
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Caché compartida entre workers sobre la instancia de Flask-Caching de la app
+    (RedisCache en AWS; los valores se serializan con pickle). Un error de Redis se
+    trata como fallo de caché: la lectura sigue hacia la base en lugar de fallar.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def get_many(self, keys: List[str]) -> Dict[str, object]:
+        if not keys:
+            return {}
+        try:
+            values = self.cache.get_many(*keys)
+        except Exception as e:
+            print(f"[repository-cache] error leyendo de Redis: {e}")
+            return {}
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, mapping: Mapping[str, object], timeout: int) -> None:
+        if not mapping:
+            return
+        try:
+            self.cache.set_many(dict(mapping), timeout=timeout)
+        except Exception as e:
+            print(f"[repository-cache] error escribiendo en Redis: {e}")
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if keys:
+            # Sin capturar: una invalidación perdida dejaría datos obsoletos hasta el TTL
+            self.cache.delete_many(*keys)
@@ -0,0 +1,112 @@
+# adapters/cached_repository_adapter.py
+from collections import Counter
+from typing import Callable, Dict, List, Mapping, Optional
+from repositories.product_repository import ProductRepository
+from domain.models import Product, StockScope
+from adapters.cache_backends import CacheBackend
+from adapters.delegating_adapter import DelegatingProductAdapter
+from cache_keys import availability_key, availability_keys_for_scopes, product_key, repository_key, search_key
+import server_timing
+
+# Marca de "el producto no existe" (None no se distingue de una clave ausente en Redis)
+_MISSING = '__missing__'
+
+
+class CachedProductRepository(DelegatingProductAdapter):
+    """
+    Caché read-through de objetos de dominio para cualquier ProductRepository.
+
+    Cualquier consumidor de ProductService (la API, procesos batch, otros servicios)
+    comparte la caché, no solo las respuestas HTTP. Cada método tiene su TTL en
+    `ttls` (0 o ausente = sin caché). `update_product` invalida el detalle y los
+    listados de los ámbitos afectados; la búsqueda solo expira por TTL, igual que
+    en la caché HTTP. Catálogo de facetas e IDs nunca se cachean: alimentan índices
+    que se reconstruyen a partir de la base.
+    """
+
+    def __init__(self, repository: ProductRepository, backend: CacheBackend,
+                 ttls: Mapping[str, int], negative_ttl: int = 30):
+        super().__init__(repository)
+        self.backend = backend
+        self.ttls = dict(ttls)
+        self.negative_ttl = negative_ttl
+        self.stats = Counter()
+
+    def _read_through(self, method: str, key: str, load: Callable[[], object]):
+        ttl = self.ttls.get(method, 0)
+        if not ttl:
+            return load()
+        with server_timing.phase('repo-cache'):
+            cached = self.backend.get_many([key])
+        if key in cached:
+            self.stats[f'{method}.hit'] += 1
+            return cached[key]
+        self.stats[f'{method}.miss'] += 1
+        value = load()
+        self.backend.set_many({key: value}, timeout=ttl)
+        return value
+
+    def get_available_products(self, country: Optional[str] = None,
+                               warehouse_id: Optional[str] = None) -> List[Product]:
+        return self._read_through(
+            'get_available_products', repository_key(availability_key(country, warehouse_id)),
+            lambda: self._call('get_available_products', country=country, warehouse_id=warehouse_id)
+        )
+
+    def get_product_by_id(self, product_id: str) -> Optional[Product]:
+        return self.get_products_by_ids([product_id]).get(product_id)
+
+    def get_products_by_ids(self, product_ids: List[str]) -> Dict[str, Product]:
+        """
+        Resuelve los aciertos con una sola lectura múltiple de la caché y los fallos
+        con una sola consulta al repositorio. Los IDs inexistentes se recuerdan
+        durante `negative_ttl` para no volver a consultarlos en cada lote.
+        """
+        product_ids = list(dict.fromkeys(product_ids))
+        ttl = self.ttls.get('get_product_by_id', 0)
+        if not ttl or not product_ids:
+            return self._call('get_products_by_ids', product_ids)
+
+        keys = {product_id: repository_key(product_key(product_id)) for product_id in product_ids}
+        with server_timing.phase('repo-cache'):
+            cached = self.backend.get_many(list(keys.values()))
+        found: Dict[str, Product] = {}
+        misses = []
+        for product_id, key in keys.items():
+            if key not in cached:
+                misses.append(product_id)
+            elif cached[key] != _MISSING:
+                found[product_id] = cached[key]
+        self.stats['get_product_by_id.hit'] += len(product_ids) - len(misses)
+        if not misses:
+            return found
+
+        self.stats['get_product_by_id.miss'] += len(misses)
+        loaded = self._call('get_products_by_ids', misses)
+        found.update(loaded)
+        self.backend.set_many({keys[product_id]: product for product_id, product in loaded.items()}, timeout=ttl)
+        missing = [product_id for product_id in misses if product_id not in loaded]
+        if missing and self.negative_ttl:
+            self.backend.set_many({keys[product_id]: _MISSING for product_id in missing}, timeout=self.negative_ttl)
+        return found
+
+    def search_products(self, query: str, limit: int) -> List[Product]:
+        return self._read_through(
+            'search_products', repository_key(search_key(query, limit)),
+            lambda: self._call('search_products', query, limit)
+        )
+
+    def update_product(self, product_id: str, price: float, stock: int,
+                       warehouse_id: str) -> Optional[List[StockScope]]:
+        scopes = self._call('update_product', product_id=product_id, price=price,
+                            stock=stock, warehouse_id=warehouse_id)
+        if scopes is not None:
+            self.invalidate(product_id, scopes)
+        return scopes
+
+    def invalidate(self, product_id: str, scopes: List[StockScope]) -> None:
+        """Descarta el detalle del producto y los listados de los ámbitos donde tiene stock."""
+        keys = [repository_key(key) for key in availability_keys_for_scopes(scopes)]
+        keys.append(repository_key(product_key(product_id)))
+        self.backend.delete_many(keys)
+        self.stats['invalidations'] += 1
@@ -0,0 +1,19 @@
+# adapters/circuit_breaker_adapter.py
+from repositories.product_repository import ProductRepository
+from adapters.delegating_adapter import DelegatingProductAdapter
+from services.circuit_breaker import CircuitBreaker
+
+
+class CircuitBreakerProductAdapter(DelegatingProductAdapter):
+    """
+    Decorador de cualquier repositorio: cada llamada pasa por un CircuitBreaker.
+    Con el circuito abierto las llamadas fallan en microsegundos con CircuitOpenError
+    en lugar de bloquear workers de gunicorn esperando a la base.
+    """
+
+    def __init__(self, repository: ProductRepository, breaker: CircuitBreaker):
+        super().__init__(repository)
+        self.breaker = breaker
+
+    def _call(self, method: str, *args, **kwargs):
+        return self.breaker.call(getattr(self.repository, method), *args, **kwargs)
@@ -0,0 +1,45 @@
+# adapters/delegating_adapter.py
+from typing import Dict, List, Optional
+from repositories.product_repository import ProductRepository
+from domain.models import CatalogEntry, Product, StockScope
+
+
+class DelegatingProductAdapter(ProductRepository):
+    """
+    Base para decoradores de repositorio (circuit breaker, métricas, fallos inyectados).
+    Cada método del repositorio pasa por `_call(nombre, ...)`, el único punto que
+    las subclases necesitan sobrescribir.
+    """
+
+    def __init__(self, repository: ProductRepository):
+        self.repository = repository
+
+    def _call(self, method: str, *args, **kwargs):
+        return getattr(self.repository, method)(*args, **kwargs)
+
+    def get_available_products(self, country: Optional[str] = None,
+                               warehouse_id: Optional[str] = None) -> List[Product]:
+        return self._call('get_available_products', country=country, warehouse_id=warehouse_id)
+
+    def get_product_by_id(self, product_id: str) -> Optional[Product]:
+        return self._call('get_product_by_id', product_id)
+
+    def get_products_by_ids(self, product_ids: List[str]) -> Dict[str, Product]:
+        return self._call('get_products_by_ids', product_ids)
+
+    def update_product(self, product_id: str, price: float, stock: int,
+                       warehouse_id: str) -> Optional[List[StockScope]]:
+        return self._call('update_product', product_id=product_id, price=price,
+                          stock=stock, warehouse_id=warehouse_id)
+
+    def search_products(self, query: str, limit: int) -> List[Product]:
+        return self._call('search_products', query, limit)
+
+    def get_catalog_entries(self, product_ids: Optional[List[str]] = None) -> List[CatalogEntry]:
+        return self._call('get_catalog_entries', product_ids)
+
+    def get_product_ids(self) -> List[str]:
+        return self._call('get_product_ids')
+
+    def get_stock_countries(self) -> List[str]:
+        return self._call('get_stock_countries')
@@ -0,0 +1,45 @@
+# adapters/fault_injection_adapter.py
+import random
+import time
+from typing import Optional
+from repositories.product_repository import ProductRepository
+from adapters.delegating_adapter import DelegatingProductAdapter
+
+
+class InjectedFaultError(Exception):
+    """Fallo simulado de la base de datos (conexión caída o statement timeout)."""
+
+
+class FaultInjectingProductAdapter(DelegatingProductAdapter):
+    """
+    Envuelve un repositorio real y añade latencia y fallos aleatorios antes de cada
+    llamada. Sirve para las pruebas del circuit breaker y para el experimento de
+    latencia (PRODUCTS_FAULT_LATENCY_MS / PRODUCTS_FAULT_FAILURE_RATE).
+
+    Si la latencia inyectada supera `timeout`, se espera solo `timeout` y se lanza
+    un error, igual que haría `statement_timeout` en PostgreSQL.
+    """
+
+    def __init__(self, repository: ProductRepository, latency: float = 0.0,
+                 failure_rate: float = 0.0, timeout: Optional[float] = None,
+                 rng: Optional[random.Random] = None):
+        super().__init__(repository)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.timeout = timeout
+        self._rng = rng or random.Random()
+        self.calls = 0
+
+    def _inject(self) -> None:
+        self.calls += 1
+        if self.timeout is not None and self.latency > self.timeout:
+            time.sleep(self.timeout)
+            raise InjectedFaultError('canceling statement due to statement timeout')
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            raise InjectedFaultError('could not connect to server: Connection refused')
+
+    def _call(self, method: str, *args, **kwargs):
+        self._inject()
+        return super()._call(method, *args, **kwargs)
@@ -0,0 +1,20 @@
+# adapters/metrics_adapter.py
+import time
+from adapters.delegating_adapter import DelegatingProductAdapter
+from metrics import DB_CONNECTIONS_IN_USE, REPOSITORY_LATENCY
+
+
+class MetricsProductAdapter(DelegatingProductAdapter):
+    """Mide la latencia de cada método del repositorio y las conexiones en uso."""
+
+    def _call(self, method: str, *args, **kwargs):
+        outcome = 'error'
+        start = time.perf_counter()
+        DB_CONNECTIONS_IN_USE.inc()
+        try:
+            result = super()._call(method, *args, **kwargs)
+            outcome = 'ok'
+            return result
+        finally:
+            DB_CONNECTIONS_IN_USE.dec()
+            REPOSITORY_LATENCY.labels(method=method, outcome=outcome).observe(time.perf_counter() - start)
@@ -0,0 +1,128 @@
+# adapters/search_index.py
+"""
+Índices de búsqueda en proceso para el adaptador SQLite/offline.
+
+- SkuPrefixIndex: arreglo ordenado de SKUs + bisect para consultas por prefijo.
+- TrigramIndex: índice invertido de trigramas para coincidencia difusa por nombre,
+  equivalente en espíritu a `word_similarity` de pg_trgm.
+
+Ambos admiten `upsert`/`discard` por producto para seguir las escrituras sin reconstruirse.
+"""
+import heapq
+import re
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Dict, Iterable, List, Set, Tuple
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize_search_query(query: str) -> str:
+    """Normaliza la consulta: minúsculas y espacios colapsados."""
+    return ' '.join(query.casefold().split())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigramas por palabra con el mismo relleno que pg_trgm ('  pal ')."""
+    grams = set()
+    for word in _WORD_RE.findall(text.casefold()):
+        padded = f'  {word} '
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class SkuPrefixIndex:
+    """Arreglo ordenado de (SKU, product_id) para búsquedas por prefijo en O(log n + k)."""
+
+    def __init__(self, entries: Iterable[Tuple[str, str]] = ()):
+        self._by_id: Dict[str, str] = {pid: sku.upper() for sku, pid in entries}
+        self._entries: List[Tuple[str, str]] = sorted((sku, pid) for pid, sku in self._by_id.items())
+        self._skus: List[str] = [sku for sku, _ in self._entries]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def upsert(self, sku: str, product_id: str) -> None:
+        """Agrega o reemplaza el SKU de `product_id` manteniendo el orden."""
+        if self._by_id.get(product_id) == sku.upper():
+            return
+        self.discard(product_id)
+        entry = (sku.upper(), product_id)
+        self._by_id[product_id] = entry[0]
+        position = bisect_left(self._entries, entry)
+        self._entries.insert(position, entry)
+        self._skus.insert(position, entry[0])
+
+    def discard(self, product_id: str) -> None:
+        sku = self._by_id.pop(product_id, None)
+        if sku is None:
+            return
+        position = bisect_left(self._entries, (sku, product_id))
+        del self._entries[position]
+        del self._skus[position]
+
+    def search(self, prefix: str, limit: int) -> List[str]:
+        """Devuelve hasta `limit` product_id cuyo SKU empieza por `prefix` (orden por SKU)."""
+        prefix = prefix.upper()
+        start = bisect_left(self._skus, prefix)
+        result = []
+        for sku, product_id in self._entries[start:start + limit]:
+            if not sku.startswith(prefix):
+                break
+            result.append(product_id)
+        return result
+
+
+class TrigramIndex:
+    """Índice invertido trigrama -> productos para coincidencia difusa."""
+
+    def __init__(self, entries: Iterable[Tuple[str, str]] = (), threshold: float = 0.6):
+        self.threshold = threshold
+        self._postings: Dict[str, List[str]] = defaultdict(list)
+        self._texts: Dict[str, str] = {}
+        for product_id, text in entries:
+            self._texts[product_id] = text
+            for gram in trigrams(text):
+                self._postings[gram].append(product_id)
+
+    def __len__(self):
+        return len(self._texts)
+
+    def upsert(self, product_id: str, text: str) -> None:
+        """Agrega o reemplaza el texto indexado de `product_id`."""
+        if self._texts.get(product_id) == text:
+            return
+        self.discard(product_id)
+        self._texts[product_id] = text
+        for gram in trigrams(text):
+            self._postings[gram].append(product_id)
+
+    def discard(self, product_id: str) -> None:
+        text = self._texts.pop(product_id, None)
+        if text is None:
+            return
+        for gram in trigrams(text):
+            postings = self._postings[gram]
+            postings.remove(product_id)
+            if not postings:
+                del self._postings[gram]
+
+    def search(self, query: str, limit: int) -> List[Tuple[str, float]]:
+        """
+        Devuelve (product_id, score) ordenados por score descendente.
+        El score es la fracción de trigramas de la consulta presentes en el texto.
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        # Conteo de trigramas compartidos en C (Counter + chain) en vez de un bucle Python
+        counts = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in query_grams))
+        min_hits = self.threshold * len(query_grams)
+        total = len(query_grams)
+        best = heapq.nsmallest(
+            limit,
+            ((-hits, pid) for pid, hits in counts.items() if hits >= min_hits)
+        )
+        return [(pid, -neg_hits / total) for neg_hits, pid in best]
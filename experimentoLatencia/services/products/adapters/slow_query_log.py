@@ -0,0 +1,126 @@
+# adapters/slow_query_log.py
+import os
+import queue
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_statement(query: str) -> str:
+    """Colapsa espacios y quita comentarios de línea para agrupar sentencias iguales."""
+    without_comments = '\n'.join(line.split('--', 1)[0] for line in query.splitlines())
+    return _WHITESPACE_RE.sub(' ', without_comments).strip()
+
+
+def redact_params(params) -> Optional[List[str]]:
+    """Sustituye cada parámetro por su tipo (y longitud): los logs no exponen datos."""
+    if params is None:
+        return None
+    if not isinstance(params, (list, tuple)):
+        params = (params,)
+    redacted = []
+    for value in params:
+        if isinstance(value, (str, bytes, list, tuple)):
+            redacted.append(f'<{type(value).__name__} len={len(value)}>')
+        else:
+            redacted.append(f'<{type(value).__name__}>')
+    return redacted
+
+
+class SlowQueryLog:
+    """
+    Registro de sentencias que superan `threshold` segundos.
+
+    Mantiene en memoria las `top_n` sentencias (agrupadas por texto normalizado) con
+    mayor duración máxima. La primera vez que una sentencia aparece como lenta se
+    encola su EXPLAIN, que un hilo de fondo ejecuta con su propia conexión para no
+    sumar latencia a la petición que la disparó.
+    """
+
+    def __init__(self, threshold: float, top_n: int = 50,
+                 explain: Optional[Callable[[str, Sequence], str]] = None, max_pending_explains: int = 100):
+        self.threshold = threshold
+        self.top_n = top_n
+        self.explain = explain
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, object]] = {}
+        self._explain_queue: queue.Queue = queue.Queue(maxsize=max_pending_explains)
+        self._explain_worker: Optional[threading.Thread] = None
+        self.dropped_explains = 0
+
+    def record(self, query: str, params, duration: float, rowcount: int) -> None:
+        """Registra la ejecución si es lenta; las rápidas salen sin tomar el lock."""
+        if duration < self.threshold:
+            return
+        statement = normalize_statement(query)
+        redacted = redact_params(params)
+        print(f"[slow-query] {duration * 1000:.1f} ms rows={rowcount} params={redacted} sql={statement[:300]}")
+
+        with self._lock:
+            entry = self._entries.get(statement)
+            if entry is None:
+                if len(self._entries) >= self.top_n:
+                    fastest = min(self._entries, key=lambda key: self._entries[key]['max_ms'])
+                    if self._entries[fastest]['max_ms'] >= duration * 1000:
+                        return
+                    del self._entries[fastest]
+                entry = self._entries[statement] = {
+                    'statement': statement, 'count': 0, 'max_ms': 0.0, 'total_ms': 0.0,
+                    'plan': None, 'plan_error': None,
+                }
+                self._enqueue_explain(statement, query, params)
+            entry['count'] += 1
+            entry['total_ms'] += duration * 1000
+            entry['last_ms'] = round(duration * 1000, 2)
+            entry['last_rows'] = rowcount
+            entry['last_params'] = redacted
+            entry['last_seen'] = time.time()
+            if duration * 1000 > entry['max_ms']:
+                entry['max_ms'] = round(duration * 1000, 2)
+
+    def _enqueue_explain(self, statement: str, query: str, params) -> None:
+        if self.explain is None:
+            return
+        if self._explain_worker is None:
+            self._explain_worker = threading.Thread(target=self._explain_loop, name='slow-query-explain',
+                                                    daemon=True)
+            self._explain_worker.start()
+        try:
+            self._explain_queue.put_nowait((statement, query, params))
+        except queue.Full:
+            self.dropped_explains += 1
+
+    def _explain_loop(self) -> None:
+        while True:
+            statement, query, params = self._explain_queue.get()
+            try:
+                plan, error = self.explain(query, params), None
+            except Exception as e:
+                plan, error = None, str(e)
+            with self._lock:
+                entry = self._entries.get(statement)
+                if entry is not None:
+                    entry['plan'], entry['plan_error'] = plan, error
+
+    def top(self, limit: Optional[int] = None) -> List[Dict[str, object]]:
+        """Sentencias ordenadas por duración máxima descendente."""
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: entry['max_ms'], reverse=True)
+            result = []
+            for entry in entries[:limit]:
+                item = dict(entry)
+                item['avg_ms'] = round(item.pop('total_ms') / item['count'], 2)
+                result.append(item)
+            return result
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            'pid': os.getpid(),
+            'threshold_ms': self.threshold * 1000,
+            'tracked_statements': len(self._entries),
+            'pending_explains': self._explain_queue.qsize(),
+            'dropped_explains': self.dropped_explains,
+        }
@@ -1,33 +1,101 @@
 import psycopg2
 from psycopg2.extras import RealDictCursor, register_uuid
-from typing import List, Optional
+from typing import Dict, List, Optional
 from repositories.product_repository import ProductRepository
-from domain.models import Product
-from config import DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS
+from domain.models import CatalogEntry, Product, StockScope
+import time
+import server_timing
+from adapters.slow_query_log import SlowQueryLog
+from config import (DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS, DB_CONNECT_TIMEOUT, DB_STATEMENT_TIMEOUT_MS,
+                    SEARCH_MIN_SIMILARITY)
 
 class PostgreSQLProductAdapter(ProductRepository):
     """Implementación del repositorio de productos para PostgreSQL (RDS)."""
 
-    def _get_connection(self):
-        """Método helper para establecer la conexión a PostgreSQL y devolver un cursor de diccionario."""
-        conn = psycopg2.connect(
+    def __init__(self, slow_query_log: Optional[SlowQueryLog] = None,
+                 min_similarity: float = SEARCH_MIN_SIMILARITY):
+        self.slow_query_log = slow_query_log
+        self.min_similarity = min_similarity
+
+    @staticmethod
+    def _connect():
+        return psycopg2.connect(
             host=DB_HOST,
             port=DB_PORT,
             database=DB_NAME,
             user=DB_USER,
-            password=DB_PASS
+            password=DB_PASS,
+            connect_timeout=DB_CONNECT_TIMEOUT,
+            # Cancela en el servidor cualquier consulta que supere el límite
+            options=f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}'
         )
+
+    def _get_connection(self):
+        """Método helper para establecer la conexión a PostgreSQL y devolver un cursor de diccionario."""
+        with server_timing.phase('db-connect'):
+            conn = self._connect()
         # Usamos RealDictCursor para obtener resultados como diccionarios (nombre de columna: valor),
         # similar a sqlite3.Row.
         return conn, conn.cursor(cursor_factory=RealDictCursor)
 
+    def _execute(self, cursor, query: str, params=None) -> None:
+        """
+        Punto único de ejecución de sentencias: fase db-query de Server-Timing y
+        registro de sentencias lentas (con EXPLAIN asíncrono).
+        """
+        start = time.perf_counter()
+        try:
+            cursor.execute(query, params)
+        finally:
+            duration = time.perf_counter() - start
+            server_timing.add('db-query', duration)
+            if self.slow_query_log is not None:
+                self.slow_query_log.record(query, params, duration, cursor.rowcount)
+
+    def explain(self, query: str, params=None) -> str:
+        """Plan estimado (EXPLAIN sin ANALYZE: no ejecuta la sentencia) con una conexión propia."""
+        conn = self._connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('EXPLAIN ' + query, params)
+                return '\n'.join(row[0] for row in cursor.fetchall())
+        finally:
+            conn.rollback()
+            conn.close()
+
+    @staticmethod
+    def _fetch_products(cursor) -> List[Product]:
+        """Materializa las filas del cursor como Product (fase materialize)."""
+        with server_timing.phase('materialize'):
+            return [
+                Product(
+                    product_id=row['product_id'],
+                    sku=row['sku'],
+                    value=row['value'],
+                    category_name=row['category_name'],
+                    total_quantity=row['total_quantity']
+                ) for row in cursor.fetchall()
+            ]
+
     # -------------------------------------------------------------
     # Implementación de get_available_products
     # -------------------------------------------------------------
-    def get_available_products(self) -> List[Product]:
+    def get_available_products(self, country: Optional[str] = None,
+                               warehouse_id: Optional[str] = None) -> List[Product]:
         conn, cursor = self._get_connection()
 
-        query = '''
+        # Los filtros por país/bodega se empujan al SQL para que el planificador use
+        # los índices de cobertura de ProductStock en lugar de agregar todo el inventario.
+        filters = ["ps.quantity > 0"]
+        params = []
+        if country:
+            filters.append("ps.country = %s")
+            params.append(country)
+        if warehouse_id:
+            filters.append("ps.warehouse_id = %s")
+            params.append(warehouse_id)
+
+        query = f'''
         SELECT 
             p.product_id,
             p.sku,
@@ -41,7 +109,7 @@ class PostgreSQLProductAdapter(ProductRepository):
         JOIN 
             ProductStock ps ON p.product_id = ps.product_id
         WHERE
-            ps.quantity > 0
+            {" AND ".join(filters)}
         GROUP BY
             p.product_id, p.sku, p.value, c.name -- PostgreSQL requiere agrupar por todas las columnas no agregadas
         ORDER BY
@@ -49,20 +117,8 @@ class PostgreSQLProductAdapter(ProductRepository):
         '''
 
         try:
-            cursor.execute(query)
-            results = cursor.fetchall()
-
-            products = [
-                Product(
-                    product_id=row['product_id'],
-                    sku=row['sku'],
-                    value=row['value'],
-                    category_name=row['category_name'],
-                    total_quantity=row['total_quantity']
-                ) for row in results
-            ]
-
-            return products
+            self._execute(cursor, query, tuple(params))
+            return self._fetch_products(cursor)
 
         finally:
             cursor.close()
@@ -98,7 +154,7 @@ class PostgreSQLProductAdapter(ProductRepository):
 
         try:
             # 💡 Pasar los parámetros como una tupla (product_id,)
-            cursor.execute(query, (product_id,))
+            self._execute(cursor, query, (product_id,))
             row = cursor.fetchone()
 
             if row:
@@ -116,12 +172,52 @@ class PostgreSQLProductAdapter(ProductRepository):
             cursor.close()
             conn.close()
 
+    # -------------------------------------------------------------
+    # Implementación de get_products_by_ids
+    # -------------------------------------------------------------
+    def get_products_by_ids(self, product_ids: List[str]) -> Dict[str, Product]:
+        """Varios productos en una sola consulta (`= ANY(%s)` usa la clave primaria)."""
+        product_ids = list(dict.fromkeys(product_ids))
+        if not product_ids:
+            return {}
+        conn, cursor = self._get_connection()
+
+        query = '''
+        SELECT 
+            p.product_id,
+            p.sku,
+            p.value,
+            c.name AS category_name,
+            SUM(ps.quantity) AS total_quantity
+        FROM 
+            Product p
+        JOIN 
+            Category c ON p.category_id = c.category_id
+        JOIN 
+            ProductStock ps ON p.product_id = ps.product_id
+        WHERE
+            p.product_id = ANY(%s)
+        GROUP BY
+            p.product_id, p.sku, p.value, c.name;
+        '''
+
+        try:
+            self._execute(cursor, query, (product_ids,))
+            return {product.product_id: product for product in self._fetch_products(cursor)}
+
+        finally:
+            cursor.close()
+            conn.close()
+
     # -------------------------------------------------------------
     # Implementación de update_product
     # -------------------------------------------------------------
-    def update_product(self, product_id: str, price: float, stock: int) -> None:
+    def update_product(self, product_id: str, price: float, stock: int,
+                       warehouse_id: str) -> Optional[List[StockScope]]:
         """
-        Actualiza el precio y el stock de un producto por su ID.
+        Actualiza el precio y el stock de un producto por su ID y bodega.
+        Devuelve los ámbitos (bodega, país) en los que el producto tiene stock,
+        o None si el producto no existe.
         """
         conn, cursor = self._get_connection()
 
@@ -134,16 +230,29 @@ class PostgreSQLProductAdapter(ProductRepository):
             UPDATE ProductStock
             SET quantity = %s
             WHERE product_id = %s 
-            AND warehouse_id = 'W-003';
+            AND warehouse_id = %s;
+        '''
+        # El precio aparece en todos los listados donde el producto tiene stock,
+        # así que esos son los ámbitos que deben invalidarse.
+        query_scopes = '''
+            SELECT DISTINCT warehouse_id, country
+            FROM ProductStock
+            WHERE product_id = %s;
         '''
 
         try:
             # 💡 Parámetros como tupla para psycopg2
-            cursor.execute(query_product, (price, product_id))
-            cursor.execute(query_stock, (stock, product_id))
+            self._execute(cursor, query_product, (price, product_id))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                return None
+            self._execute(cursor, query_stock, (stock, product_id, warehouse_id))
+            self._execute(cursor, query_scopes, (product_id,))
+            scopes = [StockScope(row['warehouse_id'], row['country']) for row in cursor.fetchall()]
 
             # Confirmar la transacción
             conn.commit()
+            return scopes
 
         except Exception as e:
             # Revertir si hay un error en cualquier operación
@@ -152,4 +261,125 @@ class PostgreSQLProductAdapter(ProductRepository):
 
         finally:
             cursor.close()
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+    # -------------------------------------------------------------
+    # Implementación de search_products
+    # -------------------------------------------------------------
+    def search_products(self, query: str, limit: int) -> List[Product]:
+        """
+        Busca por prefijo de SKU o por similitud difusa de objective_profile.
+        Ambos predicados se resuelven con los índices GIN de pg_trgm.
+        """
+        conn, cursor = self._get_connection()
+
+        # `<%` es word_similarity de pg_trgm (se escapa como `<%%` para psycopg2) y compara
+        # contra pg_trgm.word_similarity_threshold: se fija a SEARCH_MIN_SIMILARITY solo
+        # para esta transacción, igual que el umbral del índice de trigramas de SQLite
+        sql = '''
+        SELECT 
+            p.product_id,
+            p.sku,
+            p.value,
+            c.name AS category_name,
+            SUM(ps.quantity) AS total_quantity,
+            CASE WHEN p.sku LIKE %s THEN 1.0
+                 ELSE word_similarity(%s, p.objective_profile) END AS score
+        FROM 
+            Product p
+        JOIN 
+            Category c ON p.category_id = c.category_id
+        JOIN 
+            ProductStock ps ON p.product_id = ps.product_id
+        WHERE
+            ps.quantity > 0
+            AND (p.sku LIKE %s OR %s <%% p.objective_profile)
+        GROUP BY
+            p.product_id, p.sku, p.value, c.name
+        ORDER BY
+            score DESC, p.sku
+        LIMIT %s;
+        '''
+        prefix = query.upper().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+        try:
+            self._execute(cursor, "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true);",
+                          (str(self.min_similarity),))
+            self._execute(cursor, sql, (prefix, query, prefix, query, limit))
+            return self._fetch_products(cursor)
+
+        finally:
+            cursor.close()
+            conn.close()
+
+
+    # -------------------------------------------------------------
+    # Implementación de get_catalog_entries
+    # -------------------------------------------------------------
+    def get_catalog_entries(self, product_ids: Optional[List[str]] = None) -> List[CatalogEntry]:
+        """Atributos de faceta; `countries` solo incluye países con stock > 0."""
+        conn, cursor = self._get_connection()
+
+        where = "WHERE p.product_id = ANY(%s)" if product_ids is not None else ""
+        query = f'''
+        SELECT 
+            p.product_id,
+            c.name AS category_name,
+            p.provider_id,
+            p.objective_profile,
+            COALESCE(
+                ARRAY_AGG(DISTINCT ps.country) FILTER (WHERE ps.quantity > 0),
+                ARRAY[]::VARCHAR[]
+            ) AS countries
+        FROM 
+            Product p
+        JOIN 
+            Category c ON p.category_id = c.category_id
+        LEFT JOIN 
+            ProductStock ps ON p.product_id = ps.product_id
+        {where}
+        GROUP BY
+            p.product_id, c.name, p.provider_id, p.objective_profile;
+        '''
+
+        try:
+            self._execute(cursor, query, (list(product_ids),) if product_ids is not None else None)
+            return [
+                CatalogEntry(
+                    product_id=row['product_id'],
+                    category_name=row['category_name'],
+                    provider_id=row['provider_id'],
+                    objective_profile=row['objective_profile'],
+                    countries=tuple(row['countries'])
+                ) for row in cursor.fetchall()
+            ]
+
+        finally:
+            cursor.close()
+            conn.close()
+
+    # -------------------------------------------------------------
+    # Implementación de get_product_ids
+    # -------------------------------------------------------------
+    def get_product_ids(self) -> List[str]:
+        """IDs de todo el catálogo; se resuelve con el índice de la clave primaria."""
+        conn, cursor = self._get_connection()
+        try:
+            self._execute(cursor, "SELECT product_id FROM Product;")
+            return [row['product_id'] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.close()
+
+    # -------------------------------------------------------------
+    # Implementación de get_stock_countries
+    # -------------------------------------------------------------
+    def get_stock_countries(self) -> List[str]:
+        """Países con stock; recorre solo el índice parcial idx_productstock_country_product."""
+        conn, cursor = self._get_connection()
+        try:
+            self._execute(cursor, "SELECT DISTINCT country FROM ProductStock WHERE quantity > 0 ORDER BY country;")
+            return [row['country'] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.close()
@@ -0,0 +1,402 @@
+# adapters/sqlite_adapter.py
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from repositories.product_repository import ProductRepository
+from domain.models import CatalogEntry, Product, StockScope
+from adapters.search_index import SkuPrefixIndex, TrigramIndex
+import server_timing
+from config import (SEARCH_INDEX_REFRESH_SECONDS, SEARCH_MIN_SIMILARITY, SQLITE_BUSY_TIMEOUT, SQLITE_CACHE_SIZE_KB, SQLITE_CACHED_STATEMENTS,
+                    SQLITE_DB_PATH, SQLITE_MMAP_SIZE)
+
+_PRODUCT_COLUMNS = '''
+            p.product_id,
+            p.sku,
+            p.value,
+            c.name AS category_name,
+            SUM(ps.quantity) AS total_quantity
+'''
+
+
+class SQLiteProductAdapter(ProductRepository):
+    """Implementación del repositorio de productos para SQLite (modo offline / edge)."""
+
+    def __init__(self, db_path: str = SQLITE_DB_PATH, persistent: bool = True,
+                 min_similarity: float = SEARCH_MIN_SIMILARITY):
+        self.db_path = db_path
+        self.persistent = persistent
+        self.min_similarity = min_similarity
+        self._local = threading.local()
+        self._search_lock = threading.Lock()
+        self._search_build_lock = threading.Lock()
+        self._sku_index: Optional[SkuPrefixIndex] = None
+        self._name_index: Optional[TrigramIndex] = None
+        self._search_built_at: Optional[float] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Conexión en modo WAL (los lectores no bloquean al escritor) con mmap y caché de
+        páginas. `cached_statements` mantiene compiladas las sentencias ya ejecutadas.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT, cached_statements=SQLITE_CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA mmap_size = {int(SQLITE_MMAP_SIZE)}")
+        conn.execute(f"PRAGMA cache_size = -{int(SQLITE_CACHE_SIZE_KB)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """
+        Conexión del hilo actual. Con `persistent=False` se abre una nueva en cada
+        llamada (comportamiento anterior, solo para comparar en benchmarks) y se
+        cierra al salir del bloque.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+        with server_timing.phase('db-connect'):
+            conn = self._connect()
+        if self.persistent:
+            self._local.conn = conn
+            yield conn
+            return
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        """Cierra la conexión del hilo actual."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @staticmethod
+    def _to_product(row) -> Product:
+        return Product(
+            product_id=row['product_id'],
+            sku=row['sku'],
+            value=row['value'],
+            category_name=row['category_name'],
+            total_quantity=row['total_quantity']
+        )
+
+    def setup_database(self, script_path: str = 'insert_data.sql') -> None:
+        """Crea las tablas y carga los datos de ejemplo si la base está vacía."""
+        with self._connection() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Product'"
+            ).fetchone()
+            if not exists or conn.execute("SELECT COUNT(*) FROM Product").fetchone()[0] == 0:
+                print("Creando registros de base de datos...")
+                with open(script_path, 'r') as f:
+                    conn.executescript(f.read())
+                print("Registros creados exitosamente.")
+            conn.commit()
+        self.create_indexes()
+        # Los datos pudieron cambiar: la próxima búsqueda reconstruye los índices
+        self._search_built_at = None
+
+    def create_indexes(self) -> None:
+        """Índices equivalentes a los de PostgreSQL para joins y filtros por ámbito."""
+        with self._connection() as conn:
+            conn.executescript('''
+                CREATE INDEX IF NOT EXISTS idx_productstock_product
+                    ON ProductStock (product_id, warehouse_id, quantity, country);
+                CREATE INDEX IF NOT EXISTS idx_productstock_country_product
+                    ON ProductStock (country, product_id, quantity) WHERE quantity > 0;
+                CREATE INDEX IF NOT EXISTS idx_productstock_warehouse_product
+                    ON ProductStock (warehouse_id, product_id, quantity) WHERE quantity > 0;
+            ''')
+            conn.commit()
+
+    # -------------------------------------------------------------
+    # Implementación de get_available_products
+    # -------------------------------------------------------------
+    def get_available_products(self, country: Optional[str] = None,
+                               warehouse_id: Optional[str] = None) -> List[Product]:
+        filters = ["ps.quantity > 0"]
+        params = []
+        if country:
+            filters.append("ps.country = ?")
+            params.append(country)
+        if warehouse_id:
+            filters.append("ps.warehouse_id = ?")
+            params.append(warehouse_id)
+
+        query = f'''
+        SELECT {_PRODUCT_COLUMNS}
+        FROM
+            Product p
+        JOIN
+            Category c ON p.category_id = c.category_id
+        JOIN
+            ProductStock ps ON p.product_id = ps.product_id
+        WHERE
+            {" AND ".join(filters)}
+        GROUP BY
+            p.product_id
+        ORDER BY
+            p.sku;
+        '''
+
+        with self._connection() as conn, server_timing.phase('db-query'):
+            rows = conn.execute(query, params).fetchall()
+        with server_timing.phase('materialize'):
+            return [self._to_product(row) for row in rows]
+
+    # -------------------------------------------------------------
+    # Implementación de get_product_by_id
+    # -------------------------------------------------------------
+    def get_product_by_id(self, product_id: str) -> Optional[Product]:
+        """Obtiene un producto por su ID."""
+        query = f'''
+        SELECT {_PRODUCT_COLUMNS}
+        FROM
+            Product p
+        JOIN
+            Category c ON p.category_id = c.category_id
+        JOIN
+            ProductStock ps ON p.product_id = ps.product_id
+        WHERE
+            p.product_id = ?
+        GROUP BY
+            p.product_id;
+        '''
+
+        with self._connection() as conn, server_timing.phase('db-query'):
+            row = conn.execute(query, (product_id,)).fetchone()
+        return self._to_product(row) if row else None
+
+    # -------------------------------------------------------------
+    # Implementación de get_products_by_ids
+    # -------------------------------------------------------------
+    def get_products_by_ids(self, product_ids: List[str]) -> Dict[str, Product]:
+        """Misma consulta que get_product_by_id con `IN (...)`: un solo viaje a la base."""
+        product_ids = list(dict.fromkeys(product_ids))
+        if not product_ids:
+            return {}
+        query = f'''
+        SELECT {_PRODUCT_COLUMNS}
+        FROM
+            Product p
+        JOIN
+            Category c ON p.category_id = c.category_id
+        JOIN
+            ProductStock ps ON p.product_id = ps.product_id
+        WHERE
+            p.product_id IN ({','.join('?' * len(product_ids))})
+        GROUP BY
+            p.product_id;
+        '''
+
+        with self._connection() as conn, server_timing.phase('db-query'):
+            rows = conn.execute(query, product_ids).fetchall()
+        with server_timing.phase('materialize'):
+            return {row['product_id']: self._to_product(row) for row in rows}
+
+    # -------------------------------------------------------------
+    # Implementación de update_product
+    # -------------------------------------------------------------
+    def update_product(self, product_id: str, price: float, stock: int,
+                       warehouse_id: str) -> Optional[List[StockScope]]:
+        """
+        Actualiza el precio y el stock de un producto por su ID y bodega.
+        Devuelve los ámbitos (bodega, país) en los que el producto tiene stock,
+        o None si el producto no existe.
+        """
+        with self._connection() as conn:
+            try:
+                updated = conn.execute("UPDATE Product SET value = ? WHERE product_id = ?;", (price, product_id))
+                if updated.rowcount == 0:
+                    conn.rollback()
+                    return None
+                conn.execute(
+                    "UPDATE ProductStock SET quantity = ? WHERE product_id = ? AND warehouse_id = ?;",
+                    (stock, product_id, warehouse_id)
+                )
+                rows = conn.execute(
+                    "SELECT DISTINCT warehouse_id, country FROM ProductStock WHERE product_id = ?;",
+                    (product_id,)
+                ).fetchall()
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            self._refresh_search_entry(conn, product_id)
+        return [StockScope(row['warehouse_id'], row['country']) for row in rows]
+
+    # -------------------------------------------------------------
+    # Implementación de search_products
+    # -------------------------------------------------------------
+    def _search_indexes_fresh(self) -> bool:
+        if self._sku_index is None or self._search_built_at is None:
+            return False
+        age = time.monotonic() - self._search_built_at
+        return SEARCH_INDEX_REFRESH_SECONDS <= 0 or age < SEARCH_INDEX_REFRESH_SECONDS
+
+    def _ensure_search_indexes(self) -> None:
+        """
+        Construye el arreglo ordenado de SKUs y el índice de trigramas en el primer uso y
+        los reconstruye cada SEARCH_INDEX_REFRESH_SECONDS (altas hechas fuera del adaptador).
+        """
+        if self._search_indexes_fresh():
+            return
+        # Con índices ya construidos, un solo hilo reconstruye y los demás siguen con los actuales
+        if not self._search_build_lock.acquire(blocking=self._sku_index is None):
+            return
+        try:
+            if self._search_indexes_fresh():
+                return
+            with self._connection() as conn:
+                rows = conn.execute("SELECT product_id, sku, objective_profile FROM Product").fetchall()
+            name_index = TrigramIndex(
+                ((row['product_id'], row['objective_profile']) for row in rows),
+                threshold=self.min_similarity
+            )
+            sku_index = SkuPrefixIndex((row['sku'], row['product_id']) for row in rows)
+            with self._search_lock:
+                self._name_index, self._sku_index = name_index, sku_index
+                self._search_built_at = time.monotonic()
+        finally:
+            self._search_build_lock.release()
+
+    def _refresh_search_entry(self, conn: sqlite3.Connection, product_id: str) -> None:
+        """Sincroniza SKU y nombre de un producto escrito por este adaptador (si los índices existen)."""
+        if self._sku_index is None:
+            return
+        row = conn.execute("SELECT sku, objective_profile FROM Product WHERE product_id = ?", (product_id,)).fetchone()
+        with self._search_lock:
+            if self._sku_index is None:
+                return
+            if row is None:
+                self._sku_index.discard(product_id)
+                self._name_index.discard(product_id)
+            else:
+                self._sku_index.upsert(row['sku'], product_id)
+                self._name_index.upsert(product_id, row['objective_profile'])
+
+    def _search_candidates(self, query: str, fetch: int):
+        """
+        Hasta `fetch` IDs: primero por prefijo de SKU (orden por SKU), luego difusos por
+        score. Devuelve además si ambos índices se agotaron antes de `fetch`.
+        """
+        with self._search_lock:
+            candidate_ids = self._sku_index.search(query, fetch)
+            exhausted = len(candidate_ids) < fetch
+            if exhausted:
+                seen = set(candidate_ids)
+                fuzzy = self._name_index.search(query, fetch)
+                exhausted = len(fuzzy) < fetch
+                for product_id, _score in fuzzy:
+                    if product_id not in seen:
+                        candidate_ids.append(product_id)
+                        seen.add(product_id)
+        return candidate_ids[:fetch], exhausted
+
+    def _get_available_by_ids(self, product_ids: List[str]) -> Dict[str, Product]:
+        if not product_ids:
+            return {}
+        placeholders = ','.join('?' * len(product_ids))
+        query = f'''
+        SELECT {_PRODUCT_COLUMNS}
+        FROM
+            Product p
+        JOIN
+            Category c ON p.category_id = c.category_id
+        JOIN
+            ProductStock ps ON p.product_id = ps.product_id
+        WHERE
+            ps.quantity > 0 AND p.product_id IN ({placeholders})
+        GROUP BY
+            p.product_id;
+        '''
+        with self._connection() as conn:
+            return {row['product_id']: self._to_product(row) for row in conn.execute(query, product_ids)}
+
+    def search_products(self, query: str, limit: int) -> List[Product]:
+        """
+        Busca por prefijo de SKU y, después, por similitud difusa del nombre. Los índices
+        no conocen el stock: se piden el doble de candidatos y, si los agotados dejan menos
+        de `limit` resultados, se sigue duplicando hasta completar o agotar los índices.
+        """
+        self._ensure_search_indexes()
+        products: Dict[str, Product] = {}
+        checked = 0
+        fetch = max(1, limit) * 2
+        while True:
+            candidate_ids, exhausted = self._search_candidates(query, fetch)
+            # Precio y stock siempre se leen de la base; solo se consultan los candidatos nuevos
+            products.update(self._get_available_by_ids(candidate_ids[checked:]))
+            checked = len(candidate_ids)
+            if len(products) >= limit or exhausted:
+                break
+            fetch *= 2
+        return [products[pid] for pid in candidate_ids if pid in products][:limit]
+
+
+    # -------------------------------------------------------------
+    # Implementación de get_catalog_entries
+    # -------------------------------------------------------------
+    def get_catalog_entries(self, product_ids: Optional[List[str]] = None) -> List[CatalogEntry]:
+        """Atributos de faceta; `countries` solo incluye países con stock > 0."""
+        params: List[str] = []
+        where = ""
+        if product_ids is not None:
+            if not product_ids:
+                return []
+            where = f"WHERE p.product_id IN ({','.join('?' * len(product_ids))})"
+            params = list(product_ids)
+
+        query = f'''
+        SELECT
+            p.product_id,
+            c.name AS category_name,
+            p.provider_id,
+            p.objective_profile,
+            GROUP_CONCAT(DISTINCT CASE WHEN ps.quantity > 0 THEN ps.country END) AS countries
+        FROM
+            Product p
+        JOIN
+            Category c ON p.category_id = c.category_id
+        LEFT JOIN
+            ProductStock ps ON p.product_id = ps.product_id
+        {where}
+        GROUP BY
+            p.product_id;
+        '''
+
+        with self._connection() as conn:
+            return [
+                CatalogEntry(
+                    product_id=row['product_id'],
+                    category_name=row['category_name'],
+                    provider_id=row['provider_id'],
+                    objective_profile=row['objective_profile'],
+                    countries=tuple(sorted(row['countries'].split(','))) if row['countries'] else ()
+                ) for row in conn.execute(query, params)
+            ]
+
+    # -------------------------------------------------------------
+    # Implementación de get_product_ids
+    # -------------------------------------------------------------
+    def get_product_ids(self) -> List[str]:
+        """IDs de todo el catálogo (con o sin stock)."""
+        with self._connection() as conn:
+            return [row['product_id'] for row in conn.execute("SELECT product_id FROM Product")]
+
+    # -------------------------------------------------------------
+    # Implementación de get_stock_countries
+    # -------------------------------------------------------------
+    def get_stock_countries(self) -> List[str]:
+        """Países con stock; recorre solo el índice parcial idx_productstock_country_product."""
+        with self._connection() as conn:
+            return [row['country'] for row in conn.execute(
+                "SELECT DISTINCT country FROM ProductStock WHERE quantity > 0 ORDER BY country")]
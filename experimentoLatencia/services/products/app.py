@@ -1,18 +1,49 @@
-from flask import Flask, jsonify, request, make_response
-from adapters.sql_adapter import PostgreSQLProductAdapter
+from flask import Flask, abort, g, jsonify, request, make_response
 from services.product_service import ProductService
-from database_setup import setup_database
+from services.facet_index import FACETS, FacetIndex
+from services.bloom_filter import BloomFilter
+from services.circuit_breaker import DEFAULT_TRANSIENT_ERRORS, CircuitBreaker, RepositoryUnavailableError
+from adapters.cache_backends import InProcessCacheBackend, RedisCacheBackend
+from adapters.cached_repository_adapter import CachedProductRepository
+from adapters.circuit_breaker_adapter import CircuitBreakerProductAdapter
+from adapters.metrics_adapter import MetricsProductAdapter
+import server_timing
+from profiling import MODES as PROFILING_MODES, SORT_KEYS as PROFILING_SORT_KEYS, MemoryTracker, RequestProfiler, route_slug
+from warmup import CacheWarmer, HotProductCounter
+from metrics import CACHE_EVENTS, CIRCUIT_OPEN, HTTP_LATENCY, HTTP_REQUESTS, RESPONSE_SIZE, render_metrics
+from serializers.product_serializer import get_serializer, product_to_dict
+from cache_keys import (FACETS_VERSION_KEY, HOT_PRODUCTS_KEY, PROFILING_SETTINGS_KEY, WARMUP_LOCK_KEY, availability_key, availability_keys_for_scopes, facets_change_key,
+                        filtered_availability_key, missing_product_key, normalize_scope_value, product_key,
+                        search_key, stale_key)
+from adapters.search_index import normalize_search_query
+from config import (BREAKER_FAILURE_RATE, BREAKER_MIN_CALLS, BREAKER_RESET_TIMEOUT, BREAKER_WINDOW,
+                    DEBUG_TOKEN, METRICS_TOKEN, PROFILE_DIR, SLOW_QUERY_EXPLAIN, SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_TOP_N, PROFILING_INTERVAL_MS, PROFILING_MODE, PROFILING_SAMPLE_RATE,
+                    NEGATIVE_CACHE_TTL, PRODUCT_FILTER_ERROR_RATE, PRODUCT_FILTER_REFRESH_SECONDS,
+                    PRODUCTS_ADAPTER, PRODUCTS_BATCH_MAX_IDS, PRODUCTS_FAULT_FAILURE_RATE, PRODUCTS_FAULT_LATENCY_MS,
+                    REPOSITORY_CACHE_BACKEND, REPOSITORY_CACHE_MAX_ENTRIES, REPOSITORY_CACHE_TTLS,
+                    SEARCH_MAX_RESULTS, STALE_CACHE_TTL, HOT_PRODUCTS_FLUSH_SECONDS, WARMUP_BATCH_SIZE,
+                    WARMUP_BUDGET_SECONDS, WARMUP_CONCURRENCY, WARMUP_ENABLED, WARMUP_REFRESH_SECONDS,
+                    WARMUP_TOP_PRODUCTS)
+from collections import Counter
 from flask_caching import Cache
 from functools import wraps
 import os
+import hmac
 import json
+import logging
+import random
+import threading
+import time
 
 REDIS_HOST = os.environ.get('CACHE_HOST')
 REDIS_PORT = os.environ.get('CACHE_PORT', '6379')
 REDIS_DB = os.environ.get('CACHE_DB', '0')
+# RedisCache en AWS; SimpleCache/NullCache solo para el benchmark offline (experiment/offline_benchmark.py)
+CACHE_TYPE = os.environ.get('CACHE_TYPE', 'RedisCache')
 
 config = {
-    "CACHE_TYPE": "RedisCache",
+    "CACHE_TYPE": CACHE_TYPE,
+    "CACHE_THRESHOLD": int(os.environ.get('CACHE_THRESHOLD', '500')),
     "CACHE_REDIS_HOST": REDIS_HOST,
     "CACHE_REDIS_PORT": REDIS_PORT,
     "CACHE_REDIS_DB": REDIS_DB
@@ -20,29 +51,65 @@ config = {
 
 app = Flask(__name__)
 app.config.from_mapping(config)
+# Diagnósticos de arranque (calentamiento) a nivel INFO en el stderr de gunicorn
+app.logger.setLevel(logging.INFO)
 cache = Cache(app)
+serializer = get_serializer()
+
+# TTL de las respuestas cacheadas (también los usa el calentamiento)
+AVAILABLE_CACHE_TTL = 180
+PRODUCT_CACHE_TTL = 180
+
+
+def json_response(payload: bytes, status=200):
+    """Construye la respuesta a partir de bytes JSON ya serializados."""
+    return app.response_class(payload, status=status, mimetype='application/json')
 
 
 def cache_control_header(timeout=None, key = ""):
+    """
+    `key` puede ser una cadena fija o una función que calcula la clave a partir del
+    request (p. ej. para particionar la caché por país/bodega).
+
+    Cada respuesta exitosa se guarda además bajo una clave de respaldo de larga
+    duración; si la base no está disponible (circuito abierto o timeout) se sirve
+    esa copia con `X-Cache: STALE-FALLBACK` en lugar de fallar.
+    """
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            cache_key = key if key != "" else  request.full_path
+            if callable(key):
+                cache_key = key()
+            else:
+                cache_key = key if key != "" else  request.full_path
             # Intenta obtener la respuesta del caché
-            cached_response = cache.get(cache_key)
+            with server_timing.phase('cache'):
+                cached_response = cache.get(cache_key)
 
             if cached_response is not None:
                 # Si la respuesta está en caché, la devolvemos con el encabezado HIT
-                response = make_response(cached_response)
+                response = json_response(cached_response)
                 response.headers['X-Cache'] = 'HIT'
                 return response
             else:
                 # Si no está en caché, generamos la respuesta
-                response = make_response(f(*args, **kwargs))
+                try:
+                    response = make_response(f(*args, **kwargs))
+                except RepositoryUnavailableError:
+                    stale_response = cache.get(stale_key(cache_key))
+                    if stale_response is None:
+                        raise
+                    response = json_response(stale_response)
+                    response.headers['X-Cache'] = 'STALE-FALLBACK'
+                    return response
                 response.headers['X-Cache'] = 'MISS'
 
-                # Guardamos la respuesta en la caché antes de devolverla
-                cache.set(cache_key, response.data, timeout=timeout)
+                # Guardamos en la caché solo respuestas exitosas; los 404 de productos
+                # tienen su propia caché negativa con TTL corto
+                if response.status_code == 200:
+                    with server_timing.phase('cache-write'):
+                        cache.set(cache_key, response.data, timeout=timeout)
+                        cache.set(stale_key(cache_key), response.data, timeout=STALE_CACHE_TTL)
 
                 return response
 
@@ -51,20 +118,524 @@ def cache_control_header(timeout=None, key = ""):
     return decorator
 
 
-# Dependencia: inyección del repositorio en el servicio
-product_repository = PostgreSQLProductAdapter()
+# Sentencias lentas del adaptador PostgreSQL (por worker), servidas en /debug/slow-queries
+slow_query_log = None
+if PRODUCTS_ADAPTER != 'sqlite' and SLOW_QUERY_THRESHOLD_MS > 0:
+    from adapters.slow_query_log import SlowQueryLog
+    slow_query_log = SlowQueryLog(threshold=SLOW_QUERY_THRESHOLD_MS / 1000, top_n=SLOW_QUERY_TOP_N)
+
+
+def build_product_repository():
+    """Crea el adaptador configurado (PostgreSQL en AWS, SQLite en modo offline/edge)."""
+    if PRODUCTS_ADAPTER == 'sqlite':
+        from adapters.sqlite_adapter import SQLiteProductAdapter
+        repository = SQLiteProductAdapter()
+        repository.setup_database()
+    else:
+        from adapters.sql_adapter import PostgreSQLProductAdapter
+        from database_setup import setup_database
+        setup_database()
+        repository = PostgreSQLProductAdapter(slow_query_log=slow_query_log)
+        if slow_query_log is not None and SLOW_QUERY_EXPLAIN:
+            slow_query_log.explain = repository.explain
+
+    if PRODUCTS_FAULT_LATENCY_MS or PRODUCTS_FAULT_FAILURE_RATE:
+        from adapters.fault_injection_adapter import FaultInjectingProductAdapter
+        repository = FaultInjectingProductAdapter(repository, latency=PRODUCTS_FAULT_LATENCY_MS / 1000,
+                                                  failure_rate=PRODUCTS_FAULT_FAILURE_RATE)
+    # Métricas por dentro del breaker: solo se miden las llamadas que llegan a la base
+    return MetricsProductAdapter(repository)
+
+
+def transient_repository_errors():
+    """
+    Excepciones que el breaker cuenta como caída de la base (conexión, timeouts). Los
+    errores de datos (DataError, IntegrityError) y de programación no abren el circuito.
+    """
+    errors = list(DEFAULT_TRANSIENT_ERRORS)
+    if PRODUCTS_ADAPTER == 'sqlite':
+        import sqlite3
+        errors.append(sqlite3.OperationalError)
+    else:
+        import psycopg2
+        # QueryCanceledError (statement_timeout) es subclase de OperationalError
+        errors.extend((psycopg2.OperationalError, psycopg2.InterfaceError))
+    if PRODUCTS_FAULT_LATENCY_MS or PRODUCTS_FAULT_FAILURE_RATE:
+        from adapters.fault_injection_adapter import InjectedFaultError
+        errors.append(InjectedFaultError)
+    return tuple(errors)
+
+
+# Dependencia: inyección del repositorio (protegido por el circuit breaker) en el servicio
+repository_breaker = CircuitBreaker(failure_rate=BREAKER_FAILURE_RATE, window=BREAKER_WINDOW,
+                                    min_calls=BREAKER_MIN_CALLS, reset_timeout=BREAKER_RESET_TIMEOUT,
+                                    transient_errors=transient_repository_errors())
+product_repository = CircuitBreakerProductAdapter(build_product_repository(), repository_breaker)
+
+
+def build_repository_cache_backend():
+    """Backend de la caché de objetos de dominio ('redis', 'memory' o 'none')."""
+    if REPOSITORY_CACHE_BACKEND == 'memory':
+        return InProcessCacheBackend(max_entries=REPOSITORY_CACHE_MAX_ENTRIES)
+    if REPOSITORY_CACHE_BACKEND == 'redis':
+        return RedisCacheBackend(cache)
+    return None
+
+
+# Caché de dominio por fuera del breaker: los aciertos se sirven aunque el circuito esté abierto.
+# La caché HTTP (cache_control_header) solo guarda la salida ya serializada.
+repository_cache_backend = build_repository_cache_backend()
+if repository_cache_backend is not None:
+    product_repository = CachedProductRepository(product_repository, repository_cache_backend,
+                                                 REPOSITORY_CACHE_TTLS, negative_ttl=NEGATIVE_CACHE_TTL)
 product_service = ProductService(repository=product_repository)
-setup_database()
+
+
+# Familia de claves de caché por ruta, para agregar HIT/MISS/STALE sin una serie por clave
+CACHE_FAMILIES = {
+    '/products/available': 'available',
+    '/products/search': 'search',
+    '/products/<product_id>': 'product',
+}
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    server_timing.begin()
+    # Consultas por ID de esta petición: agrupadas en lotes y memorizadas
+    product_service.begin_request()
+
+
+@app.teardown_request
+def end_product_loader(exc):
+    product_service.end_request()
+
+
+@app.after_request
+def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    elapsed = time.perf_counter() - g.get('request_start', time.perf_counter())
+    # Desglose cache / repo-cache / db-connect / db-query / materialize / serialize / cache-write
+    response.headers['Server-Timing'] = server_timing.header(total=elapsed)
+    HTTP_REQUESTS.labels(route=route, method=request.method, status=response.status_code).inc()
+    HTTP_LATENCY.labels(route=route, method=request.method).observe(elapsed)
+    if not response.direct_passthrough:
+        RESPONSE_SIZE.labels(route=route).observe(response.content_length or 0)
+    cache_result = response.headers.get('X-Cache')
+    if cache_result:
+        CACHE_EVENTS.labels(family=CACHE_FAMILIES.get(route, 'other'), result=cache_result).inc()
+    CIRCUIT_OPEN.set(0 if repository_breaker.state == CircuitBreaker.CLOSED else 1)
+    return response
+
+
+# Perfilado bajo demanda: solo activo si DEBUG_TOKEN está definido
+request_profiler = RequestProfiler(PROFILE_DIR, interval=PROFILING_INTERVAL_MS / 1000)
+memory_tracker = MemoryTracker(PROFILE_DIR)
+_profiling_state = {'settings': {'sample_rate': PROFILING_SAMPLE_RATE, 'mode': PROFILING_MODE}, 'loaded_at': 0.0}
+PROFILING_SETTINGS_REFRESH = 5.0
+
+
+def _token_matches(value, expected) -> bool:
+    return bool(expected) and value is not None and hmac.compare_digest(value, expected)
+
+
+def _has_debug_token(value) -> bool:
+    return _token_matches(value, DEBUG_TOKEN)
+
+
+def require_debug_token():
+    """Los endpoints /debug no existen (404) sin DEBUG_TOKEN o con un token incorrecto."""
+    if not _has_debug_token(request.headers.get('X-Debug-Token')):
+        abort(404)
+
+
+def require_metrics_token():
+    """
+    /metrics usa su propio token (`Authorization: Bearer`, como lo envía Prometheus):
+    la credencial de un scraper no habilita /debug. Sin METRICS_TOKEN no existe (404).
+    """
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not _token_matches(credentials.strip(), METRICS_TOKEN):
+        abort(404)
+
+
+def _bad_request(message):
+    """Corta la petición con un 400 JSON (también desde funciones de clave de caché)."""
+    abort(make_response(jsonify({"error": message}), 400))
+
+
+def _profile_route_arg():
+    """?route= del perfilado: None o el slug de una ruta registrada (nunca texto libre hacia glob)."""
+    route = request.args.get('route')
+    if route is not None and route not in {route_slug(rule.rule) for rule in app.url_map.iter_rules()}:
+        _bad_request(f"Unknown route: {route}")
+    return route
+
+
+def profiling_settings():
+    """Tasa de muestreo y modo vigentes (compartidos vía Redis, refrescados cada pocos segundos)."""
+    now = time.monotonic()
+    if now - _profiling_state['loaded_at'] >= PROFILING_SETTINGS_REFRESH:
+        _profiling_state['loaded_at'] = now
+        try:
+            stored = cache.get(PROFILING_SETTINGS_KEY)
+        except Exception:
+            stored = None
+        if stored:
+            _profiling_state['settings'] = stored
+    return _profiling_state['settings']
+
+
+@app.before_request
+def maybe_profile_request():
+    if not DEBUG_TOKEN or request.url_rule is None or request.path.startswith('/debug') \
+            or request.path == '/metrics':
+        return
+    settings = profiling_settings()
+    forced = _has_debug_token(request.headers.get('X-Profile'))
+    if forced or (settings['sample_rate'] and random.random() < settings['sample_rate']):
+        g.profile_handle = request_profiler.start(request.url_rule.rule, settings['mode'])
+
+
+@app.teardown_request
+def stop_request_profile(exc):
+    handle = g.pop('profile_handle', None)
+    if handle is not None:
+        request_profiler.stop(handle)
+
+
+@app.route('/debug/profile', methods=['GET'])
+def get_profile():
+    """
+    Flame graph agregado de todos los workers.
+    ?format=collapsed&route=products_available devuelve texto para flamegraph.pl/speedscope;
+    por defecto JSON con las pilas más frecuentes por ruta.
+    """
+    require_debug_token()
+    route = _profile_route_arg()
+    stacks = request_profiler.collapsed()
+    if request.args.get('format') == 'collapsed':
+        lines = [
+            f'{slug};{stack} {count}' if route is None else f'{stack} {count}'
+            for slug, counts in stacks.items() if route in (None, slug)
+            for stack, count in counts.most_common()
+        ]
+        return app.response_class('\n'.join(lines) + '\n', mimetype='text/plain')
+
+    top = max(1, min(request.args.get('top', 50, type=int), 500))
+    return jsonify({
+        'settings': profiling_settings(),
+        'worker': dict(request_profiler.summary(), pid=os.getpid()),
+        'routes': {
+            slug: {
+                'samples': sum(counts.values()),
+                'top_stacks': [{'stack': stack, 'count': count} for stack, count in counts.most_common(top)],
+            }
+            for slug, counts in stacks.items() if route in (None, slug)
+        },
+    })
+
+
+@app.route('/debug/profile/pstats', methods=['GET'])
+def get_profile_pstats():
+    """Reporte pstats (modo cprofile) de una ruta: ?route=products_product_id&sort=tottime."""
+    require_debug_token()
+    route = _profile_route_arg()
+    sort = request.args.get('sort', 'cumulative')
+    if route is None:
+        return jsonify({"error": "route is required"}), 400
+    if sort not in PROFILING_SORT_KEYS:
+        return jsonify({"error": f"sort must be one of {list(PROFILING_SORT_KEYS)}"}), 400
+    report = request_profiler.pstats_report(route, sort=sort)
+    if report is None:
+        return jsonify({"error": "No cProfile data for route"}), 404
+    return app.response_class(report, mimetype='text/plain')
+
+
+@app.route('/debug/profile', methods=['POST'])
+def update_profile_settings():
+    """
+    Ajusta el perfilado sin redeploy: {"sample_rate": 0.05, "mode": "sample"|"cprofile", "reset": true}.
+    Los ajustes se comparten con todos los workers a través de Redis.
+    """
+    require_debug_token()
+    data = request.get_json(silent=True) or {}
+    settings = dict(profiling_settings())
+    if 'sample_rate' in data:
+        try:
+            settings['sample_rate'] = max(0.0, min(float(data['sample_rate']), 1.0))
+        except (TypeError, ValueError):
+            return jsonify({"error": "sample_rate must be a number between 0 and 1"}), 400
+    if 'mode' in data:
+        if data['mode'] not in PROFILING_MODES:
+            return jsonify({"error": f"mode must be one of {list(PROFILING_MODES)}"}), 400
+        settings['mode'] = data['mode']
+    if data.get('reset'):
+        request_profiler.reset()
+
+    cache.set(PROFILING_SETTINGS_KEY, settings, timeout=0)
+    _profiling_state.update(settings=settings, loaded_at=time.monotonic())
+    return jsonify(settings)
+
+
+@app.route('/debug/tracemalloc', methods=['POST'])
+def tracemalloc_control():
+    """
+    {"action": "start"|"snapshot"|"stop", "top": 20}. Cada snapshot se compara con el
+    anterior del mismo worker (la memoria es por proceso; el PID va en la respuesta).
+    """
+    require_debug_token()
+    data = request.get_json(silent=True) or {}
+    action = data.get('action', 'snapshot')
+    if action == 'start':
+        memory_tracker.start()
+        result = {'tracing': True}
+    elif action == 'stop':
+        memory_tracker.stop()
+        result = {'tracing': False}
+    elif action == 'snapshot':
+        top = data.get('top', 20)
+        if not isinstance(top, int) or isinstance(top, bool):
+            return jsonify({"error": "top must be an integer"}), 400
+        result = memory_tracker.snapshot(top=max(1, min(top, 200)))
+    else:
+        return jsonify({"error": "action must be start, snapshot or stop"}), 400
+    return jsonify(dict(result, pid=os.getpid()))
+
+
+@app.route('/debug/slow-queries', methods=['GET'])
+def get_slow_queries():
+    """Top de sentencias más lentas de este worker, con parámetros redactados y plan EXPLAIN."""
+    require_debug_token()
+    if slow_query_log is None:
+        return jsonify({"error": "Slow query log disabled"}), 404
+    limit = max(1, min(request.args.get('limit', SLOW_QUERY_TOP_N, type=int), SLOW_QUERY_TOP_N))
+    return jsonify({'stats': slow_query_log.stats(), 'queries': slow_query_log.top(limit)})
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Métricas Prometheus agregadas de todos los workers de gunicorn (requiere METRICS_TOKEN)."""
+    require_metrics_token()
+    payload, content_type = render_metrics()
+    return app.response_class(payload, content_type=content_type)
+
+
+@app.errorhandler(RepositoryUnavailableError)
+def handle_repository_unavailable(error):
+    """Sin base de datos ni copia de respaldo: 503 inmediato en vez de un worker bloqueado."""
+    response = jsonify({"error": "Product database unavailable", "circuit": repository_breaker.state})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(int(BREAKER_RESET_TIMEOUT))
+    return response
+
+
+# Índices bitmap de facetas en memoria (uno por worker), sincronizados vía Redis
+facet_index = FacetIndex()
+_facet_lock = threading.Lock()
+# -1 = sin construir: la primera sincronización (hilo de fondo o petición) reconstruye todo
+_facet_state = {'version': -1}
+# Más cambios pendientes que esto (o un registro expirado) => reconstrucción completa
+FACETS_MAX_INCREMENTAL = 500
+FACETS_CHANGELOG_TIMEOUT = 3600
+
+
+def _published_facets_version() -> int:
+    return int(cache.get(FACETS_VERSION_KEY) or 0)
+
+
+def sync_facet_index() -> int:
+    """
+    Aplica los cambios publicados por cualquier worker desde la última sincronización.
+    Cada versión registra el product_id modificado; solo se releen esos productos.
+    """
+    published = _published_facets_version()
+    if published == _facet_state['version']:
+        return published
+
+    with _facet_lock:
+        local = _facet_state['version']
+        if published == local:
+            return published
+        changed = []
+        if local < published <= local + FACETS_MAX_INCREMENTAL:
+            changed = list(cache.get_many(*[facets_change_key(v) for v in range(local + 1, published + 1)]))
+        if changed and None not in changed:
+            for entry in product_service.list_catalog_entries(sorted(set(changed))):
+                facet_index.upsert(entry)
+        else:
+            # Registro incompleto/expirado o Redis reiniciado: se reconstruye todo
+            facet_index.build(product_service.list_catalog_entries())
+        _facet_state['version'] = published
+        return published
+
+
+def publish_facet_change(product_id: str):
+    """Registra el cambio de un producto y actualiza los bitmaps locales."""
+    version = cache.cache.inc(FACETS_VERSION_KEY)
+    cache.set(facets_change_key(version), product_id, timeout=FACETS_CHANGELOG_TIMEOUT)
+    sync_facet_index()
+
+
+# Filtro de Bloom de IDs conocidos + contadores de consultas por ID (por worker)
+# Sin filtro construido (base caída al arrancar) todas las consultas pasan a la caché/base
+_product_filter_state = {'bloom': None, 'built_at': 0.0}
+lookup_stats = Counter()
+
+
+def rebuild_product_filter():
+    """Reconstruye el filtro con todos los IDs del catálogo y lo reemplaza atómicamente."""
+    bloom = BloomFilter.from_ids(product_service.list_product_ids(), PRODUCT_FILTER_ERROR_RATE)
+    _product_filter_state.update(bloom=bloom, built_at=time.time())
+    lookup_stats['bloom_rebuilds'] += 1
+
+
+def _refresh_indexes_in_background():
+    # El índice de facetas recorre el catálogo completo: se construye aquí y no al importar,
+    # para que cada worker atienda /health sin esperarlo
+    try:
+        sync_facet_index()
+    except Exception as e:
+        # Queda sin construir: la primera petición con facetas lo reintenta
+        print(f"Índice de facetas no disponible al arrancar: {e}")
+    if PRODUCT_FILTER_REFRESH_SECONDS <= 0:
+        return
+    # Recoge productos dados de alta fuera de este servicio (p. ej. cargas SQL)
+    while True:
+        time.sleep(PRODUCT_FILTER_REFRESH_SECONDS)
+        try:
+            rebuild_product_filter()
+        except Exception as e:
+            print(f"Error reconstruyendo el filtro de Bloom de productos: {e}")
+
+
+try:
+    rebuild_product_filter()
+except RepositoryUnavailableError as e:
+    print(f"Filtro de Bloom de productos no disponible al arrancar: {e}")
+threading.Thread(target=_refresh_indexes_in_background, name='index-refresh', daemon=True).start()
+
+
+def _scope_arg(name):
+    """Filtro de ámbito del query string normalizado; más de un valor es un 400."""
+    values = request.args.getlist(name)
+    if len(values) > 1:
+        _bad_request(f"{name}: only one value is allowed")
+    try:
+        return normalize_scope_value(values[0] if values else None)
+    except ValueError as e:
+        _bad_request(f"{name}: {e}")
+
+
+def _availability_scope():
+    """Lee los filtros ?country= y ?warehouse= normalizados."""
+    return _scope_arg('country'), _scope_arg('warehouse')
+
+
+def _facet_filters(exclude=()):
+    """
+    Filtros de faceta del query string (?category=A,B&provider=P); valores separados
+    por coma se combinan con OR y las facetas entre sí con AND. El país admite un solo
+    valor, igual que en el listado SQL y sus claves de caché.
+    """
+    filters = {}
+    for facet in FACETS:
+        if facet in exclude:
+            continue
+        if facet == 'country':
+            country = _scope_arg('country')
+            if country:
+                filters[facet] = [country]
+            continue
+        values = {
+            value.strip()
+            for raw in request.args.getlist(facet)
+            for value in raw.split(',')
+        }
+        values.discard('')
+        if values:
+            filters[facet] = sorted(values)
+    return filters
+
+
+def _available_products_key():
+    base_key = availability_key(*_availability_scope())
+    # El país ya acota la consulta SQL; el resto de facetas se resuelve con bitmaps
+    filters = _facet_filters(exclude=('country',))
+    if not filters:
+        return base_key
+    try:
+        version = sync_facet_index()
+    except RepositoryUnavailableError:
+        # Permite servir la copia de respaldo de la última versión conocida
+        version = _facet_state['version']
+    return filtered_availability_key(base_key, filters, version)
 
 
 @app.route('/products/available', methods=['GET'])
-@cache_control_header(timeout=180, key="products")
+@cache_control_header(timeout=AVAILABLE_CACHE_TTL, key=_available_products_key)
 def get_products():
-    """Endpoint para listar productos disponibles."""
-    products = product_service.list_available_products()
-    # Convertir la lista de objetos Product en un formato serializable (dict)
-    products_list = [p.__dict__ for p in products]
-    return jsonify(products_list)
+    """
+    Endpoint para listar productos disponibles.
+    Acepta ?country=CO y/o ?warehouse=W-001; cada ámbito tiene su propia entrada en caché.
+    Filtros de faceta opcionales: ?category=, ?provider=, ?objective_profile=.
+    """
+    country, warehouse_id = _availability_scope()
+    products = product_service.list_available_products(country=country, warehouse_id=warehouse_id)
+    filters = _facet_filters(exclude=('country',))
+    if filters:
+        matching = facet_index.matching_ids(filters)
+        products = [product for product in products if product.product_id in matching]
+    # Serializa directamente a bytes; el decorador guarda esos mismos bytes en la caché
+    with server_timing.phase('serialize'):
+        payload = serializer.dumps_products(products)
+    return json_response(payload)
+
+
+@app.route('/products/facets', methods=['GET'])
+def get_facets():
+    """
+    Conteos por categoría, proveedor, país y perfil para los filtros recibidos.
+    Se calculan en memoria con intersecciones de bitmaps, sin GROUP BY en la base.
+    """
+    sync_facet_index()
+    counts = facet_index.counts(_facet_filters())
+    with server_timing.phase('serialize'):
+        payload = serializer.dumps(counts)
+    return json_response(payload)
+
+
+def _search_params():
+    """Consulta normalizada (?q=) y límite acotado (?limit=)."""
+    query = normalize_search_query(request.args.get('q', ''))
+    try:
+        limit = int(request.args.get('limit', SEARCH_MAX_RESULTS))
+    except ValueError:
+        limit = SEARCH_MAX_RESULTS
+    return query, max(1, min(limit, SEARCH_MAX_RESULTS))
+
+
+@app.route('/products/search', methods=['GET'])
+def search_products():
+    """
+    Endpoint de búsqueda por prefijo de SKU o nombre aproximado (?q=).
+    Los resultados se cachean por consulta normalizada.
+    """
+    query, _ = _search_params()
+    if len(query) < 2:
+        return jsonify({"error": "Query parameter 'q' must have at least 2 characters"}), 400
+    return _cached_search()
+
+
+# TTL corto: la búsqueda incluye precio y stock y no se invalida por producto
+@cache_control_header(timeout=60, key=lambda: search_key(*_search_params()))
+def _cached_search():
+    query, limit = _search_params()
+    products = product_service.search_products(query, limit)
+    with server_timing.phase('serialize'):
+        payload = serializer.dumps_products(products)
+    return json_response(payload)
 
 
 @app.route('/products/update/<product_id>', methods=['PUT'])
@@ -72,43 +643,197 @@ def update_product(product_id):
     """
     Endpoint para actualizar un producto y forzar la invalidación de la caché.
     """
-    data = request.get_json()
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "A JSON object is required"}), 400
     price = data.get('price')
     stock = data.get('stock')
+    try:
+        warehouse_id = normalize_scope_value(data.get('warehouse_id'))
+    except ValueError as e:
+        return jsonify({"error": f"warehouse_id: {e}"}), 400
 
     if price is None or stock is None:
         return jsonify({"error": "Price and stock are required"}), 400
 
     # Actualiza el producto en la base de datos
-    product_service.update_product(product_id, price=price, stock=stock)
-
-    # ⚠️ Invalida la caché del endpoint de productos disponibles y del producto individual
-    cache_key_to_invalidate = 'products'
-    cache.delete(cache_key_to_invalidate)
-    cache.delete(product_id)
+    scopes = product_service.update_product(product_id, price=price, stock=stock, warehouse_id=warehouse_id)
+    if scopes is None:
+        # Sin fila actualizada: el ID no entra al filtro de Bloom (PUTs con IDs al azar lo saturarían)
+        return jsonify({"error": "Product not found"}), 404
 
-    cache_key_to_invalidate_single = f'/products/{product_id}'
-    cache.delete(cache_key_to_invalidate_single)
+    # ⚠️ Invalida solo los listados de los ámbitos donde el producto tiene stock y el detalle
+    cache.delete_many(*availability_keys_for_scopes(scopes))
+    cache.delete(product_key(product_id))
+    # Un ID que pasa a existir no debe quedar bloqueado por el filtro ni por la caché negativa
+    if _product_filter_state['bloom'] is not None:
+        _product_filter_state['bloom'].add(product_id)
+    cache.delete(missing_product_key(product_id))
+    # Los listados filtrados quedan obsoletos al avanzar la versión de facetas
+    publish_facet_change(product_id)
 
     return jsonify({"status": "Product updated and cache invalidated"}), 200
 
 
+def _product_not_found(cache_status):
+    response = make_response(jsonify({"error": "Product not found"}), 404)
+    response.headers['X-Cache'] = cache_status
+    return response
+
+
 @app.route('/products/<product_id>', methods=['GET'])
-@cache_control_header(timeout=180)
 def get_product_by_id(product_id):
     """
     Endpoint para obtener un producto por su ID.
+    Los IDs que el filtro de Bloom descarta o que están en la caché negativa
+    se responden con 404 sin llegar a la base de datos.
     """
+    bloom = _product_filter_state['bloom']
+    if bloom is not None and product_id not in bloom:
+        lookup_stats['bloom_rejected'] += 1
+        return _product_not_found('BLOOM-REJECT')
+
+    with server_timing.phase('cache'):
+        negative_hit = cache.get(missing_product_key(product_id)) is not None
+    if negative_hit:
+        lookup_stats['negative_cache_hits'] += 1
+        return _product_not_found('NEGATIVE-HIT')
+
+    lookup_stats['bloom_passed'] += 1
+    hot_products.record(product_id)
+    return _cached_product(product_id)
+
+
+@cache_control_header(timeout=PRODUCT_CACHE_TTL, key=lambda: product_key(request.view_args['product_id']))
+def _cached_product(product_id):
     product = product_service.get_product_by_id(product_id)
     if product:
-        return jsonify(product.__dict__)
-    else:
-        return jsonify({"error": "Product not found"}), 404
+        with server_timing.phase('serialize'):
+            payload = serializer.dumps_product(product)
+        return json_response(payload)
+
+    # Falso positivo del filtro (o producto sin stock): se recuerda durante un TTL corto
+    lookup_stats['negative_cache_stores'] += 1
+    cache.set(missing_product_key(product_id), 1, timeout=NEGATIVE_CACHE_TTL)
+    return jsonify({"error": "Product not found"}), 404
+
+
+@app.route('/products/batch', methods=['POST'])
+def get_products_batch():
+    """
+    Varios productos por ID en una petición ({"ids": [...]}), p. ej. para validar una
+    orden o tarificar un carrito. Los IDs repetidos se resuelven una vez y todos los
+    que no están en caché se leen con una sola consulta; los que el filtro de Bloom
+    descarta ni siquiera se consultan.
+    """
+    data = request.get_json(silent=True) or {}
+    product_ids = data.get('ids')
+    if not isinstance(product_ids, list) or not all(isinstance(pid, str) for pid in product_ids):
+        return jsonify({"error": "ids must be a list of product ids"}), 400
+    if len(product_ids) > PRODUCTS_BATCH_MAX_IDS:
+        return jsonify({"error": f"At most {PRODUCTS_BATCH_MAX_IDS} ids per request"}), 400
+
+    bloom = _product_filter_state['bloom']
+    candidates = [pid for pid in product_ids if bloom is None or pid in bloom]
+    lookup_stats['bloom_rejected'] += len(set(product_ids)) - len(set(candidates))
+    products = product_service.get_products_by_ids(candidates)
+    with server_timing.phase('serialize'):
+        payload = serializer.dumps({
+            'products': [product_to_dict(products[pid]) for pid in dict.fromkeys(product_ids) if pid in products],
+            'missing': [pid for pid in dict.fromkeys(product_ids) if pid not in products],
+        })
+    return json_response(payload)
+
+
+@app.route('/products/lookup/stats', methods=['GET'])
+def get_lookup_stats():
+    """Métricas del filtro de Bloom y de la caché negativa de este worker."""
+    bloom = _product_filter_state['bloom']
+    return jsonify({
+        'bloom_filter': dict(bloom.stats(), age_seconds=round(time.time() - _product_filter_state['built_at'], 1))
+                        if bloom is not None else None,
+        'lookups': dict(lookup_stats),
+        'negative_cache_ttl': NEGATIVE_CACHE_TTL,
+        'repository_cache': dict(product_repository.stats, backend=REPOSITORY_CACHE_BACKEND)
+                            if isinstance(product_repository, CachedProductRepository) else None,
+    })
+
+
+# Calentamiento de la caché: ranking persistido de productos consultados y precarga acotada
+hot_products = HotProductCounter(cache, HOT_PRODUCTS_KEY, flush_interval=HOT_PRODUCTS_FLUSH_SECONDS)
+cache_warmer = CacheWarmer(cache, WARMUP_LOCK_KEY, budget=WARMUP_BUDGET_SECONDS, concurrency=WARMUP_CONCURRENCY)
+
+
+def _store_warm_entries(entries, timeout):
+    """Escribe respuestas serializadas y sus copias de respaldo, igual que cache_control_header."""
+    cache.set_many(entries, timeout=timeout)
+    cache.set_many({stale_key(key): payload for key, payload in entries.items()}, timeout=STALE_CACHE_TTL)
+    return len(entries)
+
+
+def _warm_availability(country=None):
+    key = availability_key(country=country)
+    if cache.get(key) is not None:
+        return 0
+    products = product_service.list_available_products(country=country)
+    return _store_warm_entries({key: serializer.dumps_products(products)}, AVAILABLE_CACHE_TTL)
+
+
+def _warm_products(product_ids):
+    keys = {product_key(product_id): product_id for product_id in product_ids}
+    cached = cache.get_many(*keys)
+    missing = [product_id for (key, product_id), value in zip(keys.items(), cached) if value is None]
+    if not missing:
+        return 0
+    products = product_service.get_products_by_ids(missing)
+    return _store_warm_entries({product_key(pid): serializer.dumps_product(product)
+                                for pid, product in products.items()}, PRODUCT_CACHE_TTL)
+
+
+def warmup_tasks():
+    """Listado global, un listado por país con stock y los productos más consultados en lotes."""
+    tasks = [('available', _warm_availability)]
+    # Consulta acotada (SELECT DISTINCT sobre un índice): no depende del índice de facetas,
+    # cuya construcción recorre todo el catálogo y quedaría fuera del presupuesto
+    try:
+        countries = product_service.list_stock_countries()
+    except RepositoryUnavailableError as e:
+        app.logger.warning("[warmup] países con stock no disponibles: %s", e)
+        countries = []
+    tasks += [(f'available:{country}', lambda country=country: _warm_availability(country))
+              for country in countries]
+    top = hot_products.top(WARMUP_TOP_PRODUCTS)
+    for start in range(0, len(top), WARMUP_BATCH_SIZE):
+        batch = top[start:start + WARMUP_BATCH_SIZE]
+        tasks.append((f'products[{start}:{start + len(batch)}]', lambda batch=batch: _warm_products(batch)))
+    return tasks
+
+
+def _run_cache_warmup():
+    state = cache_warmer.run(warmup_tasks())
+    app.logger.info("[warmup] %s", state)
+    # Tras un failover de Redis las claves desaparecen: se recalienta lo que falte
+    while WARMUP_REFRESH_SECONDS > 0:
+        time.sleep(WARMUP_REFRESH_SECONDS)
+        hot_products.flush()
+        cache_warmer.run(warmup_tasks())
+
+
+if WARMUP_ENABLED:
+    threading.Thread(target=_run_cache_warmup, name='cache-warmup', daemon=True).start()
+else:
+    cache_warmer.mark_ready('disabled')
 
 
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'ok'})
+    # 503 solo mientras corre el calentamiento inicial (acotado por WARMUP_BUDGET_SECONDS);
+    # con el circuito abierto sigue en 200 porque el servicio responde desde la caché
+    ready = cache_warmer.ready
+    response = jsonify({'status': 'ok' if ready else 'warming', 'circuit': repository_breaker.stats(),
+                        'warmup': cache_warmer.state})
+    response.status_code = 200 if ready else 503
+    return response
 
 
 if __name__ == '__main__':
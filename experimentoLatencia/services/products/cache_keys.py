@@ -0,0 +1,95 @@
+# cache_keys.py
+from typing import Iterable, List, Mapping, Optional
+from domain.models import StockScope
+
+# Clave histórica del listado global (la usa el experimento de latencia)
+AVAILABLE_PRODUCTS_KEY = 'products'
+
+# Versión del catálogo de facetas y registro de cambios entre workers
+FACETS_VERSION_KEY = 'facets:version'
+
+
+def normalize_scope_value(value: Optional[str]) -> Optional[str]:
+    """
+    Normaliza filtros de país/bodega ('co ' -> 'CO'); vacío equivale a sin filtro.
+    Un ámbito es un único valor de texto: las claves de disponibilidad e invalidación
+    son por país/bodega, así que listas ('CO,PE') u otros tipos lanzan ValueError.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError('must be a string')
+    value = value.strip().upper()
+    if ',' in value:
+        raise ValueError('only one value is allowed')
+    return value or None
+
+
+def availability_key(country: Optional[str] = None, warehouse_id: Optional[str] = None) -> str:
+    """Clave del listado de disponibilidad para un ámbito (global, país, bodega o ambos)."""
+    if not country and not warehouse_id:
+        return AVAILABLE_PRODUCTS_KEY
+    return f"{AVAILABLE_PRODUCTS_KEY}:country={country or '*'}:warehouse={warehouse_id or '*'}"
+
+
+def filtered_availability_key(base_key: str, filters: Mapping[str, List[str]], version: int) -> str:
+    """
+    Clave de un listado filtrado por facetas. Incluye la versión del catálogo para
+    que un cambio de producto/stock deje obsoletas todas las combinaciones de filtros.
+    """
+    parts = ':'.join(f"{facet}={','.join(sorted(values))}" for facet, values in sorted(filters.items()))
+    return f'{base_key}:facets:{parts}:v={version}'
+
+
+def facets_change_key(version: int) -> str:
+    """Clave con el product_id modificado en una versión dada del catálogo."""
+    return f'facets:change:{version}'
+
+
+# Calentamiento: lock entre workers y ranking persistido de productos consultados
+WARMUP_LOCK_KEY = 'warmup:lock'
+HOT_PRODUCTS_KEY = 'warmup:hot-products'
+
+# Ajustes de perfilado compartidos por todos los workers
+PROFILING_SETTINGS_KEY = 'debug:profile:settings'
+
+
+def product_key(product_id: str) -> str:
+    """Clave del detalle de un producto."""
+    return f'/products/{product_id}'
+
+
+def missing_product_key(product_id: str) -> str:
+    """Clave de la caché negativa para un ID que no existe en el catálogo."""
+    return f'missing:{product_id}'
+
+
+def search_key(normalized_query: str, limit: int) -> str:
+    """Clave de resultados de búsqueda por consulta ya normalizada."""
+    return f'search:{limit}:{normalized_query}'
+
+
+def repository_key(cache_key: str) -> str:
+    """
+    Objetos de dominio del CachedProductRepository. Reutiliza la clave HTTP equivalente
+    en su propio espacio, así que se invalidan con las mismas funciones de claves.
+    """
+    return f'repo:{cache_key}'
+
+
+def stale_key(cache_key: str) -> str:
+    """Copia de respaldo (TTL largo) de una respuesta, servida si la base no responde."""
+    return f'stale:{cache_key}'
+
+
+def availability_keys_for_scopes(scopes: Iterable[StockScope]) -> List[str]:
+    """
+    Claves de disponibilidad afectadas por cambios en los ámbitos dados:
+    el listado global más, por cada ámbito, su país, su bodega y la combinación.
+    """
+    keys = {AVAILABLE_PRODUCTS_KEY}
+    for scope in scopes:
+        keys.add(availability_key(country=scope.country))
+        keys.add(availability_key(warehouse_id=scope.warehouse_id))
+        keys.add(availability_key(country=scope.country, warehouse_id=scope.warehouse_id))
+    return sorted(keys)
@@ -5,4 +5,85 @@ DB_HOST = os.environ.get("DB_HOST")
 DB_PORT = os.environ.get("DB_PORT", "5432")
 DB_NAME = os.environ.get("DB_NAME", "productosdb")
 DB_USER = os.environ.get("DB_USER", "postgres")
-DB_PASS = os.environ.get("DB_PASSWORD", "postgres")
\ No newline at end of file
+DB_PASS = os.environ.get("DB_PASSWORD", "postgres")
+
+# Timeouts de PostgreSQL: sin ellos un RDS colgado bloquea los workers de gunicorn
+DB_CONNECT_TIMEOUT = int(os.environ.get("DB_CONNECT_TIMEOUT", "3"))
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", "2000"))
+
+# Circuit breaker del repositorio y copia de respaldo de respuestas para servir datos obsoletos
+BREAKER_FAILURE_RATE = float(os.environ.get("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_WINDOW = int(os.environ.get("BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.environ.get("BREAKER_MIN_CALLS", "5"))
+BREAKER_RESET_TIMEOUT = float(os.environ.get("BREAKER_RESET_TIMEOUT", "15"))
+STALE_CACHE_TTL = int(os.environ.get("STALE_CACHE_TTL", "86400"))
+
+# Registro de sentencias lentas del adaptador PostgreSQL (0 = desactivado)
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_TOP_N = int(os.environ.get("SLOW_QUERY_TOP_N", "50"))
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+
+# Endpoints /debug y perfilado bajo demanda: deshabilitados si DEBUG_TOKEN no está definido
+DEBUG_TOKEN = os.environ.get("DEBUG_TOKEN")
+# /metrics (Prometheus, experimento de latencia): token propio, deshabilitado si no está definido
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_MODE = os.environ.get("PROFILING_MODE", "sample")
+PROFILING_INTERVAL_MS = float(os.environ.get("PROFILING_INTERVAL_MS", "5"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "/tmp/products-profiles")
+
+# Inyección de fallos para experimentos (0 = desactivada)
+PRODUCTS_FAULT_LATENCY_MS = int(os.environ.get("PRODUCTS_FAULT_LATENCY_MS", "0"))
+PRODUCTS_FAULT_FAILURE_RATE = float(os.environ.get("PRODUCTS_FAULT_FAILURE_RATE", "0"))
+
+# Serializador de respuestas JSON: 'auto' (orjson si está instalado), 'orjson' o 'native'
+PRODUCTS_SERIALIZER = os.environ.get("PRODUCTS_SERIALIZER", "auto")
+
+# Bodega que actualiza PUT /products/update/<id> cuando el cliente no envía warehouse_id
+DEFAULT_WAREHOUSE_ID = os.environ.get("DEFAULT_WAREHOUSE_ID", "W-003")
+
+# Adaptador de persistencia: 'postgres' (RDS) o 'sqlite' (offline / edge)
+PRODUCTS_ADAPTER = os.environ.get("PRODUCTS_ADAPTER", "postgres")
+SQLITE_DB_PATH = os.environ.get("SQLITE_DB_PATH", "healthcare_products.db")
+# Conexión persistente por hilo en modo WAL: tamaño del mmap (bytes) y de la caché de páginas (KiB)
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_BUSY_TIMEOUT = float(os.environ.get("SQLITE_BUSY_TIMEOUT", "5"))
+SQLITE_CACHED_STATEMENTS = int(os.environ.get("SQLITE_CACHED_STATEMENTS", "256"))
+
+# Calentamiento de la caché al arrancar: productos más consultados, listados global y por país.
+# /health responde 503 mientras corre, como máximo WARMUP_BUDGET_SECONDS
+WARMUP_ENABLED = os.environ.get("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_BUDGET_SECONDS = float(os.environ.get("WARMUP_BUDGET_SECONDS", "20"))
+WARMUP_TOP_PRODUCTS = int(os.environ.get("WARMUP_TOP_PRODUCTS", "200"))
+WARMUP_BATCH_SIZE = int(os.environ.get("WARMUP_BATCH_SIZE", "50"))
+WARMUP_CONCURRENCY = int(os.environ.get("WARMUP_CONCURRENCY", "4"))
+# Revisión periódica (recalienta lo que falte tras un failover de Redis); 0 = solo al arrancar
+WARMUP_REFRESH_SECONDS = int(os.environ.get("WARMUP_REFRESH_SECONDS", "60"))
+HOT_PRODUCTS_FLUSH_SECONDS = float(os.environ.get("HOT_PRODUCTS_FLUSH_SECONDS", "30"))
+
+# Máximo de IDs por POST /products/batch
+PRODUCTS_BATCH_MAX_IDS = int(os.environ.get("PRODUCTS_BATCH_MAX_IDS", "200"))
+
+# Búsqueda de productos
+SEARCH_MAX_RESULTS = int(os.environ.get("SEARCH_MAX_RESULTS", "50"))
+SEARCH_MIN_SIMILARITY = float(os.environ.get("SEARCH_MIN_SIMILARITY", "0.6"))
+# Índices en proceso del adaptador SQLite: reconstrucción periódica para recoger altas hechas
+# fuera del adaptador (0 = solo al primer uso; las escrituras propias los actualizan en el acto)
+SEARCH_INDEX_REFRESH_SECONDS = int(os.environ.get("SEARCH_INDEX_REFRESH_SECONDS", "300"))
+
+# Consultas por IDs inexistentes: caché negativa (segundos) y filtro de Bloom de IDs conocidos
+NEGATIVE_CACHE_TTL = int(os.environ.get("NEGATIVE_CACHE_TTL", "30"))
+PRODUCT_FILTER_ERROR_RATE = float(os.environ.get("PRODUCT_FILTER_ERROR_RATE", "0.01"))
+PRODUCT_FILTER_REFRESH_SECONDS = int(os.environ.get("PRODUCT_FILTER_REFRESH_SECONDS", "300"))
+
+# Caché de objetos de dominio del repositorio (CachedProductRepository), independiente de la
+# caché HTTP: 'redis' (la caché de la app), 'memory' (por worker) o 'none'
+REPOSITORY_CACHE_BACKEND = os.environ.get("REPOSITORY_CACHE_BACKEND", "redis")
+REPOSITORY_CACHE_MAX_ENTRIES = int(os.environ.get("REPOSITORY_CACHE_MAX_ENTRIES", "10000"))
+# TTL en segundos por método del repositorio (0 = sin caché para ese método)
+REPOSITORY_CACHE_TTLS = {
+    'get_product_by_id': int(os.environ.get("REPOSITORY_CACHE_TTL_PRODUCT", "300")),
+    'get_available_products': int(os.environ.get("REPOSITORY_CACHE_TTL_AVAILABLE", "60")),
+    'search_products': int(os.environ.get("REPOSITORY_CACHE_TTL_SEARCH", "30")),
+}
@@ -108,6 +108,29 @@ def setup_database():
             country VARCHAR(50) NOT NULL,
             FOREIGN KEY (product_id) REFERENCES Product(product_id)
         );
+
+        -- Índices de cobertura para disponibilidad por país y por bodega.
+        -- Incluyen quantity para que la agregación se resuelva con index-only scans.
+        CREATE INDEX IF NOT EXISTS idx_productstock_country_product
+            ON ProductStock (country, product_id) INCLUDE (quantity, warehouse_id)
+            WHERE quantity > 0;
+
+        CREATE INDEX IF NOT EXISTS idx_productstock_warehouse_product
+            ON ProductStock (warehouse_id, product_id) INCLUDE (quantity, country)
+            WHERE quantity > 0;
+
+        -- Búsqueda por producto (detalle, actualización y ámbitos a invalidar)
+        CREATE INDEX IF NOT EXISTS idx_productstock_product
+            ON ProductStock (product_id, warehouse_id) INCLUDE (quantity, country);
+
+        -- Búsqueda: prefijo de SKU y coincidencia difusa por nombre con trigramas
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+        CREATE INDEX IF NOT EXISTS idx_product_sku_trgm
+            ON Product USING GIN (sku gin_trgm_ops);
+
+        CREATE INDEX IF NOT EXISTS idx_product_objective_profile_trgm
+            ON Product USING GIN (objective_profile gin_trgm_ops);
         """
 
         # Ejecución del DDL (usando un solo execute en este caso ya que es una cadena larga)
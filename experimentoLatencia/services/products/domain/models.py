@@ -1,5 +1,6 @@
 # domain/models.py
 from dataclasses import dataclass
+from typing import Tuple
 
 @dataclass
 class Product:
@@ -7,4 +8,21 @@ class Product:
     sku: str
     value: float
     category_name: str
-    total_quantity: int
\ No newline at end of file
+    total_quantity: int
+
+
+@dataclass(frozen=True)
+class StockScope:
+    """Ámbito de inventario (bodega + país) al que pertenece un registro de ProductStock."""
+    warehouse_id: str
+    country: str
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """Atributos de un producto usados para las facetas del catálogo."""
+    product_id: str
+    category_name: str
+    provider_id: str
+    objective_profile: str
+    countries: Tuple[str, ...]  # Países con stock > 0
\ No newline at end of file
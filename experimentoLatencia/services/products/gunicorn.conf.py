@@ -0,0 +1,20 @@
+# gunicorn.conf.py
+import os
+import shutil
+
+# Métricas Prometheus en modo multiproceso: un directorio compartido por todos los workers
+_metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+
+def on_starting(server):
+    """Limpia los archivos de métricas de una ejecución anterior."""
+    if _metrics_dir:
+        shutil.rmtree(_metrics_dir, ignore_errors=True)
+        os.makedirs(_metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Descarta los gauges 'live' de un worker que terminó."""
+    if _metrics_dir:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,48 @@
+# metrics.py
+"""
+Métricas Prometheus del servicio de productos (expuestas en /metrics).
+
+Con gunicorn cada worker es un proceso: si PROMETHEUS_MULTIPROC_DIR está definido,
+prometheus_client escribe los valores en archivos mmap por proceso y /metrics los
+agrega con MultiProcessCollector (ver gunicorn.conf.py).
+"""
+import os
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HTTP_REQUESTS = Counter(
+    'products_http_requests_total', 'Peticiones HTTP por ruta, método y código',
+    ['route', 'method', 'status'])
+HTTP_LATENCY = Histogram(
+    'products_http_request_duration_seconds', 'Latencia de las peticiones HTTP',
+    ['route', 'method'], buckets=_LATENCY_BUCKETS)
+RESPONSE_SIZE = Histogram(
+    'products_http_response_size_bytes', 'Tamaño del cuerpo de las respuestas',
+    ['route'], buckets=_SIZE_BUCKETS)
+CACHE_EVENTS = Counter(
+    'products_cache_events_total', 'Resultados de caché (HIT, MISS, STALE-FALLBACK, ...) por familia de clave',
+    ['family', 'result'])
+REPOSITORY_LATENCY = Histogram(
+    'products_repository_query_duration_seconds', 'Latencia de las llamadas al repositorio',
+    ['method', 'outcome'], buckets=_LATENCY_BUCKETS)
+# Sin pool: cada llamada abre su propia conexión, así que las llamadas en curso
+# son exactamente las conexiones ocupadas
+DB_CONNECTIONS_IN_USE = Gauge(
+    'products_db_connections_in_use', 'Conexiones a la base abiertas por llamadas en curso',
+    multiprocess_mode='livesum')
+CIRCUIT_OPEN = Gauge(
+    'products_circuit_breaker_open', '1 si el circuit breaker de algún worker está abierto o semiabierto',
+    multiprocess_mode='livemax')
+
+
+def render_metrics():
+    """Devuelve (cuerpo, content-type) con las métricas de todos los workers."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,242 @@
+# profiling.py
+"""
+Perfilado bajo demanda de peticiones reales (sin redeploy).
+
+- Modo 'sample': un hilo muestrea cada PROFILING_INTERVAL_MS la pila de los hilos que
+  atienden peticiones seleccionadas y acumula stacks colapsados por ruta (formato de
+  flamegraph.pl / speedscope). Sobrecarga baja: no intercepta cada llamada.
+- Modo 'cprofile': cProfile determinista por petición, agregado en pstats por ruta.
+
+Los resultados se vuelcan por worker en PROFILE_DIR (`<ruta>.<pid>.collapsed` y
+`<ruta>.<pid>.pstats`), así que /debug/profile agrega los de todos los workers.
+MemoryTracker toma snapshots de tracemalloc y compara contra el anterior; en disco
+conserva solo los últimos `keep` de cada worker.
+"""
+import cProfile
+import glob
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+MODES = ('sample', 'cprofile')
+SORT_KEYS = tuple(sorted(pstats.Stats.sort_arg_dict_default))
+_FLUSH_INTERVAL = 10.0
+
+
+def route_slug(route: str) -> str:
+    """'/products/<product_id>' -> 'products_product_id' (nombre de archivo)."""
+    slug = route.strip('/').replace('/', '_').replace('<', '').replace('>', '')
+    return slug or 'root'
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f'{os.path.basename(code.co_filename)}:{code.co_name}'
+
+
+class RequestProfiler:
+    """Perfilador de peticiones muestreadas, agregado por ruta."""
+
+    def __init__(self, output_dir: str, interval: float = 0.005):
+        self.output_dir = output_dir
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._active: Dict[int, str] = {}
+        self._stacks: Dict[str, Counter] = defaultdict(Counter)
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._requests: Counter = Counter()
+        self._dirty = set()
+        self._last_flush = 0.0
+        self._sampler: Optional[threading.Thread] = None
+
+    # --- Muestreo estadístico -------------------------------------------------------
+    def _ensure_sampler(self) -> None:
+        if self._sampler is None:
+            with self._lock:
+                if self._sampler is None:
+                    self._sampler = threading.Thread(target=self._sample_loop, name='profiler-sampler',
+                                                     daemon=True)
+                    self._sampler.start()
+
+    def _sample_loop(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, route in active.items():
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if stack:
+                    with self._lock:
+                        self._stacks[route][';'.join(reversed(stack))] += 1
+
+    # --- Ciclo de vida de una petición ---------------------------------------------
+    def start(self, route: str, mode: str):
+        """Comienza a perfilar la petición actual; devuelve el handle para `stop`."""
+        if mode == 'cprofile':
+            profile = cProfile.Profile()
+            profile.enable()
+            return route, profile
+        self._ensure_sampler()
+        with self._lock:
+            self._active[threading.get_ident()] = route
+        return route, None
+
+    def stop(self, handle) -> None:
+        route, profile = handle
+        if profile is not None:
+            profile.disable()
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+            self._requests[route] += 1
+            if profile is not None:
+                if route in self._stats:
+                    self._stats[route].add(profile)
+                else:
+                    self._stats[route] = pstats.Stats(profile)
+            self._dirty.add(route)
+        if time.monotonic() - self._last_flush >= _FLUSH_INTERVAL:
+            self.flush()
+
+    # --- Persistencia y agregación -------------------------------------------------
+    def _path(self, route: str, extension: str, pid: Optional[int] = None) -> str:
+        return os.path.join(self.output_dir, f'{route_slug(route)}.{pid or os.getpid()}.{extension}')
+
+    def flush(self) -> None:
+        """Escribe los archivos de las rutas con muestras nuevas de este worker."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            self._last_flush = time.monotonic()
+            stacks = {route: dict(self._stacks[route]) for route in dirty if route in self._stacks}
+            stats = {route: self._stats[route] for route in dirty if route in self._stats}
+            for route, stat in stats.items():
+                stat.dump_stats(self._path(route, 'pstats'))
+        for route, counts in stacks.items():
+            with open(self._path(route, 'collapsed'), 'w') as f:
+                f.writelines(f'{stack} {count}\n' for stack, count in counts.items())
+
+    def collapsed(self) -> Dict[str, Counter]:
+        """Stacks colapsados de todos los workers, agregados por ruta (slug)."""
+        self.flush()
+        merged: Dict[str, Counter] = defaultdict(Counter)
+        for path in glob.glob(os.path.join(self.output_dir, '*.collapsed')):
+            slug = os.path.basename(path).split('.')[0]
+            with open(path) as f:
+                for line in f:
+                    stack, _, count = line.rstrip('\n').rpartition(' ')
+                    if stack:
+                        merged[slug][stack] += int(count)
+        return merged
+
+    def pstats_report(self, slug: str, limit: int = 40, sort: str = 'cumulative') -> Optional[str]:
+        """Top de funciones (pstats) de una ruta, agregando los archivos de todos los workers."""
+        self.flush()
+        paths = sorted(glob.glob(os.path.join(self.output_dir, f'{glob.escape(slug)}.*.pstats')))
+        if not paths:
+            return None
+        out = io.StringIO()
+        pstats.Stats(*paths, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def summary(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                'profiled_requests': dict(self._requests),
+                'active': len(self._active),
+            }
+
+    def reset(self) -> None:
+        """Descarta lo acumulado por este worker y sus archivos."""
+        with self._lock:
+            self._stacks.clear()
+            self._stats.clear()
+            self._requests.clear()
+            self._dirty.clear()
+        for path in glob.glob(os.path.join(self.output_dir, f'*.{os.getpid()}.*')):
+            os.remove(path)
+
+
+class MemoryTracker:
+    """Snapshots de tracemalloc para investigar crecimiento de memoria entre llamadas."""
+
+    def __init__(self, output_dir: str, frames: int = 25, keep: int = 5):
+        self.output_dir = output_dir
+        self.frames = frames
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._taken = 0
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self._previous = None
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self._previous = None
+
+    def _snapshot_path(self, number) -> str:
+        return os.path.join(self.output_dir, f'tracemalloc.{os.getpid()}.{number}.snapshot')
+
+    def _prune_snapshots(self) -> None:
+        """Borra los snapshots de este worker anteriores a los últimos `keep`."""
+        for path in glob.glob(self._snapshot_path('*')):
+            number = os.path.basename(path).split('.')[2]
+            if number.isdigit() and int(number) <= self._taken - self.keep:
+                os.remove(path)
+
+    def snapshot(self, top: int = 20) -> Dict[str, object]:
+        """
+        Toma un snapshot, lo guarda en disco y devuelve las líneas que más crecieron
+        desde el snapshot anterior (o las que más ocupan si es el primero).
+        """
+        if not tracemalloc.is_tracing():
+            return {'tracing': False}
+        with self._lock:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            ))
+            self._taken += 1
+            compared = self._previous is not None
+            os.makedirs(self.output_dir, exist_ok=True)
+            snapshot.dump(self._snapshot_path(self._taken))
+            self._prune_snapshots()
+            if compared:
+                stats = snapshot.compare_to(self._previous, 'lineno')[:top]
+                lines: List[Dict[str, object]] = [{
+                    'location': str(stat.traceback),
+                    'size_kb': round(stat.size / 1024, 1),
+                    'size_diff_kb': round(stat.size_diff / 1024, 1),
+                    'count_diff': stat.count_diff,
+                } for stat in stats]
+            else:
+                lines = [{
+                    'location': str(stat.traceback),
+                    'size_kb': round(stat.size / 1024, 1),
+                    'count': stat.count,
+                } for stat in snapshot.statistics('lineno')[:top]]
+            self._previous = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            'tracing': True,
+            'snapshot': self._taken,
+            'compared_to_previous': compared,
+            'traced_current_kb': round(current / 1024, 1),
+            'traced_peak_kb': round(peak / 1024, 1),
+            'top': lines,
+        }
@@ -1,20 +1,56 @@
 # repositories/product_repository.py
 from abc import ABC, abstractmethod
-from typing import List
-from domain.models import Product
+from typing import Dict, List, Optional
+from domain.models import CatalogEntry, Product, StockScope
 
 class ProductRepository(ABC):
     """Interfaz abstracta para el repositorio de productos."""
     @abstractmethod
-    def get_available_products(self) -> List[Product]:
+    def get_available_products(self, country: Optional[str] = None,
+                               warehouse_id: Optional[str] = None) -> List[Product]:
+        """Lista productos con stock, opcionalmente filtrando por país y/o bodega."""
         pass
 
     @abstractmethod
-    def get_product_by_id(self, product_id: str) -> List[Product]:
+    def get_product_by_id(self, product_id: str) -> Optional[Product]:
         """Obtiene un producto por su ID."""
         pass
 
     @abstractmethod
-    def update_product(self, product_id: str, price: float, stock: int) -> None:
-        """Actualiza un producto existente por su ID."""
+    def get_products_by_ids(self, product_ids: List[str]) -> Dict[str, Product]:
+        """
+        Obtiene varios productos en una sola consulta, indexados por ID.
+        Los IDs inexistentes no aparecen en el resultado.
+        """
+        pass
+
+    @abstractmethod
+    def update_product(self, product_id: str, price: float, stock: int,
+                       warehouse_id: str) -> Optional[List[StockScope]]:
+        """
+        Actualiza un producto existente por su ID.
+        Devuelve los ámbitos (bodega, país) donde el producto tiene stock, que son
+        los únicos listados de disponibilidad afectados por el cambio, o None si
+        ningún producto tiene ese ID (no se modifica nada).
+        """
+        pass
+
+    @abstractmethod
+    def search_products(self, query: str, limit: int) -> List[Product]:
+        """Busca productos disponibles por prefijo de SKU o nombre aproximado."""
+        pass
+
+    @abstractmethod
+    def get_catalog_entries(self, product_ids: Optional[List[str]] = None) -> List[CatalogEntry]:
+        """Atributos de faceta de todo el catálogo o de los productos indicados."""
+        pass
+
+    @abstractmethod
+    def get_product_ids(self) -> List[str]:
+        """IDs de todos los productos del catálogo (con o sin stock)."""
+        pass
+
+    @abstractmethod
+    def get_stock_countries(self) -> List[str]:
+        """Países con algún producto en stock (ordenados)."""
         pass
\ No newline at end of file
@@ -0,0 +1,140 @@
+# serializers/product_serializer.py
+import json
+import math
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from domain.models import Product
+from config import PRODUCTS_SERIALIZER
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa el encoder propio
+    orjson = None
+
+# Encoder de cadenas en C de la librería estándar (mismo escape ASCII que usa jsonify)
+_encode_str = json.encoder.encode_basestring_ascii
+
+
+def _json_str(value: Any) -> str:
+    return 'null' if value is None else _encode_str(value if type(value) is str else str(value))
+
+
+def _json_number(value: Any) -> str:
+    """NaN e infinito no son JSON válido: se emiten como null, igual que orjson."""
+    if value is None or (type(value) is float and not math.isfinite(value)):
+        return 'null'
+    return repr(value)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    """La columna `value` puede llegar como float o Decimal según el driver."""
+    if value is None:
+        return None
+    return float(value)
+
+
+def _to_int(value: Any) -> Optional[int]:
+    """SUM(quantity) puede llegar como Decimal en PostgreSQL."""
+    if value is None:
+        return None
+    return int(value)
+
+
+def product_to_dict(product: Product) -> Dict[str, Any]:
+    """
+    Convierte un Product en un dict con tipos normalizados.
+    Las llaves van en orden alfabético, igual que la salida de jsonify.
+    """
+    return {
+        'category_name': product.category_name,
+        'product_id': product.product_id,
+        'sku': product.sku,
+        'total_quantity': _to_int(product.total_quantity),
+        'value': _to_float(product.value),
+    }
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ProductSerializer(ABC):
+    """Interfaz para serializar productos directamente a bytes JSON."""
+    name = 'abstract'
+
+    @abstractmethod
+    def dumps_product(self, product: Product) -> bytes:
+        """Serializa un único producto."""
+        pass
+
+    @abstractmethod
+    def dumps_products(self, products: List[Product]) -> bytes:
+        """Serializa una lista de productos."""
+        pass
+
+    def dumps(self, payload: Any) -> bytes:
+        """Serializa un payload arbitrario (errores, estados)."""
+        return json.dumps(payload, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+class OrjsonProductSerializer(ProductSerializer):
+    """Serializador basado en orjson (extensión en Rust)."""
+    name = 'orjson'
+
+    def dumps_product(self, product: Product) -> bytes:
+        return orjson.dumps(product_to_dict(product))
+
+    def dumps_products(self, products: List[Product]) -> bytes:
+        return orjson.dumps([product_to_dict(p) for p in products])
+
+    def dumps(self, payload: Any) -> bytes:
+        return orjson.dumps(payload, default=_default)
+
+
+class NativeProductSerializer(ProductSerializer):
+    """
+    Encoder escrito a mano para el esquema fijo de Product.
+    Evita construir dicts intermedios y el recorrido genérico de json.dumps.
+    """
+    name = 'native'
+
+    @staticmethod
+    def _encode(product: Product) -> str:
+        value = product.value
+        quantity = product.total_quantity
+        # Camino rápido: float finito/int nativos; Decimal, None y no finitos se normalizan aparte
+        value = repr(value) if type(value) is float and math.isfinite(value) else _json_number(_to_float(value))
+        quantity = repr(quantity) if type(quantity) is int else _json_number(_to_int(quantity))
+        return (
+            f'{{"category_name":{_json_str(product.category_name)},'
+            f'"product_id":{_json_str(product.product_id)},'
+            f'"sku":{_json_str(product.sku)},'
+            f'"total_quantity":{quantity},"value":{value}}}'
+        )
+
+    def dumps_product(self, product: Product) -> bytes:
+        return self._encode(product).encode('ascii')
+
+    def dumps_products(self, products: List[Product]) -> bytes:
+        encode = self._encode
+        return ('[' + ','.join([encode(p) for p in products]) + ']').encode('ascii')
+
+
+def get_serializer(name: Optional[str] = None) -> ProductSerializer:
+    """
+    Devuelve el serializador configurado.
+    'auto' usa orjson si está instalado y, si no, el encoder propio.
+    """
+    name = (name or PRODUCTS_SERIALIZER).lower()
+    if name == 'native':
+        return NativeProductSerializer()
+    if name == 'orjson':
+        if orjson is None:
+            raise RuntimeError("PRODUCTS_SERIALIZER=orjson pero orjson no está instalado")
+        return OrjsonProductSerializer()
+    if name != 'auto':
+        raise ValueError(f"Serializador desconocido: {name}")
+    return OrjsonProductSerializer() if orjson is not None else NativeProductSerializer()
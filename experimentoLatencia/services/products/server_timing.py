@@ -0,0 +1,49 @@
+# server_timing.py
+"""
+Desglose por fases de cada petición para el encabezado `Server-Timing`.
+
+Las fases se acumulan en un ContextVar por petición, así que el adaptador de base de
+datos puede registrar `db-connect`/`db-query` sin depender de Flask. Fuera de una
+petición (scripts, benchmarks, hilos de fondo) las llamadas no hacen nada.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+# Orden estable de las fases en el encabezado
+PHASES = ('cache', 'repo-cache', 'db-connect', 'db-query', 'materialize', 'serialize', 'cache-write')
+
+_phases: ContextVar[Optional[Dict[str, float]]] = ContextVar('server_timing_phases', default=None)
+
+
+def begin() -> None:
+    """Inicia el registro de fases de la petición actual."""
+    _phases.set({})
+
+
+def add(name: str, seconds: float) -> None:
+    """Suma `seconds` a la fase (varias consultas en una petición se acumulan)."""
+    phases = _phases.get()
+    if phases is not None:
+        phases[name] = phases.get(name, 0.0) + seconds
+
+
+@contextmanager
+def phase(name: str):
+    """Mide el bloque como parte de la fase `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(name, time.perf_counter() - start)
+
+
+def header(total: Optional[float] = None) -> str:
+    """Valor de Server-Timing en milisegundos, p. ej. `cache;dur=0.8, db-query;dur=12.3`."""
+    phases = _phases.get() or {}
+    ordered = [name for name in PHASES if name in phases] + sorted(set(phases) - set(PHASES))
+    parts = [f'{name};dur={phases[name] * 1000:.1f}' for name in ordered]
+    if total is not None:
+        parts.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(parts)
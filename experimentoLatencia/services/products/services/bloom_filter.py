@@ -0,0 +1,64 @@
+# services/bloom_filter.py
+import hashlib
+import math
+from typing import Dict, Iterable
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom de IDs de producto conocidos.
+
+    Responde "seguro que no existe" sin falsos negativos, así que un ID ausente del
+    filtro puede devolverse como 404 sin consultar Redis ni la base. Los falsos
+    positivos (tasa `error_rate`) solo cuestan la consulta que se hacía antes.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # m = -n·ln(p)/ln(2)^2 bits y k = (m/n)·ln(2) funciones hash
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    @classmethod
+    def from_ids(cls, product_ids: Iterable[str], error_rate: float = 0.01,
+                 headroom: float = 2.0) -> 'BloomFilter':
+        """Construye el filtro con holgura para las altas posteriores a la reconstrucción."""
+        product_ids = list(product_ids)
+        bloom = cls(int(len(product_ids) * headroom) + 64, error_rate)
+        for product_id in product_ids:
+            bloom.add(product_id)
+        return bloom
+
+    def _positions(self, item: str):
+        # Doble hashing (Kirsch-Mitzenmacher): k posiciones a partir de un único digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        bits = self._bits
+        for position in self._positions(item):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def stats(self) -> Dict[str, object]:
+        """Tamaño, ocupación y tasa de falsos positivos estimada con la carga actual."""
+        estimated_fpr = (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+        return {
+            'items': self.count,
+            'capacity': self.capacity,
+            'bits': self.size,
+            'hash_functions': self.hash_count,
+            'memory_bytes': len(self._bits),
+            'estimated_false_positive_rate': round(estimated_fpr, 6),
+        }
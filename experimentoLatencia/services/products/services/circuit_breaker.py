@@ -0,0 +1,130 @@
+# services/circuit_breaker.py
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Tuple, Type
+
+
+class RepositoryUnavailableError(Exception):
+    """La base de datos falló, excedió el timeout o el circuito está abierto."""
+
+
+class CircuitOpenError(RepositoryUnavailableError):
+    """El circuito está abierto: la llamada se rechaza sin tocar la base."""
+
+
+# Fallos de infraestructura por defecto; cada adaptador agrega los de su driver
+DEFAULT_TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (TimeoutError, ConnectionError,
+                                                             RepositoryUnavailableError)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por tasa de fallos sobre una ventana de las últimas N llamadas.
+
+    - CLOSED: las llamadas pasan; si en la ventana hay al menos `min_calls` resultados
+      y la proporción de fallos alcanza `failure_rate`, se abre.
+    - OPEN: las llamadas fallan de inmediato durante `reset_timeout` segundos.
+    - HALF_OPEN: se deja pasar una única llamada de prueba; si funciona se cierra,
+      si falla se vuelve a abrir.
+
+    Solo las excepciones de `transient_errors` (conexión caída, timeouts) cuentan como
+    fallo de la base. Cualquier otra (datos inválidos, errores de programación) se
+    propaga sin cambios y no afecta al circuito.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_rate: float = 0.5, window: int = 20, min_calls: int = 5,
+                 reset_timeout: float = 15.0, clock: Callable[[], float] = time.monotonic,
+                 transient_errors: Tuple[Type[BaseException], ...] = DEFAULT_TRANSIENT_ERRORS):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.transient_errors = tuple(transient_errors)
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._rejected = 0
+        self._times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._times_opened += 1
+        self._outcomes.clear()
+
+    def _before_call(self) -> None:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.OPEN or (self._state == self.HALF_OPEN and self._trial_in_flight):
+                self._rejected += 1
+                raise CircuitOpenError('Circuit breaker abierto: base de datos no disponible')
+            if self._state == self.HALF_OPEN:
+                self._trial_in_flight = True
+
+    def _record(self, success: bool) -> None:
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                if success:
+                    self._state = self.CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """
+        Ejecuta `fn` bajo el breaker; los fallos transitorios se propagan como
+        RepositoryUnavailableError, el resto de excepciones sin cambios.
+        """
+        self._before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except self.transient_errors as e:
+            self._record(False)
+            if isinstance(e, RepositoryUnavailableError):
+                raise
+            raise RepositoryUnavailableError(str(e)) from e
+        except BaseException:
+            self._release_trial()
+            raise
+        self._record(True)
+        return result
+
+    def _release_trial(self) -> None:
+        """Un error no transitorio no dice nada de la base: libera la llamada de prueba."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                'state': self._state,
+                'window_calls': len(self._outcomes),
+                'window_failures': self._outcomes.count(False),
+                'rejected_calls': self._rejected,
+                'times_opened': self._times_opened,
+            }
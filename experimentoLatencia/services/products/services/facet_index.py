@@ -0,0 +1,139 @@
+# services/facet_index.py
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Set
+from domain.models import CatalogEntry
+
+# Facetas soportadas -> atributo de CatalogEntry
+FACETS = {
+    'category': 'category_name',
+    'provider': 'provider_id',
+    'country': 'countries',
+    'objective_profile': 'objective_profile',
+}
+
+try:
+    _popcount = int.bit_count  # Python >= 3.10
+except AttributeError:  # pragma: no cover - imagen python:3.9
+    def _popcount(bitmap: int) -> int:
+        return bin(bitmap).count('1')
+
+
+class FacetIndex:
+    """
+    Índices bitmap en memoria por faceta (categoría, proveedor, país, perfil).
+
+    Cada producto ocupa una posición fija de bit; cada valor de faceta es un entero
+    de Python usado como bitmap. Las intersecciones (&) y el conteo de bits operan
+    sobre palabras de máquina en C, así que un conteo por valor cuesta O(n/64).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._positions: Dict[str, int] = {}
+        self._product_ids: List[str] = []
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._bitmaps: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        # Productos con stock > 0 en algún país (los que aparecen en /products/available)
+        self._available = 0
+
+    @staticmethod
+    def _values(entry: CatalogEntry, facet: str) -> Iterable[str]:
+        value = getattr(entry, FACETS[facet])
+        if value is None:
+            return ()
+        return value if isinstance(value, (list, tuple, set, frozenset)) else (value,)
+
+    def build(self, entries: Iterable[CatalogEntry]) -> None:
+        """Reconstruye todos los bitmaps a partir del catálogo completo."""
+        with self._lock:
+            self._reset()
+            for entry in entries:
+                self._set(entry)
+
+    def upsert(self, entry: CatalogEntry) -> None:
+        """Actualiza incrementalmente los bits de un producto (alta o cambio de stock)."""
+        with self._lock:
+            self._clear(entry.product_id)
+            self._set(entry)
+
+    def _set(self, entry: CatalogEntry) -> None:
+        position = self._positions.get(entry.product_id)
+        if position is None:
+            position = len(self._product_ids)
+            self._positions[entry.product_id] = position
+            self._product_ids.append(entry.product_id)
+        bit = 1 << position
+        for facet in FACETS:
+            bitmaps = self._bitmaps[facet]
+            for value in self._values(entry, facet):
+                bitmaps[value] = bitmaps.get(value, 0) | bit
+        if entry.countries:
+            self._available |= bit
+        self._entries[entry.product_id] = entry
+
+    def _clear(self, product_id: str) -> None:
+        previous = self._entries.pop(product_id, None)
+        if previous is None:
+            return
+        mask = ~(1 << self._positions[product_id])
+        for facet in FACETS:
+            bitmaps = self._bitmaps[facet]
+            for value in self._values(previous, facet):
+                remaining = bitmaps.get(value, 0) & mask
+                if remaining:
+                    bitmaps[value] = remaining
+                else:
+                    bitmaps.pop(value, None)
+        self._available &= mask
+
+    def _facet_mask(self, facet: str, values: Iterable[str]) -> int:
+        """OR de los bitmaps de los valores pedidos dentro de una faceta."""
+        bitmaps = self._bitmaps[facet]
+        mask = 0
+        for value in values:
+            mask |= bitmaps.get(value, 0)
+        return mask
+
+    def _mask(self, filters: Mapping[str, List[str]], exclude: Optional[str] = None) -> int:
+        """AND entre facetas filtradas (opcionalmente ignorando una) sobre los disponibles."""
+        mask = self._available
+        for facet, values in filters.items():
+            if facet != exclude and values:
+                mask &= self._facet_mask(facet, values)
+        return mask
+
+    def matching_ids(self, filters: Mapping[str, List[str]]) -> Set[str]:
+        """IDs de productos disponibles que cumplen todos los filtros."""
+        with self._lock:
+            # Recorrer la representación binaria es O(n); extraer bit a bit sería O(k·n)
+            bits = bin(self._mask(filters))[:1:-1]
+            ids = self._product_ids
+            result = set()
+            position = bits.find('1')
+            while position != -1:
+                result.add(ids[position])
+                position = bits.find('1', position + 1)
+            return result
+
+    def counts(self, filters: Mapping[str, List[str]]) -> Dict[str, object]:
+        """
+        Conteos por valor de cada faceta. Para cada faceta se ignoran sus propios
+        filtros (faceting disyuntivo), de modo que el front puede seguir ofreciendo
+        los demás valores de la faceta ya seleccionada.
+        """
+        with self._lock:
+            facets = {}
+            for facet in FACETS:
+                base = self._mask(filters, exclude=facet)
+                facets[facet] = {
+                    value: count
+                    for value, count in (
+                        (value, _popcount(base & bitmap))
+                        for value, bitmap in sorted(self._bitmaps[facet].items())
+                    )
+                    if count
+                }
+            return {'total': _popcount(self._mask(filters)), 'facets': facets}
@@ -0,0 +1,76 @@
+# services/product_loader.py
+from typing import Callable, Dict, List, Optional
+from domain.models import Product
+
+_UNRESOLVED = object()
+
+
+class PendingProduct:
+    """
+    Resultado diferido de `ProductLoader.defer`. Leer `.value` despacha en un solo
+    lote todas las cargas pendientes del loader, no solo la de este producto.
+    """
+
+    def __init__(self, loader: 'ProductLoader', product_id: str):
+        self._loader = loader
+        self.product_id = product_id
+
+    @property
+    def value(self) -> Optional[Product]:
+        return self._loader.load(self.product_id)
+
+
+class ProductLoader:
+    """
+    DataLoader de productos con alcance de una petición.
+
+    - `defer(id)` encola IDs sin tocar la caché ni la base; la primera lectura de un
+      resultado (o `dispatch()`) resuelve todos los encolados con una sola llamada
+      a `batch_load`, sin duplicados.
+    - Memo por petición: repetir un ID (incluidos los inexistentes) no cuesta nada.
+
+    No es thread-safe: cada petición crea el suyo (ver ProductService.begin_request).
+    """
+
+    def __init__(self, batch_load: Callable[[List[str]], Dict[str, Product]], max_batch_size: int = 500):
+        self._batch_load = batch_load
+        self.max_batch_size = max_batch_size
+        self._memo: Dict[str, Optional[Product]] = {}
+        self._queue: Dict[str, None] = {}
+        self.batches = 0
+
+    def defer(self, product_id: str) -> PendingProduct:
+        if product_id not in self._memo:
+            self._queue[product_id] = None
+        return PendingProduct(self, product_id)
+
+    def dispatch(self) -> None:
+        """Resuelve las claves encoladas en lotes de hasta `max_batch_size`."""
+        while self._queue:
+            keys = list(self._queue)[:self.max_batch_size]
+            for key in keys:
+                del self._queue[key]
+            found = self._batch_load(keys)
+            self.batches += 1
+            for key in keys:
+                self._memo[key] = found.get(key)
+
+    def load(self, product_id: str) -> Optional[Product]:
+        product = self._memo.get(product_id, _UNRESOLVED)
+        if product is _UNRESOLVED:
+            self._queue[product_id] = None
+            self.dispatch()
+            product = self._memo[product_id]
+        return product
+
+    def load_many(self, product_ids: List[str]) -> Dict[str, Product]:
+        """Productos existentes de `product_ids`, indexados por ID (un lote para los no memorizados)."""
+        for product_id in product_ids:
+            self.defer(product_id)
+        self.dispatch()
+        return {product_id: self._memo[product_id] for product_id in product_ids
+                if self._memo.get(product_id) is not None}
+
+    def clear(self, product_id: str) -> None:
+        """Olvida un ID (tras actualizarlo en esta misma petición)."""
+        self._memo.pop(product_id, None)
@@ -1,16 +1,80 @@
 # services/product_service.py
-from typing import List
+from contextvars import ContextVar
+from typing import Dict, List, Optional
 from repositories.product_repository import ProductRepository
-from domain.models import Product
+from domain.models import CatalogEntry, Product, StockScope
+from services.product_loader import ProductLoader
+from config import DEFAULT_WAREHOUSE_ID
+
+# Loader de la petición en curso (None fuera de una petición: scripts, hilos de fondo)
+_request_loader: ContextVar[Optional[ProductLoader]] = ContextVar('product_loader', default=None)
+
 
 class ProductService:
     def __init__(self, repository: ProductRepository):
         self.repository = repository
 
-    def list_available_products(self) -> List[Product]:
-        """Caso de uso: listar todos los productos disponibles."""
-        return self.repository.get_available_products()
+    def begin_request(self) -> ProductLoader:
+        """
+        Crea el loader de la petición actual: a partir de aquí las consultas por ID se
+        agrupan en lotes y se memorizan hasta `end_request`.
+        """
+        loader = ProductLoader(self.repository.get_products_by_ids)
+        _request_loader.set(loader)
+        return loader
+
+    def end_request(self) -> None:
+        _request_loader.set(None)
+
+    @staticmethod
+    def loader() -> Optional[ProductLoader]:
+        """Loader de la petición en curso, si hay una."""
+        return _request_loader.get()
+
+    def list_available_products(self, country: Optional[str] = None,
+                                warehouse_id: Optional[str] = None) -> List[Product]:
+        """Caso de uso: listar los productos disponibles (global, por país o por bodega)."""
+        return self.repository.get_available_products(country=country, warehouse_id=warehouse_id)
+
+    def get_product_by_id(self, product_id: str) -> Optional[Product]:
+        """Caso de uso: obtener un producto por su ID."""
+        loader = _request_loader.get()
+        if loader is not None:
+            return loader.load(product_id)
+        return self.repository.get_product_by_id(product_id)
+
+    def get_products_by_ids(self, product_ids: List[str]) -> Dict[str, Product]:
+        """Caso de uso: obtener varios productos en una sola llamada al repositorio."""
+        loader = _request_loader.get()
+        if loader is not None:
+            return loader.load_many(product_ids)
+        return self.repository.get_products_by_ids(product_ids)
+
+    def search_products(self, query: str, limit: int) -> List[Product]:
+        """Caso de uso: buscar productos por SKU o nombre."""
+        return self.repository.search_products(query, limit)
+
+    def list_catalog_entries(self, product_ids: Optional[List[str]] = None) -> List[CatalogEntry]:
+        """Caso de uso: obtener los atributos de faceta del catálogo."""
+        return self.repository.get_catalog_entries(product_ids)
+
+    def list_product_ids(self) -> List[str]:
+        """Caso de uso: IDs conocidos del catálogo (para el filtro de Bloom)."""
+        return self.repository.get_product_ids()
+
+    def list_stock_countries(self) -> List[str]:
+        """Caso de uso: países con stock (listados por país a precalentar)."""
+        return self.repository.get_stock_countries()
 
-    def update_product(self, product_id: str, price: float, stock: int) -> None:
-        """Caso de uso: actualizar un producto existente."""
-        self.repository.update_product(product_id=product_id, price=price, stock=stock)
\ No newline at end of file
+    def update_product(self, product_id: str, price: float, stock: int,
+                       warehouse_id: Optional[str] = None) -> Optional[List[StockScope]]:
+        """Caso de uso: actualizar un producto existente (None si el ID no existe)."""
+        loader = _request_loader.get()
+        if loader is not None:
+            loader.clear(product_id)
+        return self.repository.update_product(
+            product_id=product_id,
+            price=price,
+            stock=stock,
+            warehouse_id=warehouse_id or DEFAULT_WAREHOUSE_ID
+        )
\ No newline at end of file
@@ -0,0 +1,169 @@
+# warmup.py
+"""
+Calentamiento de la caché al arrancar los workers (deploy) y tras perder Redis (failover).
+
+- HotProductCounter cuenta las consultas de detalle por producto y las acumula cada
+  pocos segundos en la caché compartida, de modo que el ranking sobrevive a los deploys.
+- CacheWarmer ejecuta tareas de precarga en paralelo con un presupuesto de tiempo.
+  Un lock en la caché (add = SET NX en Redis) hace que solo un worker consulte la
+  base; los demás esperan a que termine (o a que venza el presupuesto) y después
+  se declaran listos. /health no reporta listo mientras el calentamiento inicial corre.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Tarea de calentamiento: (nombre, función que devuelve cuántas claves escribió)
+WarmupTask = Tuple[str, Callable[[], int]]
+
+logger = logging.getLogger(__name__)
+
+
+class HotProductCounter:
+    """
+    Contador de consultas por producto persistido en la caché compartida.
+
+    Cada worker acumula en memoria y cada `flush_interval` suma sus conteos al
+    diccionario guardado en `key` (leer-sumar-escribir: dos workers que vacían a la
+    vez pueden perder algunos conteos, suficiente para un ranking aproximado).
+    Solo se conservan los `max_tracked` productos más consultados.
+    """
+
+    def __init__(self, cache, key: str, flush_interval: float = 30.0, max_tracked: int = 5000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.cache = cache
+        self.key = key
+        self.flush_interval = flush_interval
+        self.max_tracked = max_tracked
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending: Counter = Counter()
+        self._last_flush = clock()
+
+    def record(self, product_id: str) -> None:
+        with self._lock:
+            self._pending[product_id] += 1
+            due = self._clock() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = self._clock()
+        if not pending:
+            return
+        try:
+            stored = Counter(self.cache.get(self.key) or {})
+            stored.update(pending)
+            self.cache.set(self.key, dict(stored.most_common(self.max_tracked)), timeout=0)
+        except Exception as e:
+            logger.warning("[warmup] no se pudo persistir el contador de productos: %s", e)
+
+    def top(self, n: int) -> List[str]:
+        """IDs de los `n` productos más consultados (persistidos + pendientes de este worker)."""
+        try:
+            counts = Counter(self.cache.get(self.key) or {})
+        except Exception:
+            counts = Counter()
+        with self._lock:
+            counts.update(self._pending)
+        return [product_id for product_id, _ in counts.most_common(n)]
+
+
+class CacheWarmer:
+    """Ejecuta las tareas de precarga en paralelo, acotadas por `budget` segundos."""
+
+    def __init__(self, cache, lock_key: str, budget: float = 20.0, concurrency: int = 4,
+                 poll_interval: float = 0.5):
+        self.cache = cache
+        self.lock_key = lock_key
+        self.budget = budget
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._ready = threading.Event()
+        self.state: Dict[str, object] = {'status': 'pending', 'runs': 0}
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def mark_ready(self, status: str) -> None:
+        """Sin calentamiento (deshabilitado): el worker está listo de inmediato."""
+        self.state['status'] = status
+        self._ready.set()
+
+    def run(self, tasks: List[WarmupTask]) -> Dict[str, object]:
+        """Precarga con el lock de la caché; marca el worker como listo al terminar."""
+        started = time.monotonic()
+        deadline = started + self.budget
+        self.state.update(status='running', runs=self.state['runs'] + 1, started_at=time.time())
+        token = f'{os.getpid()}:{uuid.uuid4().hex}'
+        try:
+            if self.cache.add(self.lock_key, token, timeout=int(self.budget) + 1):
+                try:
+                    self._run_tasks(tasks, deadline)
+                finally:
+                    self._release_lock(token)
+            else:
+                self._wait_for_other_worker(deadline)
+        except Exception as e:
+            self.state.update(status='failed', error=str(e))
+            logger.warning("[warmup] calentamiento fallido: %s", e)
+        self.state['elapsed_ms'] = round((time.monotonic() - started) * 1000, 1)
+        self._ready.set()
+        return dict(self.state)
+
+    def _release_lock(self, token: str) -> None:
+        """
+        Borra el lock solo si aún guarda el token de esta ejecución: si venció (p. ej. el
+        presupuesto se excedió) y otro worker lo tomó, ese lock ya no es nuestro.
+        """
+        if self.cache.get(self.lock_key) == token:
+            self.cache.delete(self.lock_key)
+
+    def _wait_for_other_worker(self, deadline: float) -> None:
+        self.state['status'] = 'waiting'
+        while time.monotonic() < deadline:
+            if self.cache.get(self.lock_key) is None:
+                self.state['status'] = 'done-by-other-worker'
+                return
+            time.sleep(self.poll_interval)
+        self.state['status'] = 'timeout'
+
+    def _run_tasks(self, tasks: List[WarmupTask], deadline: float) -> None:
+        results = {'keys': 0, 'completed': 0, 'failed': 0, 'skipped': 0, 'pending': 0}
+
+        def guarded(task: Callable[[], int]) -> Optional[int]:
+            # Las tareas que no alcanzaron a empezar dentro del presupuesto no se ejecutan
+            if time.monotonic() >= deadline:
+                return None
+            return task()
+
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='cache-warmup')
+        try:
+            futures = {pool.submit(guarded, task): name for name, task in tasks}
+            done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+            for future in done:
+                try:
+                    keys = future.result()
+                    if keys is None:
+                        results['skipped'] += 1
+                        continue
+                    results['keys'] += keys
+                    results['completed'] += 1
+                except Exception as e:
+                    results['failed'] += 1
+                    logger.warning("[warmup] tarea %s fallida: %s", futures[future], e)
+            # Las que no empezaron se cancelan (omitidas); las que siguen corriendo quedan pendientes
+            for future in not_done:
+                results['skipped' if future.cancel() else 'pending'] += 1
+        finally:
+            # No se espera a las tareas en curso: el presupuesto manda sobre la precarga
+            pool.shutdown(wait=False)
+        self.state.update(results, status='timeout' if not_done else 'done')
@@ -6,6 +6,7 @@ from aws_cdk import (
     aws_iam as iam,
     aws_logs as logs,
     aws_elasticloadbalancingv2 as elbv2,
+    aws_secretsmanager as secretsmanager,
     Duration
 )
 from constructs import Construct
@@ -67,6 +68,16 @@ class ProductsService(Construct):
             "password"
         )
 
+        # Token de /metrics (Prometheus / experimento de latencia), distinto del de /debug
+        self.metrics_token = secretsmanager.Secret(
+            self, "ProductsMetricsToken",
+            description="Bearer token de /metrics del servicio de productos",
+            generate_secret_string=secretsmanager.SecretStringGenerator(
+                exclude_punctuation=True,
+                password_length=40
+            )
+        )
+
         container = task_definition.add_container(
             "ProductsServiceContainer",
             image=ecs.ContainerImage.from_asset("services/products"),
@@ -87,7 +98,8 @@ class ProductsService(Construct):
             },
             # ✅ 2. PASAR LA CONTRASEÑA DE FORMA SEGURA CON SECRETS
             secrets={
-                "DB_PASSWORD": db_password_secret
+                "DB_PASSWORD": db_password_secret,
+                "METRICS_TOKEN": ecs.Secret.from_secrets_manager(self.metrics_token)
             },
             port_mappings=[
                 ecs.PortMapping(
@@ -97,6 +109,7 @@ class ProductsService(Construct):
             ]
         )
         self.database.secret.grant_read(task_definition.task_role)
+        self.metrics_token.grant_read(task_definition.task_role)
         return task_definition
 
     def _create_service(self):
@@ -174,7 +187,8 @@ class ProductsService(Construct):
         self.alb_listener.add_target_groups(
             "ProductsServiceTargetGroup",
             target_groups=[self.target_group],
-            conditions=[elbv2.ListenerCondition.path_patterns(["/products*"])],
+            # /metrics exige METRICS_TOKEN; sin esta ruta el ALB no lo expone al experimento
+            conditions=[elbv2.ListenerCondition.path_patterns(["/products*", "/metrics"])],
             priority=200
         )
         self.service.attach_to_application_target_group(self.target_group)
\ No newline at end of file
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Pruebas del filtro de Bloom de IDs de producto (services/bloom_filter.py): tamaño
+según capacidad y tasa de error, sin falsos negativos y tasa de falsos positivos acotada.
+"""
+
+import math
+import os
+import sys
+import unittest
+
+# Agregar el directorio del servicio al path (antes que el paquete `services` de este directorio)
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services', 'products')
+sys.path.insert(0, SERVICE_DIR)
+
+from services.bloom_filter import BloomFilter  # noqa: E402
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_sizing_follows_capacity_and_error_rate(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        # m = -n·ln(p)/ln(2)^2 ≈ 9586 bits, k = (m/n)·ln(2) ≈ 7
+        self.assertEqual(bloom.size, 9586)
+        self.assertEqual(bloom.hash_count, 7)
+        self.assertEqual(bloom.stats()['memory_bytes'], math.ceil(9586 / 8))
+        self.assertGreater(BloomFilter(1000, error_rate=0.001).size, bloom.size)
+
+    def test_degenerate_capacity(self):
+        bloom = BloomFilter(0)
+        self.assertEqual(bloom.capacity, 1)
+        self.assertGreaterEqual(bloom.size, 8)
+        bloom.add('prod_001')
+        self.assertIn('prod_001', bloom)
+
+    def test_add_and_contains_without_false_negatives(self):
+        ids = [f'prod_{i:05d}' for i in range(5000)]
+        bloom = BloomFilter.from_ids(ids, error_rate=0.01)
+        self.assertTrue(all(product_id in bloom for product_id in ids))
+        self.assertEqual(bloom.count, len(ids))
+        self.assertNotIn('prod_99999', BloomFilter(10))
+
+    def test_false_positive_rate_stays_within_bound_at_capacity(self):
+        bloom = BloomFilter(5000, error_rate=0.01)
+        for i in range(5000):
+            bloom.add(f'prod_{i:05d}')
+        probes = 50000
+        false_positives = sum(f'missing_{i}' in bloom for i in range(probes))
+        self.assertLess(false_positives / probes, 0.02)
+        self.assertAlmostEqual(bloom.stats()['estimated_false_positive_rate'], 0.01, delta=0.002)
+
+    def test_from_ids_leaves_headroom_for_new_ids(self):
+        bloom = BloomFilter.from_ids([f'prod_{i}' for i in range(1000)], error_rate=0.01)
+        self.assertEqual(bloom.capacity, 2064)
+        self.assertLess(bloom.stats()['estimated_false_positive_rate'], 0.001)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Pruebas de las claves de caché (services/products/cache_keys.py): normalización de
+ámbitos y claves de disponibilidad que se invalidan al actualizar un producto.
+"""
+
+import os
+import sys
+import unittest
+
+# Agregar el directorio del servicio al path (antes que el paquete `services` de este directorio)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services', 'products'))
+
+from cache_keys import (AVAILABLE_PRODUCTS_KEY, availability_key, availability_keys_for_scopes,  # noqa: E402
+                        filtered_availability_key, normalize_scope_value)
+from domain.models import StockScope  # noqa: E402
+
+
+class TestNormalizeScopeValue(unittest.TestCase):
+
+    def test_normalizes_case_and_whitespace(self):
+        self.assertEqual(normalize_scope_value(' usa '), 'USA')
+        self.assertEqual(normalize_scope_value('w-001'), 'W-001')
+        self.assertIsNone(normalize_scope_value(None))
+        self.assertIsNone(normalize_scope_value('   '))
+
+    def test_rejects_lists_and_non_strings(self):
+        for value in ('USA,CAN', 'USA,', 5, 1.5, True, ['USA'], {'country': 'USA'}):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    normalize_scope_value(value)
+
+
+class TestAvailabilityKeys(unittest.TestCase):
+
+    def test_availability_key_per_scope(self):
+        self.assertEqual(availability_key(), AVAILABLE_PRODUCTS_KEY)
+        self.assertEqual(availability_key(country='USA'), 'products:country=USA:warehouse=*')
+        self.assertEqual(availability_key(warehouse_id='W-001'), 'products:country=*:warehouse=W-001')
+        self.assertEqual(availability_key('USA', 'W-001'), 'products:country=USA:warehouse=W-001')
+
+    def test_keys_for_scopes_cover_every_listing_the_change_touches(self):
+        keys = availability_keys_for_scopes([StockScope('W-001', 'USA'), StockScope('W-002', 'CAN')])
+        self.assertEqual(keys, sorted({
+            AVAILABLE_PRODUCTS_KEY,
+            availability_key(country='USA'), availability_key(warehouse_id='W-001'), availability_key('USA', 'W-001'),
+            availability_key(country='CAN'), availability_key(warehouse_id='W-002'), availability_key('CAN', 'W-002'),
+        }))
+        self.assertEqual(availability_keys_for_scopes([]), [AVAILABLE_PRODUCTS_KEY])
+
+    def test_filtered_key_is_order_independent_and_versioned(self):
+        a = filtered_availability_key('products', {'provider': ['P2', 'P1'], 'category': ['C']}, 3)
+        b = filtered_availability_key('products', {'category': ['C'], 'provider': ['P1', 'P2']}, 3)
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, filtered_availability_key('products', {'category': ['C'], 'provider': ['P1', 'P2']}, 4))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
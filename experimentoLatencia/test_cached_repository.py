@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Pruebas de CachedProductRepository (caché read-through de objetos de dominio) sobre
+el adaptador SQLite con una copia temporal de healthcare_products.db.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Agregar el directorio del servicio al path (antes que el paquete `services` de este directorio)
+HERE = os.path.dirname(os.path.abspath(__file__))
+SERVICE_DIR = os.path.join(HERE, 'services', 'products')
+sys.path.insert(0, SERVICE_DIR)
+sys.path.append(HERE)
+
+from adapters.cache_backends import InProcessCacheBackend  # noqa: E402
+from adapters.cached_repository_adapter import CachedProductRepository  # noqa: E402
+from adapters.fault_injection_adapter import FaultInjectingProductAdapter  # noqa: E402
+from adapters.sqlite_adapter import SQLiteProductAdapter  # noqa: E402
+from fake_clock import FakeClock  # noqa: E402
+
+TTLS = {'get_product_by_id': 300, 'get_available_products': 60, 'search_products': 0}
+
+
+class TestCachedProductRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        db_path = os.path.join(self.tmp, 'products.db')
+        shutil.copy(os.path.join(SERVICE_DIR, 'healthcare_products.db'), db_path)
+        # Sin fallos configurados, el adaptador de fallos solo cuenta las llamadas a la base
+        self.database = FaultInjectingProductAdapter(SQLiteProductAdapter(db_path=db_path))
+        self.clock = FakeClock()
+        self.backend = InProcessCacheBackend(clock=self.clock)
+        self.repository = CachedProductRepository(self.database, self.backend, TTLS, negative_ttl=30)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_repeated_lookup_is_served_from_cache(self):
+        first = self.repository.get_product_by_id('prod_001')
+        calls = self.database.calls
+        self.assertEqual(self.repository.get_product_by_id('prod_001'), first)
+        self.assertEqual(self.database.calls, calls)
+
+    def test_batch_lookup_fetches_only_misses_in_one_call(self):
+        self.repository.get_product_by_id('prod_001')
+        calls = self.database.calls
+        products = self.repository.get_products_by_ids(['prod_001', 'prod_002', 'prod_003', 'nope', 'prod_002'])
+        self.assertEqual(sorted(products), ['prod_001', 'prod_002', 'prod_003'])
+        self.assertEqual(self.database.calls, calls + 1)
+
+        # Todo (incluido el ID inexistente) queda en caché
+        self.assertEqual(len(self.repository.get_products_by_ids(['prod_002', 'nope'])), 1)
+        self.assertEqual(self.database.calls, calls + 1)
+
+    def test_update_invalidates_detail_and_affected_listings(self):
+        self.repository.get_product_by_id('prod_001')
+        listing = self.repository.get_available_products()
+        self.repository.update_product('prod_001', price=1.25, stock=10, warehouse_id='W-001')
+
+        self.assertEqual(self.repository.get_product_by_id('prod_001').value, 1.25)
+        updated = {product.product_id: product for product in self.repository.get_available_products()}
+        self.assertEqual(updated['prod_001'].value, 1.25)
+        self.assertEqual(len(updated), len(listing))
+
+    def test_update_of_unknown_id_returns_none_and_keeps_cache(self):
+        self.assertIsNone(self.repository.get_product_by_id('nope'))
+        calls = self.database.calls
+        self.assertIsNone(self.repository.update_product('nope', price=1.0, stock=1, warehouse_id='W-001'))
+        self.assertIsNone(self.repository.get_product_by_id('nope'))
+        self.assertEqual(self.database.calls, calls + 1)
+
+    def test_entries_expire_after_ttl(self):
+        self.repository.get_available_products(country='USA')
+        calls = self.database.calls
+        self.clock.now += 61
+        self.repository.get_available_products(country='USA')
+        self.assertEqual(self.database.calls, calls + 1)
+
+    def test_methods_without_ttl_are_not_cached(self):
+        self.repository.search_products('SKU-MED', 5)
+        calls = self.database.calls
+        self.repository.search_products('SKU-MED', 5)
+        self.assertEqual(self.database.calls, calls + 1)
+
+    def test_in_process_backend_evicts_oldest_entries(self):
+        backend = InProcessCacheBackend(max_entries=2, clock=self.clock)
+        backend.set_many({'a': 1, 'b': 2}, timeout=10)
+        backend.set_many({'c': 3}, timeout=10)
+        self.assertEqual(backend.get_many(['a', 'b', 'c']), {'b': 2, 'c': 3})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
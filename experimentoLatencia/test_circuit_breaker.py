@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Pruebas del circuit breaker del servicio de productos con inyección de fallos.
+Envuelve el adaptador SQLite (sobre una copia temporal de healthcare_products.db)
+con latencia y errores simulados de base de datos.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+# Agregar el directorio del servicio al path (antes que el paquete `services` de este directorio)
+HERE = os.path.dirname(os.path.abspath(__file__))
+SERVICE_DIR = os.path.join(HERE, 'services', 'products')
+sys.path.insert(0, SERVICE_DIR)
+sys.path.append(HERE)
+
+from adapters.circuit_breaker_adapter import CircuitBreakerProductAdapter  # noqa: E402
+from adapters.fault_injection_adapter import FaultInjectingProductAdapter, InjectedFaultError  # noqa: E402
+from adapters.sqlite_adapter import SQLiteProductAdapter  # noqa: E402
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError, RepositoryUnavailableError  # noqa: E402
+from fake_clock import FakeClock  # noqa: E402
+
+
+class TestCircuitBreakerWithFaultInjection(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        db_path = os.path.join(self.tmp, 'products.db')
+        shutil.copy(os.path.join(SERVICE_DIR, 'healthcare_products.db'), db_path)
+        self.faults = FaultInjectingProductAdapter(SQLiteProductAdapter(db_path=db_path))
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_rate=0.5, window=10, min_calls=4,
+                                      reset_timeout=15, clock=self.clock,
+                                      transient_errors=(InjectedFaultError,))
+        self.repository = CircuitBreakerProductAdapter(self.faults, self.breaker)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_healthy_database_keeps_circuit_closed(self):
+        self.assertIsNotNone(self.repository.get_product_by_id('prod_001'))
+        self.assertTrue(self.repository.get_available_products())
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_database_errors_are_wrapped(self):
+        self.faults.failure_rate = 1.0
+        with self.assertRaises(RepositoryUnavailableError):
+            self.repository.get_product_by_id('prod_001')
+
+    def test_failure_rate_opens_circuit_and_rejects_without_calling_database(self):
+        self.faults.failure_rate = 1.0
+        for _ in range(4):
+            with self.assertRaises(RepositoryUnavailableError):
+                self.repository.get_available_products()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        calls_before = self.faults.calls
+        with self.assertRaises(CircuitOpenError):
+            self.repository.get_product_by_id('prod_001')
+        self.assertEqual(self.faults.calls, calls_before)
+        self.assertEqual(self.breaker.stats()['rejected_calls'], 1)
+
+    def test_statement_timeout_counts_as_failure_and_returns_quickly(self):
+        self.faults.latency = 5.0
+        self.faults.timeout = 0.01
+        start = time.perf_counter()
+        for _ in range(4):
+            with self.assertRaises(RepositoryUnavailableError):
+                self.repository.get_product_by_id('prod_001')
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_half_open_trial_closes_circuit_after_recovery(self):
+        self.faults.failure_rate = 1.0
+        for _ in range(4):
+            with self.assertRaises(RepositoryUnavailableError):
+                self.repository.get_available_products()
+
+        self.clock.advance(15)
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.faults.failure_rate = 0.0
+        self.assertIsNotNone(self.repository.get_product_by_id('prod_001'))
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_half_open_trial_reopens_circuit(self):
+        self.faults.failure_rate = 1.0
+        for _ in range(4):
+            with self.assertRaises(RepositoryUnavailableError):
+                self.repository.get_available_products()
+
+        self.clock.advance(15)
+        with self.assertRaises(RepositoryUnavailableError):
+            self.repository.get_product_by_id('prod_001')
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.stats()['times_opened'], 2)
+
+    def test_non_transient_errors_propagate_and_keep_circuit_closed(self):
+        def bad_update(*args, **kwargs):
+            raise ValueError('invalid input syntax for type numeric: "abc"')
+
+        for _ in range(6):
+            with self.assertRaises(ValueError):
+                self.breaker.call(bad_update)
+            with self.assertRaises(TypeError):
+                self.repository.update_product('prod_001')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.breaker.stats()['window_failures'], 0)
+
+    def test_non_transient_error_releases_half_open_trial(self):
+        self.faults.failure_rate = 1.0
+        for _ in range(4):
+            with self.assertRaises(RepositoryUnavailableError):
+                self.repository.get_available_products()
+        self.clock.advance(15)
+        self.faults.failure_rate = 0.0
+
+        with self.assertRaises(TypeError):
+            self.repository.update_product('prod_001')
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertIsNotNone(self.repository.get_product_by_id('prod_001'))
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_intermittent_failures_below_threshold_keep_circuit_closed(self):
+        outcomes = iter([True, False, True, True, False, True, True, True])
+        for ok in outcomes:
+            self.faults.failure_rate = 0.0 if ok else 1.0
+            try:
+                self.repository.get_product_by_id('prod_001')
+            except RepositoryUnavailableError:
+                pass
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Pruebas del índice bitmap de facetas (services/products/services/facet_index.py):
+máscaras por faceta, conteos disyuntivos y cambios incrementales de productos.
+"""
+
+import os
+import sys
+import unittest
+
+# Agregar el directorio del servicio al path (antes que el paquete `services` de este directorio)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services', 'products'))
+
+from domain.models import CatalogEntry  # noqa: E402
+from services.facet_index import FacetIndex  # noqa: E402
+
+CATALOG = [
+    CatalogEntry('p1', 'Monitores', 'prov_a', 'UCI', ('USA', 'CAN')),
+    CatalogEntry('p2', 'Monitores', 'prov_b', 'UCI', ('USA',)),
+    CatalogEntry('p3', 'Suturas', 'prov_a', 'Cirugía', ('MEX',)),
+    CatalogEntry('p4', 'Suturas', 'prov_b', 'Cirugía', ()),  # sin stock: nunca aparece
+]
+
+
+class TestFacetIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FacetIndex()
+        self.index.build(CATALOG)
+
+    def test_matching_ids_or_within_facet_and_across_facets(self):
+        self.assertEqual(self.index.matching_ids({}), {'p1', 'p2', 'p3'})
+        self.assertEqual(self.index.matching_ids({'category': ['Suturas']}), {'p3'})
+        self.assertEqual(self.index.matching_ids({'country': ['CAN', 'MEX']}), {'p1', 'p3'})
+        self.assertEqual(self.index.matching_ids({'provider': ['prov_a'], 'country': ['USA']}), {'p1'})
+        self.assertEqual(self.index.matching_ids({'category': ['Desconocida']}), set())
+
+    def test_counts_ignore_the_facets_own_filter(self):
+        counts = self.index.counts({'category': ['Monitores'], 'provider': ['prov_b']})
+        self.assertEqual(counts['total'], 1)
+        # Categoría: solo filtra el proveedor (p2 Monitores; p4 no tiene stock)
+        self.assertEqual(counts['facets']['category'], {'Monitores': 1})
+        # Proveedor: solo filtra la categoría
+        self.assertEqual(counts['facets']['provider'], {'prov_a': 1, 'prov_b': 1})
+        self.assertEqual(counts['facets']['country'], {'USA': 1})
+
+    def test_counts_without_filters(self):
+        counts = self.index.counts({})
+        self.assertEqual(counts['total'], 3)
+        self.assertEqual(counts['facets']['country'], {'CAN': 1, 'MEX': 1, 'USA': 2})
+        self.assertEqual(counts['facets']['objective_profile'], {'Cirugía': 1, 'UCI': 2})
+
+    def test_upsert_moves_bits_of_a_changed_product(self):
+        self.index.upsert(CatalogEntry('p1', 'Suturas', 'prov_a', 'Cirugía', ('MEX',)))
+        self.assertEqual(self.index.matching_ids({'category': ['Suturas']}), {'p1', 'p3'})
+        self.assertEqual(self.index.counts({})['facets']['country'], {'MEX': 2, 'USA': 1})
+        self.assertNotIn('CAN', self.index.counts({})['facets']['country'])
+
+    def test_upsert_of_stock_changes_and_new_products(self):
+        self.index.upsert(CatalogEntry('p2', 'Monitores', 'prov_b', 'UCI', ()))  # se agotó
+        self.index.upsert(CatalogEntry('p4', 'Suturas', 'prov_b', 'Cirugía', ('USA',)))  # repuso stock
+        self.index.upsert(CatalogEntry('p5', 'Guantes', 'prov_c', 'General', ('CAN',)))  # alta
+        self.assertEqual(self.index.matching_ids({}), {'p1', 'p3', 'p4', 'p5'})
+        self.assertEqual(self.index.matching_ids({'provider': ['prov_b']}), {'p4'})
+        self.assertEqual(self.index.counts({'country': ['CAN']})['facets']['category'],
+                         {'Guantes': 1, 'Monitores': 1})
+
+    def test_build_replaces_previous_state(self):
+        self.index.build(CATALOG[2:])
+        self.assertEqual(self.index.matching_ids({}), {'p3'})
+        self.assertEqual(self.index.counts({})['facets']['provider'], {'prov_a': 1})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Pruebas del ProductLoader (lotes y memo por petición) de ProductService.
+"""
+
+import os
+import sys
+import unittest
+
+# Agregar el directorio del servicio al path (antes que el paquete `services` de este directorio)
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services', 'products')
+sys.path.insert(0, SERVICE_DIR)
+
+from domain.models import Product  # noqa: E402
+from services.product_loader import ProductLoader  # noqa: E402
+from services.product_service import ProductService  # noqa: E402
+
+CATALOG = {f'prod_{i:03d}': Product(f'prod_{i:03d}', f'SKU-{i:03d}', float(i), 'MEDICATION', i)
+           for i in range(1, 6)}
+
+
+class RecordingRepository:
+    """Repositorio mínimo que registra cada lote pedido."""
+
+    def __init__(self):
+        self.batches = []
+
+    def get_products_by_ids(self, product_ids):
+        self.batches.append(list(product_ids))
+        return {pid: CATALOG[pid] for pid in product_ids if pid in CATALOG}
+
+    def get_product_by_id(self, product_id):
+        self.batches.append([product_id])
+        return CATALOG.get(product_id)
+
+
+class TestProductLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.repository = RecordingRepository()
+        self.loader = ProductLoader(self.repository.get_products_by_ids)
+
+    def test_deferred_loads_are_deduplicated_into_one_batch(self):
+        pending = [self.loader.defer(pid) for pid in ('prod_001', 'prod_002', 'prod_001', 'nope')]
+        self.assertEqual(self.repository.batches, [])
+        self.assertEqual(pending[0].value, CATALOG['prod_001'])
+        self.assertIsNone(pending[3].value)
+        self.assertEqual(self.repository.batches, [['prod_001', 'prod_002', 'nope']])
+
+    def test_memo_makes_repeated_lookups_free(self):
+        self.loader.load_many(['prod_001', 'nope'])
+        self.assertEqual(self.loader.load('prod_001'), CATALOG['prod_001'])
+        self.assertIsNone(self.loader.load('nope'))
+        self.assertEqual(len(self.repository.batches), 1)
+
+    def test_load_many_only_fetches_unmemoized_ids(self):
+        self.loader.load('prod_001')
+        products = self.loader.load_many(['prod_001', 'prod_002', 'prod_003'])
+        self.assertEqual(sorted(products), ['prod_001', 'prod_002', 'prod_003'])
+        self.assertEqual(self.repository.batches[-1], ['prod_002', 'prod_003'])
+
+    def test_large_requests_are_split_by_max_batch_size(self):
+        loader = ProductLoader(self.repository.get_products_by_ids, max_batch_size=2)
+        loader.load_many(list(CATALOG))
+        self.assertEqual([len(batch) for batch in self.repository.batches], [2, 2, 1])
+
+    def test_service_uses_loader_only_inside_a_request(self):
+        service = ProductService(self.repository)
+        service.get_product_by_id('prod_001')
+        service.begin_request()
+        try:
+            service.get_product_by_id('prod_002')
+            service.get_product_by_id('prod_002')
+            service.get_products_by_ids(['prod_002', 'prod_003'])
+        finally:
+            service.end_request()
+        self.assertEqual(self.repository.batches, [['prod_001'], ['prod_002'], ['prod_003']])
+        self.assertIsNone(ProductService.loader())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
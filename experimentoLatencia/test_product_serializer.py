@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Pruebas de los serializadores de productos (services/products/serializers): el encoder
+propio debe producir exactamente los mismos bytes que orjson y siempre JSON válido.
+"""
+
+import json
+import os
+import sys
+import unittest
+from decimal import Decimal
+
+# Agregar el directorio del servicio al path (antes que el paquete `services` de este directorio)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services', 'products'))
+
+from domain.models import Product  # noqa: E402
+from serializers.product_serializer import NativeProductSerializer, OrjsonProductSerializer, orjson  # noqa: E402
+
+PRODUCTS = [
+    Product('prod_001', 'SKU-MED-001', 12.5, 'Medicamentos', 40),
+    Product('prod_002', 'SKU-MED-002', Decimal('1999.99'), 'Medicamentos', Decimal('7')),
+    Product('prod_003', 'SKU-SUR-003', 0.1 + 0.2, 'Cirugía "mayor"', 0),
+    Product('prod_004', 'SKU-SUR-004', 1e-7, 'Ñandú \\ línea\nnueva', 2 ** 40),
+    Product('prod_005', 'SKU-SUR-005', None, None, None),
+    Product('prod_006', 'SKU-NAN-006', float('nan'), 'Otros', 1),
+    Product('prod_007', 'SKU-INF-007', float('inf'), 'Otros', 1),
+    Product('prod_008', 'SKU-INF-008', float('-inf'), 'Otros', 1),
+    Product('prod_009', 'SKU-NAN-009', Decimal('NaN'), 'Otros', 1),
+    Product('prod_010', 'SKU-INT-010', 3, 'Otros', 1),
+    Product('prod_011', 'SKU-EMO-011', 1.0, 'Equipos 🩺', 1),
+    Product('prod_012', 'SKU-EXP-012', 1.5e300, 'Otros', 1),
+]
+
+
+def strict_loads(data):
+    """json.loads que rechaza NaN/Infinity (no son JSON válido)."""
+    def reject(constant):
+        raise ValueError(f'Invalid JSON constant: {constant}')
+    return json.loads(data, parse_constant=reject)
+
+
+class TestNativeProductSerializer(unittest.TestCase):
+
+    def setUp(self):
+        self.native = NativeProductSerializer()
+
+    def test_non_finite_values_are_null(self):
+        for product in PRODUCTS[5:9]:
+            with self.subTest(value=product.value):
+                self.assertIsNone(strict_loads(self.native.dumps_product(product))['value'])
+
+    def test_output_is_valid_json_with_normalized_types(self):
+        decoded = strict_loads(self.native.dumps_products(PRODUCTS))
+        self.assertEqual(len(decoded), len(PRODUCTS))
+        self.assertEqual(decoded[1], {'category_name': 'Medicamentos', 'product_id': 'prod_002',
+                                      'sku': 'SKU-MED-002', 'total_quantity': 7, 'value': 1999.99})
+        self.assertEqual(decoded[3]['category_name'], 'Ñandú \\ línea\nnueva')
+        self.assertEqual(decoded[9]['value'], 3.0)
+        self.assertEqual(self.native.dumps_products([]), b'[]')
+
+
+@unittest.skipIf(orjson is None, 'orjson no está instalado')
+class TestSerializerParity(unittest.TestCase):
+
+    def setUp(self):
+        self.native = NativeProductSerializer()
+        self.orjson = OrjsonProductSerializer()
+
+    def test_same_values_as_orjson(self):
+        self.assertEqual(strict_loads(self.native.dumps_products(PRODUCTS)),
+                         strict_loads(self.orjson.dumps_products(PRODUCTS)))
+
+    def test_same_bytes_as_orjson_for_ascii_products(self):
+        # Diferencias esperadas, mismo valor: el encoder propio escapa a ASCII como jsonify
+        # (orjson emite UTF-8) y repr escribe el exponente como 'e-07'/'e+300' (orjson 'e-7'/'e300')
+        for product in PRODUCTS:
+            if not str(product.category_name).isascii() or 'e' in repr(product.value):
+                continue
+            with self.subTest(product=product.product_id):
+                self.assertEqual(self.native.dumps_product(product), self.orjson.dumps_product(product))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
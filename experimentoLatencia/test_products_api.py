@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la API de productos (services/products/app.py) con el test client de Flask:
+adaptador SQLite sobre una copia temporal de healthcare_products.db y caché en memoria,
+igual que experiment/offline_benchmark.py. La app se configura al importarse, así que
+se importa una sola vez para todo el módulo.
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Agregar el directorio del servicio al path (antes que el paquete `services` de este directorio)
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services', 'products')
+sys.path.insert(0, SERVICE_DIR)
+
+TMP_DIR = tempfile.mkdtemp()
+DEBUG_TOKEN = 'test-debug-token'
+METRICS_TOKEN = 'test-metrics-token'
+products_app = None
+
+
+def setUpModule():
+    global products_app
+    db_path = os.path.join(TMP_DIR, 'products.db')
+    shutil.copy(os.path.join(SERVICE_DIR, 'healthcare_products.db'), db_path)
+    os.environ.update({
+        'PRODUCTS_ADAPTER': 'sqlite',
+        'SQLITE_DB_PATH': db_path,
+        'CACHE_TYPE': 'SimpleCache',
+        'REPOSITORY_CACHE_BACKEND': 'memory',
+        'PRODUCT_FILTER_REFRESH_SECONDS': '0',
+        'WARMUP_ENABLED': 'false',
+        'PROFILE_DIR': os.path.join(TMP_DIR, 'profiles'),
+        'DEBUG_TOKEN': DEBUG_TOKEN,
+        'METRICS_TOKEN': METRICS_TOKEN,
+    })
+    # Otros módulos de prueba ya importaron config/adaptadores con la configuración por defecto
+    for name, module in list(sys.modules.items()):
+        if (getattr(module, '__file__', None) or '').startswith(SERVICE_DIR):
+            del sys.modules[name]
+    import app
+    products_app = app
+
+
+def tearDownModule():
+    shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+class ApiTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.client = products_app.app.test_client()
+        products_app.cache.clear()
+
+
+class TestUpdateProduct(ApiTestCase):
+
+    def test_update_of_unknown_id_is_404_and_not_added_to_bloom_filter(self):
+        bloom = products_app._product_filter_state['bloom']
+        items = bloom.count
+        response = self.client.put('/products/update/prod_does_not_exist', json={'price': 10, 'stock': 5})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(bloom.count, items)
+        self.assertNotIn('prod_does_not_exist', bloom)
+
+    def test_update_of_existing_product(self):
+        response = self.client.put('/products/update/prod_001', json={'price': 12.5, 'stock': 40})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/products/prod_001').get_json()['value'], 12.5)
+
+
+class TestAvailabilityScope(ApiTestCase):
+
+    def available(self, **query):
+        response = self.client.get('/products/available', query_string=query)
+        self.assertEqual(response.status_code, 200)
+        return {product['product_id'] for product in response.get_json()}
+
+    def db_ids(self, where, params):
+        conn = sqlite3.connect(os.environ['SQLITE_DB_PATH'])
+        try:
+            return {row[0] for row in conn.execute(
+                f"SELECT DISTINCT product_id FROM ProductStock WHERE quantity > 0 AND {where}", params)}
+        finally:
+            conn.close()
+
+    def test_scoped_listings_match_the_database(self):
+        self.assertEqual(self.available(country='usa'), self.db_ids('country = ?', ('USA',)))
+        self.assertEqual(self.available(warehouse=' w-002 '), self.db_ids('warehouse_id = ?', ('W-002',)))
+        self.assertEqual(self.available(country='USA', warehouse='W-002'), set())
+        self.assertEqual(self.available(), self.db_ids('1 = 1', ()))
+
+    def test_scoped_listings_use_their_own_cache_key(self):
+        self.available(country='USA')
+        self.assertIsNotNone(products_app.cache.get('products:country=USA:warehouse=*'))
+        self.assertIsNone(products_app.cache.get('products'))
+
+    def test_multiple_countries_are_rejected_in_listing_and_facets(self):
+        for path in ('/products/available', '/products/facets'):
+            for query in ('country=USA,CAN', 'country=USA&country=CAN'):
+                with self.subTest(path=path, query=query):
+                    self.assertEqual(self.client.get(f'{path}?{query}').status_code, 400)
+        self.assertEqual(self.client.get('/products/available?warehouse=W-001,W-002').status_code, 400)
+        self.assertEqual(self.client.get('/products/facets?country=usa').status_code, 200)
+
+    def test_update_rejects_non_string_warehouse(self):
+        for body in ({'price': 10, 'stock': 5, 'warehouse_id': 5}, {'price': 10, 'stock': 5, 'warehouse_id': ['W-001']},
+                     ['price', 'stock']):
+            with self.subTest(body=body):
+                self.assertEqual(self.client.put('/products/update/prod_001', json=body).status_code, 400)
+        self.assertEqual(self.client.put('/products/update/prod_001', data='{', content_type='application/json')
+                         .status_code, 400)
+
+
+class TestWarmup(ApiTestCase):
+
+    def test_country_tasks_come_from_stock_without_building_the_facet_index(self):
+        products_app.facet_index.build([])
+        products_app._facet_state['version'] = -1
+        names = [name for name, _ in products_app.warmup_tasks()]
+        self.assertEqual(names[:4], ['available', 'available:CAN', 'available:MEX', 'available:USA'])
+        self.assertEqual(products_app._facet_state['version'], -1)
+
+    def test_country_task_warms_the_scoped_listing(self):
+        tasks = dict(products_app.warmup_tasks())
+        self.assertEqual(tasks['available:USA'](), 1)
+        self.assertEqual(self.client.get('/products/available?country=USA').headers['X-Cache'], 'HIT')
+
+
+class TestFacets(ApiTestCase):
+
+    def test_unbuilt_index_is_built_on_first_facet_request(self):
+        # Estado de un worker cuyo hilo de fondo aún no construyó (o no pudo construir) el índice
+        products_app.facet_index.build([])
+        products_app._facet_state['version'] = -1
+        counts = self.client.get('/products/facets').get_json()
+        self.assertEqual(counts['total'], len(self.client.get('/products/available').get_json()))
+        self.assertEqual(set(counts['facets']['country']), {'USA', 'CAN', 'MEX'})
+        self.assertGreaterEqual(products_app._facet_state['version'], 0)
+
+
+class TestDebugEndpoints(ApiTestCase):
+
+    def debug(self, method, path, **kwargs):
+        return getattr(self.client, method)(path, headers={'X-Debug-Token': DEBUG_TOKEN}, **kwargs)
+
+    def test_debug_endpoints_hidden_without_token(self):
+        self.assertEqual(self.client.get('/debug/profile').status_code, 404)
+        self.assertEqual(self.client.post('/debug/tracemalloc', json={'action': 'stop'}).status_code, 404)
+
+    def test_metrics_require_their_own_token(self):
+        bearer = {'Authorization': f'Bearer {METRICS_TOKEN}'}
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+        self.assertEqual(self.client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code, 404)
+        self.assertEqual(self.client.get('/metrics', headers={'Authorization': METRICS_TOKEN}).status_code, 404)
+        self.assertEqual(self.debug('get', '/metrics').status_code, 404)
+        response = self.client.get('/metrics', headers=bearer)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'products_', response.data)
+        # La credencial del scraper no habilita /debug
+        self.assertEqual(self.client.get('/debug/profile', headers=bearer).status_code, 404)
+        self.assertEqual(self.client.get('/debug/profile', headers={'X-Debug-Token': METRICS_TOKEN}).status_code, 404)
+
+    def test_profile_route_must_be_a_known_slug(self):
+        for route in ('*', '../products', 'products_*'):
+            with self.subTest(route=route):
+                self.assertEqual(self.debug('get', '/debug/profile', query_string={'route': route}).status_code, 400)
+                self.assertEqual(self.debug('get', '/debug/profile/pstats',
+                                            query_string={'route': route}).status_code, 400)
+        self.assertEqual(self.debug('get', '/debug/profile', query_string={'route': 'products_available'})
+                         .status_code, 200)
+        self.assertEqual(self.debug('get', '/debug/profile/pstats', query_string={'route': 'products_available',
+                                                                                 'sort': 'bogus'}).status_code, 400)
+        self.assertEqual(self.debug('get', '/debug/profile/pstats', query_string={'route': 'products_available'})
+                         .status_code, 404)
+
+    def test_tracemalloc_validates_top_and_prunes_snapshots(self):
+        self.assertEqual(self.debug('post', '/debug/tracemalloc', json={'action': 'snapshot', 'top': 'x'})
+                         .status_code, 400)
+        self.debug('post', '/debug/tracemalloc', json={'action': 'start'})
+        try:
+            for _ in range(products_app.memory_tracker.keep + 3):
+                response = self.debug('post', '/debug/tracemalloc', json={'action': 'snapshot', 'top': 3})
+                self.assertEqual(response.status_code, 200)
+        finally:
+            self.debug('post', '/debug/tracemalloc', json={'action': 'stop'})
+        snapshots = [name for name in os.listdir(products_app.PROFILE_DIR)
+                     if name.startswith(f'tracemalloc.{os.getpid()}.')]
+        self.assertEqual(len(snapshots), products_app.memory_tracker.keep)
+        self.assertIn(f"tracemalloc.{os.getpid()}.{response.get_json()['snapshot']}.snapshot", snapshots)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Pruebas de los índices de búsqueda en proceso (adapters/search_index.py) y de
+SQLiteProductAdapter (search_products y manejo de conexiones) sobre una copia temporal
+de healthcare_products.db.
+"""
+
+import importlib.util
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Agregar el directorio del servicio al path (antes que el paquete `services` de este directorio)
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services', 'products')
+sys.path.insert(0, SERVICE_DIR)
+
+from adapters.search_index import SkuPrefixIndex, TrigramIndex, normalize_search_query, trigrams  # noqa: E402
+from adapters.sqlite_adapter import SQLiteProductAdapter  # noqa: E402
+
+
+class TestSkuPrefixIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SkuPrefixIndex([('sku-med-002', 'p2'), ('SKU-MED-001', 'p1'), ('SKU-SUR-003', 'p3'),
+                                     ('SKU-MEDX-004', 'p4')])
+
+    def test_prefix_search_is_case_insensitive_and_ordered_by_sku(self):
+        self.assertEqual(self.index.search('sku-med', 10), ['p1', 'p2', 'p4'])
+        self.assertEqual(self.index.search('SKU-MED-', 10), ['p1', 'p2'])
+        self.assertEqual(self.index.search('SKU-MED', 2), ['p1', 'p2'])
+        self.assertEqual(self.index.search('SKU-ZZZ', 10), [])
+
+    def test_upsert_and_discard_keep_order(self):
+        self.index.upsert('SKU-MED-000', 'p0')
+        self.index.upsert('SKU-SUR-001', 'p1')  # cambio de SKU: sale del prefijo MED
+        self.index.discard('p2')
+        self.index.discard('unknown')
+        self.assertEqual(self.index.search('SKU-MED', 10), ['p0', 'p4'])
+        self.assertEqual(self.index.search('SKU-SUR', 10), ['p1', 'p3'])
+        self.assertEqual(len(self.index), 4)
+
+
+class TestTrigramIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TrigramIndex([('p1', 'Monitor de signos vitales'), ('p2', 'Suturas reabsorbibles'),
+                                   ('p3', 'Monitor fetal')], threshold=0.6)
+
+    def test_trigrams_use_pg_trgm_padding(self):
+        self.assertEqual(trigrams('ab'), {'  a', ' ab', 'ab '})
+        self.assertEqual(normalize_search_query('  MONITOR   Vital '), 'monitor vital')
+
+    def test_fuzzy_search_ranks_by_shared_trigrams(self):
+        results = self.index.search('monitr signos', 10)
+        self.assertEqual(results[0][0], 'p1')
+        self.assertNotIn('p2', [pid for pid, _ in results])
+        self.assertEqual([pid for pid, _ in self.index.search('sutura', 10)], ['p2'])
+        self.assertEqual(self.index.search('zzzz', 10), [])
+        self.assertEqual(self.index.search('', 10), [])
+
+    def test_limit_and_threshold(self):
+        self.assertEqual(len(self.index.search('monitor', 1)), 1)
+        strict = TrigramIndex([('p1', 'Monitor de signos vitales')], threshold=1.0)
+        self.assertEqual(strict.search('monitor signos', 10), [('p1', 1.0)])
+        self.assertEqual(strict.search('monitr', 10), [])
+
+    def test_upsert_and_discard(self):
+        self.index.upsert('p2', 'Monitor portátil')
+        self.index.discard('p3')
+        self.assertEqual(sorted(pid for pid, _ in self.index.search('monitor', 10)), ['p1', 'p2'])
+        self.assertEqual(self.index.search('suturas', 10), [])
+        self.assertEqual(len(self.index), 2)
+
+
+class TestSQLiteSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp, 'products.db')
+        shutil.copy(os.path.join(SERVICE_DIR, 'healthcare_products.db'), self.db_path)
+        self.adapter = SQLiteProductAdapter(db_path=self.db_path)
+        self.med_ids = [product.product_id for product in self.adapter.search_products('SKU-MED', 100)]
+
+    def tearDown(self):
+        self.adapter.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def execute(self, statement, params=()):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(statement, params)
+        conn.commit()
+        conn.close()
+
+    def test_out_of_stock_matches_do_not_shrink_results(self):
+        self.assertGreater(len(self.med_ids), 8)
+        for product_id in self.med_ids[:5]:
+            self.execute("UPDATE ProductStock SET quantity = 0 WHERE product_id = ?", (product_id,))
+        results = [product.product_id for product in self.adapter.search_products('SKU-MED', 3)]
+        self.assertEqual(results, self.med_ids[5:8])
+
+    def test_search_stops_when_indexes_are_exhausted(self):
+        self.assertEqual(len(self.adapter.search_products('SKU-MED', 1000)), len(self.med_ids))
+
+    def test_own_writes_update_indexes_in_place(self):
+        self.execute("UPDATE Product SET sku = 'SKU-ZZZ-001' WHERE product_id = ?", (self.med_ids[0],))
+        self.assertEqual(self.adapter.search_products('SKU-ZZZ', 5), [])
+        self.adapter.update_product(self.med_ids[0], price=9.5, stock=10, warehouse_id='W-001')
+        [found] = self.adapter.search_products('SKU-ZZZ', 5)
+        self.assertEqual((found.product_id, found.value), (self.med_ids[0], 9.5))
+
+    def test_rows_inserted_elsewhere_appear_after_refresh(self):
+        self.execute("INSERT INTO Product SELECT 'prod_new', 'SKU-NEW-001', 10, provider_id, category_id, "
+                     "'Producto nuevo' FROM Product WHERE product_id = 'prod_001'")
+        self.execute("INSERT INTO ProductStock VALUES ('stock_new', 'prod_new', 5, 'L-1', 'W-001', 'USA')")
+        self.assertEqual(self.adapter.search_products('SKU-NEW', 5), [])
+        self.adapter._search_built_at -= 10 ** 6  # índice más viejo que SEARCH_INDEX_REFRESH_SECONDS
+        self.assertEqual([product.product_id for product in self.adapter.search_products('SKU-NEW', 5)],
+                         ['prod_new'])
+
+
+class TestSearchSimilarityThreshold(unittest.TestCase):
+    """Ambos adaptadores aplican SEARCH_MIN_SIMILARITY (o el umbral recibido) a la búsqueda difusa."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp, 'products.db')
+        shutil.copy(os.path.join(SERVICE_DIR, 'healthcare_products.db'), self.db_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_sqlite_threshold(self):
+        def found(threshold):
+            adapter = SQLiteProductAdapter(db_path=self.db_path, min_similarity=threshold)
+            return [product.product_id for product in adapter.search_products('agujas biopsya', 10)]
+
+        self.assertEqual(len(found(0.3)), 2)
+        self.assertEqual(len(found(0.6)), 1)
+        self.assertEqual(found(1.0), [])
+
+    @unittest.skipIf(importlib.util.find_spec('psycopg2') is None, 'psycopg2 no está instalado')
+    def test_postgres_threshold_is_set_for_the_search_transaction(self):
+        from adapters.sql_adapter import PostgreSQLProductAdapter
+
+        statements = []
+
+        class RecordingCursor:
+            rowcount = 0
+
+            def execute(self, query, params=None):
+                statements.append((query, params))
+
+            def fetchall(self):
+                return []
+
+            def close(self):
+                pass
+
+        class RecordingConnection:
+            def cursor(self, **kwargs):
+                return RecordingCursor()
+
+            def close(self):
+                pass
+
+        adapter = PostgreSQLProductAdapter(min_similarity=0.45)
+        adapter._connect = RecordingConnection
+        self.assertEqual(adapter.search_products('monitr', 5), [])
+        (set_query, set_params), (search_query, _) = statements
+        self.assertIn("set_config('pg_trgm.word_similarity_threshold', %s, true)", set_query)
+        self.assertEqual(set_params, ('0.45',))
+        self.assertIn('<%% p.objective_profile', search_query)
+
+
+class TestSQLiteConnections(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp, 'products.db')
+        shutil.copy(os.path.join(SERVICE_DIR, 'healthcare_products.db'), self.db_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def tracked(self, adapter):
+        opened = []
+        connect = adapter._connect
+        adapter._connect = lambda: opened.append(connect()) or opened[-1]
+        return opened
+
+    def assertClosed(self, conn):
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_per_call_connections_are_closed(self):
+        adapter = SQLiteProductAdapter(db_path=self.db_path, persistent=False)
+        opened = self.tracked(adapter)
+        adapter.get_product_by_id('prod_001')
+        adapter.get_available_products(country='USA')
+        adapter.update_product('prod_001', price=9.5, stock=10, warehouse_id='W-001')
+        adapter.search_products('SKU-MED', 3)
+        with self.assertRaises(sqlite3.ProgrammingError):  # también se cierra si la llamada falla
+            adapter.update_product('prod_001', price=9.5, stock=10, warehouse_id=object())
+        self.assertGreaterEqual(len(opened), 5)
+        for conn in opened:
+            self.assertClosed(conn)
+
+    def test_persistent_connection_is_reused_until_close(self):
+        adapter = SQLiteProductAdapter(db_path=self.db_path)
+        opened = self.tracked(adapter)
+        adapter.get_product_by_id('prod_001')
+        adapter.get_available_products()
+        self.assertEqual(len(opened), 1)
+        opened[0].execute("SELECT 1")
+        adapter.close()
+        self.assertClosed(opened[0])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
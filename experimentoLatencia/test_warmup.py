@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Pruebas del calentamiento de caché (services/products/warmup.py): ranking de productos
+consultados y CacheWarmer (presupuesto, tareas omitidas, espera al lock de otro worker
+y liberación del lock solo con el token propio). La caché compartida es SimpleCache de
+cachelib, que implementa la misma interfaz get/set/add/delete que Flask-Caching.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+from cachelib import SimpleCache
+
+# Agregar el directorio del servicio al path (antes que el paquete `services` de este directorio)
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, 'services', 'products'))
+sys.path.append(HERE)
+
+from fake_clock import FakeClock  # noqa: E402
+from warmup import CacheWarmer, HotProductCounter  # noqa: E402
+
+HOT_KEY = 'warmup:hot-products'
+LOCK_KEY = 'warmup:lock'
+
+
+class UnavailableCache(SimpleCache):
+    """Caché que falla al escribir (Redis caído)."""
+
+    def set(self, key, value, timeout=None):
+        raise ConnectionError('redis down')
+
+
+class TestHotProductCounter(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = SimpleCache()
+        self.clock = FakeClock()
+        self.counter = HotProductCounter(self.cache, HOT_KEY, flush_interval=30, max_tracked=3, clock=self.clock)
+
+    def test_pending_counts_are_ranked_before_flush(self):
+        for product_id in ('p1', 'p2', 'p2', 'p3', 'p3', 'p3'):
+            self.counter.record(product_id)
+        self.assertIsNone(self.cache.get(HOT_KEY))
+        self.assertEqual(self.counter.top(2), ['p3', 'p2'])
+
+    def test_flush_after_interval_merges_workers_and_keeps_top(self):
+        other = HotProductCounter(self.cache, HOT_KEY, flush_interval=30, max_tracked=3, clock=self.clock)
+        self.counter.record('p1')
+        self.counter.record('p2')
+        self.clock.now += 30
+        self.counter.record('p2')  # vence el intervalo: se persiste
+        self.assertEqual(self.cache.get(HOT_KEY), {'p1': 1, 'p2': 2})
+        for product_id in ('p3', 'p3', 'p3', 'p4', 'p4', 'p1', 'p1'):
+            other.record(product_id)
+        other.flush()
+        self.assertEqual(self.cache.get(HOT_KEY), {'p1': 3, 'p3': 3, 'p2': 2})
+        self.assertEqual(self.counter.top(10)[:2], ['p1', 'p3'])
+
+    def test_flush_failure_is_not_raised(self):
+        counter = HotProductCounter(UnavailableCache(), HOT_KEY, clock=self.clock)
+        counter.record('p1')
+        counter.flush()
+        self.assertEqual(counter.top(5), [])  # lo pendiente se descartó, el servicio sigue
+
+
+class TestCacheWarmer(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = SimpleCache()
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def warmer(self, budget=2.0, concurrency=2):
+        return CacheWarmer(self.cache, LOCK_KEY, budget=budget, concurrency=concurrency, poll_interval=0.01)
+
+    def blocking_task(self):
+        self.release.wait(5)
+        return 1
+
+    def test_runs_tasks_and_releases_lock(self):
+        warmer = self.warmer()
+        state = warmer.run([('a', lambda: 2), ('b', lambda: 3), ('c', lambda: 1 / 0)])
+        self.assertEqual((state['status'], state['keys'], state['completed'], state['failed']), ('done', 5, 2, 1))
+        self.assertTrue(warmer.ready)
+        self.assertIsNone(self.cache.get(LOCK_KEY))
+
+    def test_budget_cancels_tasks_that_did_not_start(self):
+        warmer = self.warmer(budget=0.1, concurrency=1)
+        started = time.monotonic()
+        state = warmer.run([('slow', self.blocking_task), ('a', lambda: 1), ('b', lambda: 1)])
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual((state['status'], state['pending'], state['skipped'], state['completed']),
+                         ('timeout', 1, 2, 0))
+        self.assertTrue(warmer.ready)
+
+    def test_waits_for_the_worker_holding_the_lock(self):
+        self.cache.add(LOCK_KEY, 'other-worker', timeout=10)
+        threading.Timer(0.05, self.cache.delete, args=(LOCK_KEY,)).start()
+        ran = []
+        state = self.warmer().run([('a', lambda: ran.append(1) or 1)])
+        self.assertEqual(state['status'], 'done-by-other-worker')
+        self.assertEqual(ran, [])
+
+    def test_lock_wait_is_bounded_by_budget(self):
+        self.cache.add(LOCK_KEY, 'other-worker', timeout=10)
+        warmer = self.warmer(budget=0.05)
+        self.assertEqual(warmer.run([('a', lambda: 1)])['status'], 'timeout')
+        self.assertTrue(warmer.ready)
+        self.assertEqual(self.cache.get(LOCK_KEY), 'other-worker')
+
+    def test_does_not_delete_a_lock_taken_by_another_worker(self):
+        def lock_expires_and_is_taken():
+            # El lock propio venció y otro worker lo adquirió mientras esta ejecución seguía
+            self.cache.set(LOCK_KEY, 'other-worker', timeout=10)
+            return 1
+
+        state = self.warmer().run([('a', lock_expires_and_is_taken)])
+        self.assertEqual(state['status'], 'done')
+        self.assertEqual(self.cache.get(LOCK_KEY), 'other-worker')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
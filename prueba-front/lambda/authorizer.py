@@ -5,28 +5,133 @@
 
 """
 
+import base64
 import json
 import os
 import logging
 from datetime import datetime
 
+import authz_log
+import geoip
+import jwt_verifier
+from policy_engine import PolicyEngine, api_arn_prefix, compile_policies, policy_statement
+from ttl_cache import TTLCache
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Logs JSON compactos: detalle muestreado por petición + un registro de decisión por petición
+LOG = authz_log.from_environment(logger)
+
+# Memoria entre invocaciones del mismo contenedor (acotada en tamaño y tiempo)
+AUTHZ_CACHE_MAX_ENTRIES = int(os.environ.get('AUTHZ_CACHE_MAX_ENTRIES', '10000'))
+GEO_CACHE = TTLCache(max_entries=AUTHZ_CACHE_MAX_ENTRIES,
+                     ttl=float(os.environ.get('GEO_CACHE_TTL_SECONDS', '3600')))
+WHITELIST_CACHE = TTLCache(max_entries=AUTHZ_CACHE_MAX_ENTRIES,
+                           ttl=float(os.environ.get('WHITELIST_CACHE_TTL_SECONDS', '300')))
+CACHE_STATS_LOG_EVERY = 100
+_invocations = 0
+
+
+def _load_geoip_database():
+    """Carga la base GeoIP local durante el cold start (None = usar el servicio remoto)."""
+    try:
+        database = geoip.load_default()
+    except Exception as e:
+        logger.error(f"Error loading local GeoIP database: {e}")
+        return None
+    if database is None:
+        logger.warning("Local GeoIP database not found, falling back to ip-api.com")
+    else:
+        logger.info(f"Local GeoIP database loaded: {database.stats()}")
+    return database
+
+
+GEOIP_DATABASE = _load_geoip_database()
+
+# Verificador JWT con JWKS en memoria (None si no hay JWKS_PATH / JWKS_URL / USER_POOL_ID)
+JWT_VERIFIER = jwt_verifier.from_environment()
+if JWT_VERIFIER is None:
+    logger.warning("No JWKS configured: JWT signatures are NOT verified")
+
+# Políticas de seguridad por grupo de MediSupply
+GROUP_POLICIES = {
+    'admin': {
+        'countries': ['CO', 'PE', 'EC', 'MX'],  # Todos los países
+        'hours': {'start': 0, 'end': 23},       # 24/7
+        'ip_whitelist': None,                   # Sin restricción IP
+        'description': 'Acceso completo 24/7',
+        'permissions': ['read_all', 'write_all', 'delete_all', 'audit_all'],
+        'apis': ['*']
+    },
+    'compras': {
+        'countries': ['CO', 'PE', 'EC', 'MX'],
+        'hours': {'start': 6, 'end': 22},       # Horario laboral
+        'ip_whitelist': ['10.0.0.0/8'],        # Solo red corporativa
+        'description': 'Horario laboral, red corporativa',
+        'permissions': ['read_purchases', 'write_purchases', 'manage_suppliers'],
+        'apis': ['/purchases/*', '/suppliers/*', '/products/*']
+    },
+    'logistica': {
+        'countries': ['CO', 'PE', 'EC', 'MX'],
+        'hours': {'start': 5, 'end': 23},       # Horario extendido
+        'ip_whitelist': None,
+        'description': 'Horario extendido para logística',
+        'permissions': ['read_logistics', 'write_inventory', 'manage_routes'],
+        'apis': ['/logistics/*', '/inventory/*', '/routes/*', '/vehicles/*']
+    },
+    'ventas': {
+        'countries': ['CO', 'PE', 'EC', 'MX'],
+        'hours': {'start': 5, 'end': 23},       # Horario extendido
+        'ip_whitelist': None,
+        'description': 'Horario extendido para ventas',
+        'permissions': ['read_sales', 'write_orders', 'manage_clients'],
+        'apis': ['/sales/*', '/clients/*', '/orders/*', '/visits/*']
+    },
+    'clientes': {
+        'countries': ['CO'],                    # Solo Colombia inicialmente
+        'hours': {'start': 6, 'end': 22},       # Horario comercial
+        'ip_whitelist': None,                   # Sin restricción IP
+        'description': 'Horario comercial, solo Colombia',
+        'permissions': ['read_products', 'create_orders', 'track_deliveries'],
+        'apis': ['/products/available', '/orders/create', '/deliveries/track']
+    }
+}
+
+# Con AUTHZ_ENFORCE_APIS=true solo autorizan los grupos cuyo `apis` cubre la ruta pedida
+ENFORCE_API_PATTERNS = os.environ.get('AUTHZ_ENFORCE_APIS', 'false').lower() == 'true'
+
+# Políticas que cubren toda la API (no solo el methodArn pedido): el resultado cacheado
+# por API Gateway (identity source = Authorization) sirve para todas las rutas del usuario
+WILDCARD_POLICIES = os.environ.get('AUTHZ_WILDCARD_POLICIES', 'true').lower() == 'true'
+
+# Compiladas una sola vez por contenedor (máscaras de horas, redes parseadas, rutas)
+POLICY_ENGINE = PolicyEngine(
+    compile_policies(GROUP_POLICIES),
+    resolve_country=lambda ip: get_country_from_ip(ip),
+    whitelist_cache=WHITELIST_CACHE,
+    enforce_apis=ENFORCE_API_PATTERNS,
+)
+
 def lambda_handler(event, context):
     """
     Definicion de Handler 
     """
+    global _invocations
+    _invocations += 1
+    LOG.begin(getattr(context, 'aws_request_id', None))
+    if _invocations % CACHE_STATS_LOG_EVERY == 0:
+        LOG.event('authz_cache_stats', geo_cache=GEO_CACHE.stats(), whitelist_cache=WHITELIST_CACHE.stats())
     try:
-        logger.info(f"Authorization request received: {event}")
+        LOG.debug("Authorization request received", event=event)
         
         # 1. Obtener método HTTP para logging
         http_method = event.get('httpMethod', '')
-        logger.info(f"Processing {http_method} request")
+        LOG.add(method=http_method, path=event.get('path'))
         
         # 2. Permitir peticiones OPTIONS (CORS preflight) sin autenticación
         if http_method == 'OPTIONS':
-            logger.info("Allowing OPTIONS request for CORS preflight")
+            LOG.add(reason='cors_preflight')
             return generate_policy_with_cors('cors-preflight', 'Allow', event['methodArn'])
         
         # 3. Obtener token del header Authorization (compatible con TOKEN y REQUEST authorizer)
@@ -40,7 +145,7 @@ def lambda_handler(event, context):
             token = headers.get('Authorization', '')
         
         if not token.startswith('Bearer '):
-            logger.warning("Missing or invalid Bearer token")
+            LOG.add(reason='Missing or invalid authorization header')
             return generate_policy('user', 'Deny', event['methodArn'])
         
         jwt_token = token[7:]  # Remover 'Bearer '
@@ -55,51 +160,71 @@ def lambda_handler(event, context):
         
         # Limpiar IP (tomar solo la primera si hay múltiples)
         user_ip = user_ip_raw.split(',')[0].strip() if user_ip_raw else None
-        logger.info(f"User IP: {user_ip}")
-        
-        # 4. Para la prueba E2E, simular verificación exitosa
-        # En producción real, aquí verificarías el token JWT
-        logger.info(f"Token received: {jwt_token[:20]}...")
+        LOG.add(ip=user_ip)
         
+        # 4. Con JWKS configurado (JWT_VERIFIER) se verifica la firma; sin él (pruebas E2E
+        # con tokens sin firmar) solo se decodifica el payload
         # 5. Validar formato del token JWT
         if len(jwt_token.split('.')) != 3:
-            logger.warning("Access DENIED - Invalid JWT format")
+            LOG.add(reason='Invalid JWT format')
             return generate_policy('test-user', 'Deny', event['methodArn'])
         
-        # 6. Decodificar JWT para obtener atributos reales
-        try:
-            import base64
-            import json
-            
-            # Decodificar payload del JWT (sin verificar firma)
-            payload_part = jwt_token.split('.')[1]
-            # Agregar padding si es necesario (Base64 URL-safe)
-            missing = (-len(payload_part)) % 4
-            if missing:
-                payload_part += '=' * missing
-            payload = json.loads(base64.urlsafe_b64decode(payload_part))
-            
-            logger.info(f"JWT payload decoded: {payload}")
+        # 6. Verificar / decodificar JWT para obtener atributos reales
+        if JWT_VERIFIER is not None:
+            try:
+                payload = JWT_VERIFIER.verify(jwt_token)
+            except jwt_verifier.InvalidTokenError as e:
+                LOG.add(reason=str(e))
+                return generate_policy('invalid-token', 'Deny', event['methodArn'])
+        else:
+            try:
+                # Decodificar payload del JWT (sin verificar firma)
+                payload_part = jwt_token.split('.')[1]
+                # Agregar padding si es necesario (Base64 URL-safe)
+                missing = (-len(payload_part)) % 4
+                if missing:
+                    payload_part += '=' * missing
+                payload = json.loads(base64.urlsafe_b64decode(payload_part))
+                
+            except Exception as e:
+                LOG.warning("Error decoding JWT: %s", e)
+                LOG.add(reason='JWT payload could not be decoded')
+                return generate_policy('test-user', 'Deny', event['methodArn'])
             
-        except Exception as e:
-            logger.warning(f"Error decoding JWT: {e}")
-            return generate_policy('test-user', 'Deny', event['methodArn'])
+        LOG.add(sub=payload.get('sub'), groups=payload.get('cognito:groups', []))
         
         # 7. Aplicar validaciones de seguridad con atributos reales
-        validation_result = perform_security_validations(payload, user_ip)
+        validation_result = perform_security_validations(payload, user_ip, request_path(event), event['methodArn'])
+        statements = validation_result.get('statements')
+        LOG.add(reason=validation_result['reason'])
         
         if validation_result['allowed']:
-            logger.info(f"Access ALLOWED - {validation_result['reason']}")
-            return generate_policy_with_cors(payload['sub'], 'Allow', event['methodArn'])
+            return generate_policy_with_cors(payload['sub'], 'Allow', event['methodArn'], statements)
         else:
-            logger.warning(f"Access DENIED - {validation_result['reason']}")
-            return generate_policy_with_cors(payload['sub'], 'Deny', event['methodArn'])
+            return generate_policy_with_cors(payload['sub'], 'Deny', event['methodArn'], statements)
             
     except Exception as e:
-        logger.error(f"Error in authorizer: {str(e)}")
+        LOG.error("Error in authorizer: %s", e)
+        LOG.add(reason='Internal error')
         return generate_policy('error-user', 'Deny', event['methodArn'])
 
-def perform_security_validations(payload, user_ip=None):
+def request_path(event):
+    """
+    Ruta pedida: `path` en REQUEST authorizers; en TOKEN authorizers se extrae del
+    methodArn (arn:aws:execute-api:region:cuenta:api/stage/MÉTODO/ruta).
+    """
+    if event.get('path'):
+        return event['path']
+    parts = event.get('methodArn', '').split(':', 5)[-1].split('/', 3)
+    return '/' + parts[3] if len(parts) == 4 else '/'
+
+def api_wide_denial(result, method_arn=None):
+    """Añade un Deny sobre toda la API a una denegación que no depende de la ruta."""
+    if WILDCARD_POLICIES and method_arn:
+        result['statements'] = [policy_statement('Deny', [f'{api_arn_prefix(method_arn)}/*'])]
+    return result
+
+def perform_security_validations(payload, user_ip=None, path=None, method_arn=None):
     """
     Valida acceso basado en grupos de Cognito con políticas de país/horario/IP
     """
@@ -108,23 +233,37 @@ def perform_security_validations(payload, user_ip=None):
     
     # 1. Validar ventana de acceso (mantenimiento)
     if current_hour == 4:
-        return {'allowed': False, 'reason': 'Maintenance window: 4:00-5:00 AM'}
+        return api_wide_denial({'allowed': False, 'reason': 'Maintenance window: 4:00-5:00 AM'}, method_arn)
     
     # 2. Obtener grupos de Cognito
     cognito_groups = payload.get('cognito:groups', [])
-    logger.info(f"Cognito groups: {cognito_groups}")
     
     # 3. Si no hay grupos, rechazar acceso
     if not cognito_groups:
-        logger.warning("Access DENIED - No valid groups found")
-        return {'allowed': False, 'reason': 'No valid groups found - access denied'}
+        return api_wide_denial({'allowed': False, 'reason': 'No valid groups found - access denied'}, method_arn)
     
     # 4. Validar acceso por grupos con políticas de seguridad
-    return validate_cognito_groups_access_with_policies(cognito_groups, current_hour, user_ip)
+    return validate_cognito_groups_access_with_policies(cognito_groups, current_hour, user_ip, path, method_arn)
 
 def get_country_from_ip(ip_address):
+    """
+    Obtiene el país de origen de una IP. Con la base GeoIP local es una búsqueda
+    binaria en memoria; sin ella se consulta el servicio remoto IP-API.
+    El resultado se memoriza por IP (GEO_CACHE).
+    """
+    if GEOIP_DATABASE is not None:
+        country = GEO_CACHE.get_or_compute(ip_address, lambda: GEOIP_DATABASE.lookup(ip_address))
+    else:
+        # Un 'UNKNOWN' remoto puede ser un error transitorio (timeout, límite de peticiones): no se guarda
+        country = GEO_CACHE.get_or_compute(ip_address, lambda: get_country_from_remote_service(ip_address),
+                                           cacheable=lambda country: country != 'UNKNOWN')
+    LOG.add(country=country)
+    return country
+
+def get_country_from_remote_service(ip_address):
     """
     Obtiene el país de origen de una IP usando servicio gratuito IP-API
+    (bloqueante, con límite de peticiones: solo si no hay base local)
     """
     try:
         import urllib.request
@@ -133,166 +272,34 @@ def get_country_from_ip(ip_address):
         # Limpiar IP para evitar caracteres inválidos en URL
         clean_ip = ip_address.strip()
         if not clean_ip or ' ' in clean_ip:
-            logger.warning(f"Invalid IP address: {ip_address}")
+            LOG.warning("Invalid IP address", ip=ip_address)
             return 'UNKNOWN'
         
         url = f"http://ip-api.com/json/{clean_ip}"
         with urllib.request.urlopen(url, timeout=5) as response:
             data = json.loads(response.read().decode())
             country = data.get('countryCode', 'UNKNOWN')
-            logger.info(f"IP {clean_ip} resolved to country: {country}")
+            LOG.info("IP resolved remotely to country: %s", country, ip=clean_ip)
             return country
             
     except Exception as e:
-        logger.warning(f"Error getting country for IP {ip_address}: {e}")
+        LOG.warning("Error getting country for IP: %s", e, ip=ip_address)
         return 'UNKNOWN'
 
-def validate_geographic_access(user_ip, allowed_countries):
-    """
-    Valida si la IP del usuario está en los países permitidos
-    """
-    if not allowed_countries or 'UNKNOWN' in allowed_countries:
-        return {'allowed': True, 'reason': 'No geographic restrictions'}
-    
-    user_country = get_country_from_ip(user_ip)
-    
-    if user_country in allowed_countries:
-        return {
-            'allowed': True, 
-            'reason': f'Geographic access allowed from {user_country}'
-        }
-    else:
-        return {
-            'allowed': False, 
-            'reason': f'Geographic access denied from {user_country}. Allowed countries: {allowed_countries}'
-        }
-
-def validate_ip_whitelist(user_ip, ip_whitelist):
-    """
-    Valida si la IP del usuario está en la whitelist de IPs permitidas
-    """
-    if not ip_whitelist:
-        return {'allowed': True, 'reason': 'No IP restrictions'}
-    
-    import ipaddress
-    
-    try:
-        user_ip_obj = ipaddress.ip_address(user_ip)
-        
-        for allowed_network in ip_whitelist:
-            if user_ip_obj in ipaddress.ip_network(allowed_network):
-                return {
-                    'allowed': True, 
-                    'reason': f'IP {user_ip} allowed in network {allowed_network}'
-                }
-        
-        return {
-            'allowed': False, 
-            'reason': f'IP {user_ip} not in whitelist. Allowed networks: {ip_whitelist}'
-        }
-        
-    except Exception as e:
-        logger.warning(f"Error validating IP whitelist: {e}")
-        return {
-            'allowed': False, 
-            'reason': f'Invalid IP format: {user_ip}'
-        }
-
-def validate_cognito_groups_access_with_policies(cognito_groups, current_hour, user_ip=None):
+def validate_cognito_groups_access_with_policies(cognito_groups, current_hour, user_ip=None, path=None,
+                                                 method_arn=None):
     """
     Valida acceso basado en grupos de Cognito con políticas de seguridad por grupo
+    (evaluadas sobre las políticas precompiladas en POLICY_ENGINE). Con method_arn y
+    WILDCARD_POLICIES el resultado incluye 'statements' válidos para toda la API.
     """
-    # Políticas de seguridad por grupo de MediSupply
-    GROUP_POLICIES = {
-        'admin': {
-            'countries': ['CO', 'PE', 'EC', 'MX'],  # Todos los países
-            'hours': {'start': 0, 'end': 23},       # 24/7
-            'ip_whitelist': None,                   # Sin restricción IP
-            'description': 'Acceso completo 24/7',
-            'permissions': ['read_all', 'write_all', 'delete_all', 'audit_all'],
-            'apis': ['*']
-        },
-        'compras': {
-            'countries': ['CO', 'PE', 'EC', 'MX'],
-            'hours': {'start': 6, 'end': 22},       # Horario laboral
-            'ip_whitelist': ['10.0.0.0/8'],        # Solo red corporativa
-            'description': 'Horario laboral, red corporativa',
-            'permissions': ['read_purchases', 'write_purchases', 'manage_suppliers'],
-            'apis': ['/purchases/*', '/suppliers/*', '/products/*']
-        },
-        'logistica': {
-            'countries': ['CO', 'PE', 'EC', 'MX'],
-            'hours': {'start': 5, 'end': 23},       # Horario extendido
-            'ip_whitelist': None,
-            'description': 'Horario extendido para logística',
-            'permissions': ['read_logistics', 'write_inventory', 'manage_routes'],
-            'apis': ['/logistics/*', '/inventory/*', '/routes/*', '/vehicles/*']
-        },
-        'ventas': {
-            'countries': ['CO', 'PE', 'EC', 'MX'],
-            'hours': {'start': 5, 'end': 23},       # Horario extendido
-            'ip_whitelist': None,
-            'description': 'Horario extendido para ventas',
-            'permissions': ['read_sales', 'write_orders', 'manage_clients'],
-            'apis': ['/sales/*', '/clients/*', '/orders/*', '/visits/*']
-        },
-        'clientes': {
-            'countries': ['CO'],                    # Solo Colombia inicialmente
-            'hours': {'start': 6, 'end': 22},       # Horario comercial
-            'ip_whitelist': None,                   # Sin restricción IP
-            'description': 'Horario comercial, solo Colombia',
-            'permissions': ['read_products', 'create_orders', 'track_deliveries'],
-            'apis': ['/products/available', '/orders/create', '/deliveries/track']
-        }
-    }
-    
-    # Verificar si el usuario está en algún grupo válido
-    for group in cognito_groups:
-        if group in GROUP_POLICIES:
-            group_policy = GROUP_POLICIES[group]
-            
-            # Validar horario
-            if not (group_policy['hours']['start'] <= current_hour <= group_policy['hours']['end']):
-                return {
-                    'allowed': False, 
-                    'reason': f'Access denied for {group} group: outside allowed hours ({group_policy["hours"]["start"]}:00-{group_policy["hours"]["end"]}:59). Current hour: {current_hour}'
-                }
-            
-            # Validar IP whitelist PRIMERO si se proporciona IP
-            if user_ip and group_policy['ip_whitelist']:
-                ip_validation = validate_ip_whitelist(user_ip, group_policy['ip_whitelist'])
-                if not ip_validation['allowed']:
-                    return ip_validation
-            
-            # Validar geografía si se proporciona IP (solo para IPs públicas)
-            if user_ip and group_policy['countries']:
-                # Solo validar geografía si la IP no está en whitelist (IPs privadas)
-                skip_geo_validation = False
-                if group_policy['ip_whitelist']:
-                    # Verificar si la IP está en la whitelist usando la misma lógica
-                    import ipaddress
-                    try:
-                        user_ip_obj = ipaddress.ip_address(user_ip)
-                        for allowed_network in group_policy['ip_whitelist']:
-                            if user_ip_obj in ipaddress.ip_network(allowed_network):
-                                skip_geo_validation = True
-                                break
-                    except:
-                        pass
-                
-                if not skip_geo_validation:
-                    geo_validation = validate_geographic_access(user_ip, group_policy['countries'])
-                    if not geo_validation['allowed']:
-                        return geo_validation
-            
-            logger.info(f"User authorized by group: {group} - {group_policy['description']}")
-            return {
-                'allowed': True, 
-                'reason': f"Access granted by {group} group - {group_policy['description']}"
-            }
-    
-    # Si no está en ningún grupo válido
-    return {'allowed': False, 'reason': f'User not in any valid MediSupply group. Current groups: {cognito_groups}'}
+    if not (WILDCARD_POLICIES and method_arn):
+        return POLICY_ENGINE.evaluate(cognito_groups, current_hour, user_ip, path)
+    decision, statements = POLICY_ENGINE.authorize(cognito_groups, current_hour, user_ip, path, method_arn)
+    if statements is None:
+        LOG.info("Decision not expressible as API-wide statements, scoping policy to methodArn")
+        return decision
+    return dict(decision, statements=statements)
 
 def generate_policy(principal_id, effect, resource):
     """Genera la política de autorización para API Gateway"""
@@ -308,18 +315,20 @@ def generate_policy(principal_id, effect, resource):
         }
     }
     
-    logger.info(f"Generated policy: {policy}")
+    LOG.debug("Generated policy", policy=policy)
+    LOG.decision(effect, principal_id)
     return policy
 
-def generate_policy_with_cors(principal_id, effect, resource):
+def generate_policy_with_cors(principal_id, effect, resource, statements=None):
     """
     Genera una política IAM con headers CORS para el autorizador
+    (`statements` reemplaza al statement único sobre `resource`)
     """
     policy = {
         'principalId': principal_id,
         'policyDocument': {
             'Version': '2012-10-17',
-            'Statement': [
+            'Statement': statements or [
                 {
                     'Action': 'execute-api:Invoke',
                     'Effect': effect,
@@ -334,5 +343,6 @@ def generate_policy_with_cors(principal_id, effect, resource):
         }
     }
     
-    logger.info(f"Generated policy with CORS: {policy}")
+    LOG.debug("Generated policy with CORS", policy=policy)
+    LOG.decision(effect, principal_id, statements=len(policy['policyDocument']['Statement']))
     return policy
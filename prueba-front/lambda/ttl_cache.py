@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+🧠 Caché LRU + TTL para el autorizador
+====================================================
+Memoriza resultados entre invocaciones de un mismo contenedor Lambda (IP -> país,
+(IP, grupo) -> decisión de whitelist, tokens, perfiles). El tamaño está acotado por
+`max_entries` (se descarta la entrada usada hace más tiempo), así que la memoria del
+contenedor no crece con el número de claves distintas.
+
+Un heap de vencimientos retira en cada escritura las entradas ya expiradas aunque
+nadie vuelva a leerlas, de modo que no ocupan capacidad hasta que las desaloje el LRU.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+_MISS = object()
+
+
+class TTLCache:
+    """Diccionario LRU con expiración por entrada y contadores de aciertos/fallos."""
+
+    def __init__(self, max_entries=10000, ttl=300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        # (vence, secuencia, clave); puede tener entradas obsoletas (claves reescritas o
+        # desalojadas), que se descartan al salir o al reconstruir el heap
+        self._expiry_heap = []
+        self._sequence = itertools.count()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISS)
+            if entry is _MISS:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            now = self._clock()
+            expires_at = now + (self.ttl if ttl is None else ttl)
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            heapq.heappush(self._expiry_heap, (expires_at, next(self._sequence), key))
+            self._purge_expired(now)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+                self._rebuild_heap()
+
+    def _purge_expired(self, now):
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = self._entries.get(key, _MISS)
+            # Solo si la entrada actual es la que vence (no una reescritura posterior)
+            if entry is not _MISS and entry[0] == expires_at:
+                del self._entries[key]
+                self.expirations += 1
+
+    def _rebuild_heap(self):
+        self._expiry_heap = [(expires_at, next(self._sequence), key)
+                             for key, (expires_at, _) in self._entries.items()]
+        heapq.heapify(self._expiry_heap)
+
+    def purge(self):
+        """Retira ahora todas las entradas vencidas."""
+        with self._lock:
+            self._purge_expired(self._clock())
+
+    def get_or_compute(self, key, compute, cacheable=None):
+        """
+        Valor memorizado o `compute()`. Si `cacheable(valor)` es falso el resultado no
+        se guarda (p. ej. errores transitorios de un servicio remoto).
+        """
+        value = self.get(key, _MISS)
+        if value is _MISS:
+            value = compute()
+            if cacheable is None or cacheable(value):
+                self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._expiry_heap.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            'expirations': self.expirations,
+            'evictions': self.evictions,
+        }
@@ -1,109 +1,135 @@
-# adapters/sql_adapter.py
+# adapters/sqlite_adapter.py
 import sqlite3
-from typing import List
+import threading
+from typing import List, Optional
 from repositories.product_repository import ProductRepository
 from domain.models import Product
-from config import DB_NAME
+from config import (DB_NAME, DEFAULT_WAREHOUSE_ID, SQLITE_BUSY_TIMEOUT, SQLITE_CACHE_SIZE_KB,
+                    SQLITE_CACHED_STATEMENTS, SQLITE_MMAP_SIZE)
 
-
-class SQLiteProductAdapter(ProductRepository):
-    """Implementación del repositorio de productos para SQLite."""
-
-    def get_available_products(self) -> List[Product]:
-        conn = sqlite3.connect(DB_NAME)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        query = '''
-        SELECT 
+# Sentencias constantes: sqlite3 guarda las compiladas por texto (cached_statements)
+# y las reutiliza en cada llamada de la misma conexión.
+_PRODUCT_SELECT = '''
+        SELECT
             p.product_id,
             p.sku,
             p.value,
             c.name AS category_name,
             SUM(ps.quantity) AS total_quantity
-        FROM 
+        FROM
             Product p
-        JOIN 
+        JOIN
             Category c ON p.category_id = c.category_id
-        JOIN 
+        JOIN
             ProductStock ps ON p.product_id = ps.product_id
+'''
+
+AVAILABLE_PRODUCTS_QUERY = _PRODUCT_SELECT + '''
         WHERE
             ps.quantity > 0
         GROUP BY
             p.product_id
         ORDER BY
             p.sku;
-        '''
+'''
+
+PRODUCT_BY_ID_QUERY = _PRODUCT_SELECT + '''
+        WHERE
+            p.product_id = ?
+        GROUP BY
+            p.product_id;
+'''
+
+UPDATE_PRICE_QUERY = "UPDATE Product SET value = ? WHERE product_id = ?;"
+UPDATE_STOCK_QUERY = "UPDATE ProductStock SET quantity = ? WHERE product_id = ? AND warehouse_id = ?;"
+
+# Los mismos índices que usa el adaptador de PostgreSQL. SQLite no soporta INCLUDE,
+# así que las columnas cubiertas se agregan al final de la clave.
+INDEXES_DDL = '''
+    CREATE INDEX IF NOT EXISTS idx_productstock_product
+        ON ProductStock (product_id, warehouse_id, quantity, country);
+    CREATE INDEX IF NOT EXISTS idx_productstock_country_product
+        ON ProductStock (country, product_id, quantity) WHERE quantity > 0;
+    CREATE INDEX IF NOT EXISTS idx_productstock_warehouse_product
+        ON ProductStock (warehouse_id, product_id, quantity) WHERE quantity > 0;
+'''
+
 
-        cursor.execute(query)
-        results = cursor.fetchall()
+def connect(db_path: str = DB_NAME) -> sqlite3.Connection:
+    """
+    Abre una conexión configurada para lecturas concurrentes:
+    WAL (los lectores no bloquean al escritor), synchronous=NORMAL, mmap y caché de páginas.
+    """
+    conn = sqlite3.connect(db_path, timeout=SQLITE_BUSY_TIMEOUT, cached_statements=SQLITE_CACHED_STATEMENTS)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA mmap_size = {int(SQLITE_MMAP_SIZE)}")
+    conn.execute(f"PRAGMA cache_size = -{int(SQLITE_CACHE_SIZE_KB)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
 
-        products = [
-            Product(
-                product_id=row['product_id'],
-                sku=row['sku'],
-                value=row['value'],
-                category_name=row['category_name'],
-                total_quantity=row['total_quantity']
-            ) for row in results
-        ]
 
-        conn.close()
-        return products
+class SQLiteProductAdapter(ProductRepository):
+    """
+    Implementación del repositorio de productos para SQLite (equipos edge sin RDS).
+
+    Cada hilo reutiliza su propia conexión: sqlite3 no permite compartir una conexión
+    entre hilos y abrirla por llamada repite los PRAGMA y descarta las sentencias compiladas.
+    """
+
+    def __init__(self, db_path: str = DB_NAME):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = connect(self.db_path)
+        return conn
+
+    def close(self) -> None:
+        """Cierra la conexión del hilo actual (la siguiente llamada abre una nueva)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @staticmethod
+    def _to_product(row) -> Product:
+        return Product(
+            product_id=row['product_id'],
+            sku=row['sku'],
+            value=row['value'],
+            category_name=row['category_name'],
+            total_quantity=row['total_quantity']
+        )
 
-    def get_product_by_id(self, product_id: str) -> List[Product]:
+    def create_indexes(self) -> None:
+        conn = self._get_connection()
+        conn.executescript(INDEXES_DDL)
+        conn.commit()
+
+    def get_available_products(self) -> List[Product]:
+        rows = self._get_connection().execute(AVAILABLE_PRODUCTS_QUERY).fetchall()
+        return [self._to_product(row) for row in rows]
+
+    def get_product_by_id(self, product_id: str) -> Optional[Product]:
         """Obtiene un producto por su ID."""
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        query = '''
-                SELECT 
-                    p.product_id,
-                    p.sku,
-                    p.value,
-                    c.name AS category_name,
-                    SUM(ps.quantity) AS total_quantity
-                FROM 
-                    Product p
-                JOIN 
-                    Category c ON p.category_id = c.category_id
-                JOIN 
-                    ProductStock ps ON p.product_id = ps.product_id
-                WHERE
-                    p.product_id = ?
-                GROUP BY
-                    p.product_id
-                ORDER BY
-                    p.sku;
-                '''
-
-        cursor.execute(qyery, (product_id,))
-        row = cursor.fetchone()
-        conn.close()
-        if row:
-            return Product(id=row[0], name=row[1], price=row[2], stock=row[3])
-        return None
-
-    def update_product(self, product_id: str, price: float, stock: int) -> None:
+        row = self._get_connection().execute(PRODUCT_BY_ID_QUERY, (product_id,)).fetchone()
+        return self._to_product(row) if row else None
+
+    def update_product(self, product_id: str, price: float, stock: int,
+                       warehouse_id: str = DEFAULT_WAREHOUSE_ID) -> None:
         """
-        Actualiza el precio y el stock de un producto por su ID.
+        Actualiza el precio y el stock de un producto por su ID en una sola transacción.
         Si el producto no existe, se asume que la operación no es válida y no se hace nada.
         """
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        queryProduct = '''
-                 UPDATE Product
-                    SET value = ?
-                    WHERE product_id = ?;
-                '''
-        queryStock = '''
-                         UPDATE ProductStock
-                            SET quantity = ?
-                            WHERE product_id = ? 
-                            AND warehouse_id = 'W-003';
-                        '''
-
-
-        cursor.execute(queryProduct, (price, product_id))
-        cursor.execute(queryStock, (stock, product_id))
-        conn.commit()
-        conn.close()
\ No newline at end of file
+        conn = self._get_connection()
+        try:
+            conn.execute(UPDATE_PRICE_QUERY, (price, product_id))
+            conn.execute(UPDATE_STOCK_QUERY, (stock, product_id, warehouse_id))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
@@ -1,2 +1,13 @@
 # config.py
-DB_NAME = 'healthcare_products.db'
\ No newline at end of file
+import os
+
+DB_NAME = os.environ.get('SQLITE_DB_PATH', 'healthcare_products.db')
+
+# Bodega que actualiza PUT /products/update/<id> cuando no se indica otra
+DEFAULT_WAREHOUSE_ID = os.environ.get('DEFAULT_WAREHOUSE_ID', 'W-003')
+
+# Ajustes de SQLite para los equipos edge (conexión persistente por hilo)
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))  # bytes
+SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', '65536'))
+SQLITE_BUSY_TIMEOUT = float(os.environ.get('SQLITE_BUSY_TIMEOUT', '5'))  # segundos
+SQLITE_CACHED_STATEMENTS = int(os.environ.get('SQLITE_CACHED_STATEMENTS', '256'))
@@ -1,11 +1,12 @@
 # database_setup.py
-import sqlite3
 import os
 from config import DB_NAME
+from adapters.sqlite_adapter import INDEXES_DDL, connect
 
 def setup_database():
     """Crea la base de datos y las tablas si no existen, y las puebla con datos."""
-    conn = sqlite3.connect(DB_NAME)
+    # Deja la base en modo WAL (persistente en el archivo) con los mismos PRAGMA del adaptador
+    conn = connect(DB_NAME)
     cursor = conn.cursor()
 
     with open('insert_data.sql', 'r') as f:
@@ -52,6 +53,9 @@ def setup_database():
         cursor.executescript(sql_script)
         print("Registros creados exitosamente.")
 
+    # Índices equivalentes a los de PostgreSQL para joins y filtros por stock
+    cursor.executescript(INDEXES_DDL)
+
     conn.commit()
     conn.close()
 
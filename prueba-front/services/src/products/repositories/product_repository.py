@@ -1,6 +1,6 @@
 # repositories/product_repository.py
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 from domain.models import Product
 
 class ProductRepository(ABC):
@@ -10,7 +10,7 @@ class ProductRepository(ABC):
         pass
 
     @abstractmethod
-    def get_product_by_id(self, product_id: str) -> List[Product]:
+    def get_product_by_id(self, product_id: str) -> Optional[Product]:
         """Obtiene un producto por su ID."""
         pass
 
@@ -1,5 +1,5 @@
 # services/product_service.py
-from typing import List
+from typing import List, Optional
 from repositories.product_repository import ProductRepository
 from domain.models import Product
 
@@ -11,6 +11,10 @@ class ProductService:
         """Caso de uso: listar todos los productos disponibles."""
         return self.repository.get_available_products()
 
+    def get_product_by_id(self, product_id: str) -> Optional[Product]:
+        """Caso de uso: obtener un producto por su ID."""
+        return self.repository.get_product_by_id(product_id)
+
     def update_product(self, product_id: str, price: float, stock: int) -> None:
         """Caso de uso: actualizar un producto existente."""
         self.repository.update_product(product_id=product_id, price=price, stock=stock)
\ No newline at end of file
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+🧪 Prueba de humo del adaptador SQLite del servicio de productos
+=================================================================
+services/src/products/adapters/sqlite_adapter.py sobre una copia temporal de
+healthcare_products.db: consulta por ID, listado de disponibles, actualización y
+conexión persistente por hilo. No requiere AWS ni red:
+
+    python -m pytest -q test_products_sqlite_adapter.py
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services', 'src', 'products')
+sys.path.insert(0, SERVICE_DIR)
+
+from adapters.sqlite_adapter import SQLiteProductAdapter  # noqa: E402
+
+
+class TestSQLiteProductAdapter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp, 'products.db')
+        shutil.copy(os.path.join(SERVICE_DIR, 'healthcare_products.db'), self.db_path)
+        self.adapter = SQLiteProductAdapter(db_path=self.db_path)
+        self.adapter.create_indexes()
+
+    def tearDown(self):
+        self.adapter.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def query(self, statement, params=()):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(statement, params).fetchall()
+        finally:
+            conn.close()
+
+    def test_get_product_by_id(self):
+        product = self.adapter.get_product_by_id('prod_001')
+        [(sku, value, quantity)] = self.query(
+            "SELECT p.sku, p.value, SUM(ps.quantity) FROM Product p JOIN ProductStock ps "
+            "ON p.product_id = ps.product_id WHERE p.product_id = 'prod_001' GROUP BY p.product_id")
+        self.assertEqual((product.product_id, product.sku, product.value, product.total_quantity),
+                         ('prod_001', sku, value, quantity))
+        self.assertTrue(product.category_name)
+        self.assertIsNone(self.adapter.get_product_by_id('prod_does_not_exist'))
+
+    def test_get_available_products(self):
+        products = self.adapter.get_available_products()
+        expected = {row[0] for row in self.query("SELECT DISTINCT product_id FROM ProductStock WHERE quantity > 0")}
+        self.assertEqual({product.product_id for product in products}, expected)
+        self.assertEqual([product.sku for product in products], sorted(product.sku for product in products))
+        self.assertTrue(all(product.total_quantity > 0 for product in products))
+
+    def test_update_product_is_visible_and_out_of_stock_products_leave_the_listing(self):
+        warehouses = [row[0] for row in self.query(
+            "SELECT DISTINCT warehouse_id FROM ProductStock WHERE product_id = 'prod_001'")]
+        self.adapter.update_product('prod_001', price=12.5, stock=7, warehouse_id=warehouses[0])
+        product = self.adapter.get_product_by_id('prod_001')
+        self.assertEqual(product.value, 12.5)
+        self.assertIn(('prod_001',), self.query("SELECT product_id FROM ProductStock WHERE quantity = 7"))
+
+        for warehouse_id in warehouses:
+            self.adapter.update_product('prod_001', price=12.5, stock=0, warehouse_id=warehouse_id)
+        self.assertEqual(self.adapter.get_product_by_id('prod_001').total_quantity, 0)
+        self.assertNotIn('prod_001', {product.product_id for product in self.adapter.get_available_products()})
+
+    def test_connection_is_reused_per_thread(self):
+        first = self.adapter._get_connection()
+        self.assertIs(self.adapter._get_connection(), first)
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.adapter._get_connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], first)
+        self.adapter.close()
+        self.assertIsNot(self.adapter._get_connection(), first)
+        self.assertEqual(self.adapter.get_product_by_id('prod_001').product_id, 'prod_001')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)